@@ -9,7 +9,7 @@ import json
 import argparse
 from slide_search_core import (
     search, search_all, AVAILABLE_DOMAINS,
-    search_with_context, get_layout_for_goal, get_typography_for_slide,
+    search_with_context, plan_deck, get_layout_for_goal, get_typography_for_slide,
     get_color_for_emotion, get_background_config
 )
 
@@ -105,6 +105,30 @@ def format_context(context):
     return "\n".join(output)
 
 
+def load_deck(path):
+    """Slide queries from a deck file ("-" for stdin).
+
+    The file is a JSON list of queries, each a string or an object with a
+    "query" key, or an object with such a list under "slides".
+    """
+    if path == "-":
+        deck = json.load(sys.stdin)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            deck = json.load(f)
+    if isinstance(deck, dict):
+        deck = deck.get("slides")
+    if not isinstance(deck, list) or not deck:
+        raise ValueError("deck must be a non-empty JSON list of slide queries")
+    queries = []
+    for i, slide in enumerate(deck, 1):
+        query = slide.get("query") if isinstance(slide, dict) else slide
+        if not isinstance(query, str) or not query.strip():
+            raise ValueError(f"slide {i} has no query")
+        queries.append(query)
+    return queries
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Search slide design databases",
@@ -121,10 +145,14 @@ Examples:
 Contextual Search (Premium System):
   search-slides.py "problem slide" --context --position 2 --total 9
   search-slides.py "cta" --context --position 9 --total 9 --prev-emotion frustration
+
+Whole-deck planning (one query per slide, emotions threaded automatically):
+  search-slides.py --deck deck.json           # ["hook title", "problem", ..., "cta"]
+  search-slides.py --deck deck.json --json
         """
     )
 
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query (omit with --deck)")
     parser.add_argument("-d", "--domain", choices=AVAILABLE_DOMAINS,
                         help="Specific domain to search (auto-detected if not specified)")
     parser.add_argument("-n", "--max-results", type=int, default=3,
@@ -143,9 +171,30 @@ Contextual Search (Premium System):
                         help="Total slides in deck (default: 9)")
     parser.add_argument("--prev-emotion", type=str, default=None,
                         help="Previous slide's emotion for contrast calculation")
+    parser.add_argument("--deck", type=str, default=None, metavar="FILE",
+                        help="Plan a whole deck: JSON list of slide queries ('-' for stdin)")
 
     args = parser.parse_args()
 
+    # Whole-deck planning mode
+    if args.deck:
+        try:
+            queries = load_deck(args.deck)
+        except (OSError, ValueError) as e:
+            parser.error(f"--deck: {e}")
+        plan = plan_deck(queries, previous_emotion=args.prev_emotion)
+
+        if args.json:
+            print(json.dumps(plan, indent=2))
+        else:
+            for slide in plan:
+                print(f"\n##### SLIDE {slide['context']['slide_position']}: {slide['query']} #####")
+                print(format_context(slide['context']))
+        return
+
+    if args.query is None:
+        parser.error("the following arguments are required: query (or --deck)")
+
     # Contextual search mode
     if args.context:
         result = search_with_context(
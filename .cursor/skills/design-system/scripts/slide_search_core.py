@@ -4,15 +4,24 @@
 Slide Search Core - BM25 search engine for slide design databases
 """
 
-import csv
-import re
+import sys
 from pathlib import Path
-from math import log
-from collections import defaultdict
+from types import MappingProxyType
+
+# BM25 ranking and CSV/index caching are shared with ui-ux-pro-max, so the
+# ui-ux-pro-max skill must be installed next to this one.
+_ENGINE_DIR = Path(__file__).resolve().parents[2] / "ui-ux-pro-max" / "scripts"
+if not (_ENGINE_DIR / "search_engine.py").is_file():
+    raise ImportError(f"slide search (design-system skill) needs the ui-ux-pro-max skill's search engine at {_ENGINE_DIR}")
+if str(_ENGINE_DIR) not in sys.path:
+    sys.path.append(str(_ENGINE_DIR))
+
+from search_engine import BM25, KeywordMatcher, _load_csv, _load_index, search_csv  # noqa: E402
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
+CACHE_NAMESPACE = "design-system"  # this skill's subdirectory of the shared index cache
 
 CSV_CONFIG = {
     "strategy": {
@@ -40,119 +49,30 @@ CSV_CONFIG = {
 AVAILABLE_DOMAINS = list(CSV_CONFIG.keys())
 
 
-# ============ BM25 IMPLEMENTATION ============
-class BM25:
-    """BM25 ranking algorithm for text search"""
-
-    def __init__(self, k1=1.5, b=0.75):
-        self.k1 = k1
-        self.b = b
-        self.corpus = []
-        self.doc_lengths = []
-        self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
-        self.N = 0
-
-    def tokenize(self, text):
-        """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
-
-    def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
-        if self.N == 0:
-            return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
-
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
-
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
-
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
-
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
-
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
-
-            scores.append((idx, score))
-
-        return sorted(scores, key=lambda x: x[1], reverse=True)
-
-
 # ============ SEARCH FUNCTIONS ============
-def _load_csv(filepath):
-    """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
-
-
 def _search_csv(filepath, search_cols, output_cols, query, max_results):
     """Core search function using BM25"""
-    if not filepath.exists():
-        return []
-
-    data = _load_csv(filepath)
-
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
-
-    # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
-
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
-
-    return results
+    return search_csv(filepath, search_cols, output_cols, query, max_results, BM25,
+                      namespace=CACHE_NAMESPACE, raise_errors=True)[0]
+
+
+# Keyword table for detect_domain(), compiled once at import.
+_DOMAIN_KEYWORDS = {
+    "strategy": ["pitch", "deck", "investor", "yc", "seed", "series", "demo", "sales", "webinar",
+                 "conference", "board", "qbr", "all-hands", "duarte", "kawasaki", "structure"],
+    "layout": ["slide", "layout", "grid", "column", "title", "hero", "section", "cta",
+               "screenshot", "quote", "timeline", "comparison", "pricing", "team"],
+    "copy": ["headline", "copy", "formula", "aida", "pas", "hook", "cta", "benefit",
+             "objection", "proof", "testimonial", "urgency", "scarcity"],
+    "chart": ["chart", "graph", "bar", "line", "pie", "funnel", "metrics", "data",
+              "visualization", "kpi", "trend", "comparison", "heatmap", "gauge"]
+}
+_DOMAIN_MATCHER = KeywordMatcher(_DOMAIN_KEYWORDS)
 
 
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "strategy": ["pitch", "deck", "investor", "yc", "seed", "series", "demo", "sales", "webinar",
-                     "conference", "board", "qbr", "all-hands", "duarte", "kawasaki", "structure"],
-        "layout": ["slide", "layout", "grid", "column", "title", "hero", "section", "cta",
-                   "screenshot", "quote", "timeline", "comparison", "pricing", "team"],
-        "copy": ["headline", "copy", "formula", "aida", "pas", "hook", "cta", "benefit",
-                 "objection", "proof", "testimonial", "urgency", "scarcity"],
-        "chart": ["chart", "graph", "bar", "line", "pie", "funnel", "metrics", "data",
-                  "visualization", "kpi", "trend", "comparison", "heatmap", "gauge"]
-    }
-
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "strategy"
+    return _DOMAIN_MATCHER.best(query, "strategy")
 
 
 def search(query, domain=None, max_results=MAX_RESULTS):
@@ -189,6 +109,38 @@ def search_all(query, max_results=2):
     return all_results
 
 
+def _search_all_many(queries, max_results=2):
+    """search_all() for several queries at once: {query: search_all(query)}.
+
+    Each domain index is loaded once and every query is scored against it in
+    the same pass; query tokens are cached by the engine, so a query is
+    tokenized once for all four indexes.
+    """
+    queries = list(dict.fromkeys(queries))
+    all_results = {query: {} for query in queries}
+    for domain in AVAILABLE_DOMAINS:
+        config = CSV_CONFIG[domain]
+        filepath = DATA_DIR / config["file"]
+        if not filepath.exists():
+            continue
+        rows, bm25 = _load_index(filepath, config["search_cols"], namespace=CACHE_NAMESPACE)
+        if not rows:
+            continue
+        output_cols = config["output_cols"]
+        for query in queries:
+            results = [{col: rows[idx].get(col, "") for col in output_cols if col in rows[idx]}
+                       for idx, _score in bm25.top_k(query, max_results)]
+            if results:
+                all_results[query][domain] = {
+                    "domain": domain,
+                    "query": query,
+                    "file": config["file"],
+                    "count": len(results),
+                    "results": results
+                }
+    return all_results
+
+
 # ============ CONTEXTUAL SEARCH (Premium Slide System) ============
 
 # New CSV configurations for decision system
@@ -212,18 +164,36 @@ DECISION_CSV_CONFIG = {
 }
 
 
+# Keyed decision tables, built once per file and shared by every get_*
+# helper below. Tables and rows are read-only; helpers hand out dict copies.
+_decision_tables = {}  # filepath -> (mtime, {key: row})
+_EMPTY_TABLE = MappingProxyType({})
+
+
 def _load_decision_csv(csv_type):
-    """Load a decision CSV and return as dict keyed by primary column."""
+    """Load a decision CSV as a read-only mapping keyed by primary column.
+
+    Parsed once per process and rebuilt only when the file's mtime changes.
+    """
     config = DECISION_CSV_CONFIG.get(csv_type)
     if not config:
-        return {}
+        return _EMPTY_TABLE
 
     filepath = DATA_DIR / config["file"]
     if not filepath.exists():
-        return {}
+        return _EMPTY_TABLE
 
-    data = _load_csv(filepath)
-    return {row[config["key_col"]]: row for row in data if config["key_col"] in row}
+    mtime = filepath.stat().st_mtime
+    cached = _decision_tables.get(filepath)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    key_col = config["key_col"]
+    table = MappingProxyType({
+        row[key_col]: MappingProxyType(dict(row)) for row in _load_csv(filepath) if key_col in row
+    })
+    _decision_tables[filepath] = (mtime, table)
+    return table
 
 
 def get_layout_for_goal(goal, previous_emotion=None):
@@ -252,9 +222,9 @@ def get_typography_for_slide(slide_type, has_metrics=False, has_quote=False):
     typography = _load_decision_csv("typography")
 
     if has_metrics:
-        return typography.get("metric-callout", {})
+        return dict(typography.get("metric-callout", {}))
     if has_quote:
-        return typography.get("quote-block", {})
+        return dict(typography.get("quote-block", {}))
 
     # Map slide types to typography
     type_map = {
@@ -277,7 +247,7 @@ def get_typography_for_slide(slide_type, has_metrics=False, has_quote=False):
     }
 
     content_type = type_map.get(slide_type, "feature-grid")
-    return typography.get(content_type, {})
+    return dict(typography.get(content_type, {}))
 
 
 def get_color_for_emotion(emotion):
@@ -286,7 +256,7 @@ def get_color_for_emotion(emotion):
     Uses slide-color-logic.csv for decision.
     """
     colors = _load_decision_csv("color-logic")
-    return colors.get(emotion, colors.get("clarity", {}))
+    return dict(colors.get(emotion, colors.get("clarity", {})))
 
 
 def get_background_config(slide_type):
@@ -295,7 +265,7 @@ def get_background_config(slide_type):
     Uses slide-backgrounds.csv for decision.
     """
     backgrounds = _load_decision_csv("backgrounds")
-    return backgrounds.get(slide_type, {})
+    return dict(backgrounds.get(slide_type, {}))
 
 
 def should_use_full_bleed(slide_index, total_slides, emotion):
@@ -362,9 +332,49 @@ def search_with_context(query, slide_position=1, total_slides=9, previous_emotio
     Returns:
         Search results enriched with contextual recommendations
     """
-    # Get base results from existing BM25 search
-    base_results = search_all(query, max_results=2)
+    return {
+        "query": query,
+        "context": _slide_context(query, slide_position, total_slides, previous_emotion)[0],
+        "base_results": search_all(query, max_results=2),
+    }
+
+
+def plan_deck(queries, previous_emotion=None):
+    """
+    Contextual recommendations for every slide of a deck in one pass.
+
+    Equivalent to calling search_with_context() once per slide while
+    threading each slide's emotion into the next slide's previous_emotion,
+    but the deck is searched together: repeated queries are searched once
+    (their slides share one base_results dict), and every domain index is
+    loaded once and scored against all of the deck's queries in one pass
+    instead of one search_all() sweep per slide. Seeing the whole deck also lets it
+    enforce should_use_full_bleed()'s "never consecutive" rule.
+
+    Args:
+        queries: One search query per slide, in deck order
+        previous_emotion: Emotion preceding the first slide, if any
 
+    Returns:
+        List of search_with_context() results, one per slide
+    """
+    total_slides = len(queries)
+    base_results = _search_all_many(queries, max_results=2)
+    plan = []
+    previous_full_bleed = False
+    for position, query in enumerate(queries, 1):
+        context, emotion = _slide_context(query, position, total_slides, previous_emotion)
+        if previous_full_bleed:
+            context["should_use_full_bleed"] = False
+        plan.append({"query": query, "context": context, "base_results": base_results[query]})
+        previous_emotion = emotion
+        previous_full_bleed = context["should_use_full_bleed"]
+    return plan
+
+
+def _slide_context(query, slide_position, total_slides, previous_emotion):
+    """The "context" part of search_with_context(), and the slide's emotion
+    (the next slide's previous_emotion)."""
     # Detect likely slide goal from query
     goal = detect_domain(query.lower())
     if "problem" in query.lower():
@@ -446,8 +456,4 @@ def search_with_context(query, slide_position=1, total_slides=9, previous_emotio
     }
     context["animation_class"] = animation_map.get(goal, "animate-fade-up")
 
-    return {
-        "query": query,
-        "context": context,
-        "base_results": base_results,
-    }
+    return context, emotion
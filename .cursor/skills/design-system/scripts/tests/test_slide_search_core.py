@@ -0,0 +1,172 @@
+"""Regression tests for slide search index caching.
+
+slide_search_core used to re-read each CSV and fit a fresh BM25 index on
+every search, so generating context for one deck refitted the same four
+indexes dozens of times. It now goes through the shared search_engine,
+which keeps one fitted index per CSV until the file changes.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import slide_search_core  # noqa: E402
+import search_engine  # noqa: E402 -- put on sys.path by slide_search_core
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _private_cache_dir(tmp_path_factory):
+    """Point the on-disk index cache (here and in the CLI subprocess) at a
+    temp dir, so the tests never touch ~/.cache/ui-ux-pro-max."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("UI_PRO_MAX_CACHE_DIR", str(tmp_path_factory.mktemp("index-cache")))
+        mp.delenv("UI_PRO_MAX_NO_CACHE", raising=False)
+        yield
+
+
+@pytest.fixture
+def fit_counter(monkeypatch):
+    """Disable the on-disk cache, start with empty in-process caches and
+    count every index fit."""
+    monkeypatch.setenv("UI_PRO_MAX_NO_CACHE", "1")
+    search_engine._csv_cache.clear()
+    search_engine._bm25_cache.clear()
+    fits = []
+    original_fit = search_engine.BM25.fit
+
+    def counting_fit(self, documents):
+        fits.append(len(documents))
+        return original_fit(self, documents)
+
+    monkeypatch.setattr(search_engine.BM25, "fit", counting_fit)
+    return fits
+
+
+def test_deck_context_fits_each_csv_once(fit_counter):
+    """Nine slides x four domains of search still fit only four indexes."""
+    for position, query in enumerate(["hook", "problem", "solution", "features", "traction",
+                                      "testimonial", "team", "pricing", "cta"], 1):
+        slide_search_core.search_with_context(query, position, 9)
+    assert len(fit_counter) == len(slide_search_core.CSV_CONFIG)
+
+
+def test_edited_csv_is_reindexed(fit_counter, tmp_path, monkeypatch):
+    """A changed CSV (new mtime) is re-read and refitted on the next search."""
+    data_dir = tmp_path / "data"
+    shutil.copytree(slide_search_core.DATA_DIR, data_dir)
+    monkeypatch.setattr(slide_search_core, "DATA_DIR", data_dir)
+
+    assert slide_search_core.search("zyxwvut", "chart")["count"] == 0
+
+    chart_csv = data_dir / slide_search_core.CSV_CONFIG["chart"]["file"]
+    header = chart_csv.read_text(encoding="utf-8").splitlines()[0]
+    row = {col: "" for col in header.split(",")}
+    row.update(id="99", chart_type="zyxwvut")
+    chart_csv.write_text(header + "\n" + ",".join(row.values()) + "\n", encoding="utf-8")
+    stat = chart_csv.stat()
+    os.utime(chart_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    result = slide_search_core.search("zyxwvut", "chart")
+    assert result["count"] == 1
+    assert len(fit_counter) == 2
+
+
+def test_deck_parses_each_decision_csv_once(monkeypatch):
+    """Every get_* helper shares one parsed table per decision CSV."""
+    slide_search_core._decision_tables.clear()
+    search_engine._csv_cache.clear()
+    parsed = []
+    original_load_csv = slide_search_core._load_csv
+
+    def counting_load_csv(filepath):
+        parsed.append(filepath.name)
+        return original_load_csv(filepath)
+
+    monkeypatch.setattr(slide_search_core, "_load_csv", counting_load_csv)
+    for position, query in enumerate(["hook", "problem", "solution", "traction", "cta"], 1):
+        slide_search_core.search_with_context(query, position, 5)
+        slide_search_core.get_typography_for_slide("team", has_metrics=position % 2 == 0)
+        slide_search_core.get_background_config("cta")
+    assert sorted(parsed) == sorted(set(parsed))
+    assert len(parsed) == len(slide_search_core.DECISION_CSV_CONFIG)
+
+
+def test_decision_helpers_return_private_copies():
+    layout = slide_search_core.get_layout_for_goal("problem")
+    color = slide_search_core.get_color_for_emotion("frustration")
+    layout["layout_pattern"] = "mutated"
+    color.clear()
+    assert slide_search_core.get_layout_for_goal("problem")["layout_pattern"] != "mutated"
+    assert slide_search_core.get_color_for_emotion("frustration")
+    with pytest.raises(TypeError):
+        slide_search_core._load_decision_csv("color-logic")["frustration"]["background"] = "x"
+
+
+DECK = ["hook title vision", "problem pain", "agitation metric", "solution demo", "features",
+        "traction growth chart", "testimonial", "team", "cta", "problem pain"]
+
+
+def test_plan_deck_matches_chained_search_with_context():
+    plan = slide_search_core.plan_deck(DECK)
+    previous = None
+    for position, (query, slide) in enumerate(zip(DECK, plan), 1):
+        expected = slide_search_core.search_with_context(query, position, len(DECK), previous)
+        expected["context"]["should_use_full_bleed"] = slide["context"]["should_use_full_bleed"]
+        assert slide == expected
+        previous = slide_search_core._slide_context(query, position, len(DECK), previous)[1]
+
+
+def test_search_with_context_does_not_expose_the_planner_emotion():
+    assert "emotion" not in slide_search_core.search_with_context("problem pain")["context"]
+    assert all("emotion" not in slide["context"] for slide in slide_search_core.plan_deck(DECK))
+
+
+def test_plan_deck_never_uses_consecutive_full_bleed():
+    plan = slide_search_core.plan_deck(["cta urgency"] * 9)
+    flags = [slide["context"]["should_use_full_bleed"] for slide in plan]
+    assert any(flags)
+    assert not any(a and b for a, b in zip(flags, flags[1:]))
+
+
+def test_plan_deck_scores_each_index_once_for_the_whole_deck(monkeypatch):
+    loaded, scored = [], []
+    original_load_index = slide_search_core._load_index
+    original_top_k = search_engine.BM25.top_k
+
+    def counting_load_index(filepath, search_cols, **kwargs):
+        loaded.append(filepath.name)
+        return original_load_index(filepath, search_cols, **kwargs)
+
+    def counting_top_k(bm25, query, k):
+        scored.append(query)
+        return original_top_k(bm25, query, k)
+
+    monkeypatch.setattr(slide_search_core, "_load_index", counting_load_index)
+    monkeypatch.setattr(search_engine.BM25, "top_k", counting_top_k)
+    monkeypatch.setattr(slide_search_core, "search_all", None)  # no per-slide sweeps
+    plan = slide_search_core.plan_deck(DECK)
+    assert len(plan) == len(DECK)
+    assert len(loaded) == len(slide_search_core.AVAILABLE_DOMAINS)
+    assert sorted(scored) == sorted(list(set(DECK)) * len(loaded))
+
+
+def test_deck_cli_reads_json_file(tmp_path):
+    deck_file = tmp_path / "deck.json"
+    deck_file.write_text(json.dumps({"slides": [{"query": "hook title"}, "problem", "cta"]}), encoding="utf-8")
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "search-slides.py"), "--deck", str(deck_file), "--json"],
+        capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    plan = json.loads(result.stdout)
+    assert [slide["context"]["inferred_goal"] for slide in plan] == ["hook", "problem", "cta"]
+    assert plan[0]["context"]["previous_emotion"] is None
+    assert plan[1]["context"]["previous_emotion"] is not None
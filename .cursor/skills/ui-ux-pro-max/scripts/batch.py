@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch mode for search.py - many lookups in one process instead of one
+process per lookup.
+
+    python search.py --batch [--workers N] < requests.jsonl
+
+Each input line is one JSON request; blank lines are ignored:
+    {"query": "glassmorphism dark"}                          auto-detected domain
+    {"query": "wcag contrast", "domain": "ux", "max_results": 5}
+    {"query": "list performance", "stack": "react-native"}
+    {"query": "dashbord", "relax": true}                     retry zero hits (search.py --relax)
+    {"op": "search", ...}                                    any daemon.py request
+
+Each output line is the JSON result for the matching input line, in input
+order -- the same dict `search.py --json` prints for that request, plus the
+request's "id" when one was given. A line that can't be parsed produces
+{"error": "..."} instead of aborting the batch.
+
+All requests in one process share core's _csv_cache/_bm25_cache. With
+--workers N, requests are fanned out across N processes (each with its own
+warm caches) and results are still written in input order.
+
+Design-system batches (search.py --design-system --batch projects.jsonl)
+generate and persist one design system per line, reusing one warm
+DesignSystemGenerator per process:
+    {"query": "saas analytics dashboard", "project_name": "Ops Console",
+     "variance": 8, "motion": 6, "density": 9, "pages": ["dashboard", "settings"]}
+"min_contrast" (e.g. 4.5) works as search.py --min-contrast.
+"pages" may also be a comma-separated string, like search.py --pages.
+"output_dir" and "force" may also be set per project (else the CLI's apply).
+The output is one JSON summary: per-project status, files written (and
+which were unchanged or skipped) and timings (see generate_design_system), in input order.
+"""
+
+import functools
+import json
+import multiprocessing
+import time
+
+from core import MAX_RESULTS
+from daemon import handle_request
+
+
+def parse_request(line: str) -> dict:
+    """Turn one JSONL line into a handle_request() payload."""
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    if "op" in request:
+        return request
+    if not request.get("query"):
+        raise ValueError("request is missing 'query'")
+    max_results = request.get("max_results", MAX_RESULTS)
+    if request.get("stack"):
+        payload = {"op": "stack", "query": request["query"], "stack": request["stack"], "max_results": max_results}
+    else:
+        payload = {"op": "search", "query": request["query"], "domain": request.get("domain"), "max_results": max_results}
+    if request.get("relax"):
+        payload["relax"] = True
+    if "id" in request:
+        payload["id"] = request["id"]
+    return payload
+
+
+def run_line(line: str) -> str:
+    """Result of one request line, serialized as one JSONL line."""
+    request_id = None
+    try:
+        request = parse_request(line)
+        request_id = request.get("id")
+        result = handle_request(request)
+    except Exception as e:  # one bad line must not sink the whole batch
+        result = {"error": f"{type(e).__name__}: {e}"}
+    if request_id is not None:
+        result = {"id": request_id, **result}
+    return json.dumps(result, ensure_ascii=False)
+
+
+def run_batch(lines, out, workers: int = 1) -> int:
+    """Stream results for `lines` to `out` in input order. Returns the count."""
+    requests = (line for line in lines if line.strip())
+    count = 0
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            for result in pool.imap(run_line, requests, chunksize=4):
+                out.write(result + "\n")
+                out.flush()
+                count += 1
+    else:
+        for line in requests:
+            out.write(run_line(line) + "\n")
+            out.flush()
+            count += 1
+    return count
+
+
+# ============ DESIGN SYSTEM BATCH ============
+_DIALS = ("variance", "motion", "density")
+_generator = None  # this process's DesignSystemGenerator, shared by every project
+
+
+def parse_project(line: str) -> dict:
+    """Turn one projects.jsonl line into generate_design_system() kwargs
+    (plus the project's "id", when given)."""
+    project = json.loads(line)
+    if not isinstance(project, dict):
+        raise ValueError("project must be a JSON object")
+    if not project.get("query"):
+        raise ValueError("project is missing 'query'")
+    pages = project.get("pages") or []
+    if isinstance(pages, str):
+        pages = [page.strip() for page in pages.split(",") if page.strip()]
+    kwargs = {"query": project["query"], "project_name": project.get("project_name"), "pages": pages}
+    for key in _DIALS + ("min_contrast", "output_dir", "force", "id"):
+        if project.get(key) is not None:
+            kwargs[key] = project[key]
+    return kwargs
+
+
+def run_project(line: str, output_dir: str = None, force: bool = False) -> dict:
+    """Generate and persist one project; its summary (never raises)."""
+    global _generator
+    from design_system import DesignSystemGenerator, generate_design_system
+
+    summary = {}
+    project_id = None
+    try:
+        kwargs = parse_project(line)
+        project_id = kwargs.pop("id", None)
+        summary["query"] = kwargs["query"]
+        kwargs.setdefault("output_dir", output_dir)
+        kwargs.setdefault("force", force)
+        if _generator is None:
+            _generator = DesignSystemGenerator()
+        result = generate_design_system(persist=True, generator=_generator, **kwargs)
+        persistence = result["persistence"]
+        summary.update(
+            project_name=result["design_system"]["project_name"],
+            status=persistence["status"],
+            design_system_dir=persistence["design_system_dir"],
+            created_files=persistence["created_files"],
+            files=persistence["files"],
+            timings=result["timings"],
+        )
+    except Exception as e:  # one bad project must not sink the whole batch
+        summary.update(status="error", error=f"{type(e).__name__}: {e}")
+    if project_id is not None:
+        summary = {"id": project_id, **summary}
+    return summary
+
+
+def run_design_system_batch(lines, out, workers: int = 1, output_dir: str = None, force: bool = False) -> dict:
+    """Generate every project in `lines` and write one JSON summary to `out`."""
+    start = time.perf_counter()
+    projects = [line for line in lines if line.strip()]
+    run = functools.partial(run_project, output_dir=output_dir, force=force)
+    if workers > 1 and len(projects) > 1:
+        with multiprocessing.Pool(min(workers, len(projects))) as pool:
+            results = pool.map(run, projects)
+    else:
+        results = [run(line) for line in projects]
+
+    statuses = [result["status"] for result in results]
+    summary = {
+        "count": len(results),
+        "succeeded": statuses.count("success"),
+        "skipped": statuses.count("skipped_exists"),
+        "failed": statuses.count("error"),
+        "workers": workers,
+        "total_ms": round((time.perf_counter() - start) * 1000, 2),
+        "projects": results,
+    }
+    out.write(json.dumps(summary, indent=2, ensure_ascii=False) + "\n")
+    out.flush()
+    return summary
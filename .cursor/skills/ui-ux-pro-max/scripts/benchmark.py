@@ -0,0 +1,919 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Performance benchmarks for the search engine (search_engine.py, shared with
+the design-system and design skills). Stdlib-only, like the rest of
+scripts/, so it runs anywhere search.py runs:
+
+    python benchmark.py            # run every benchmark
+    python benchmark.py bm25       # run one by name
+
+Each benchmark also checks that the optimized path returns exactly what the
+reference implementation returns -- a speedup that changes rankings is a
+regression, not a win -- and exits 1 if it doesn't.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from array import array
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import core
+import search_engine
+from core import CSV_CONFIG, DATA_DIR, MAX_RESULTS, BM25, _load_csv, _top_k_cache, _STOPWORDS, _SYNONYMS
+
+# Queries representative of what agents actually send to the google-fonts
+# domain: family names, classifications, scripts/subsets and designers.
+GOOGLE_FONTS_QUERIES = [
+    "geometric sans serif",
+    "handwriting script casual",
+    "monospace code programming",
+    "noto sans arabic",
+    "display serif elegant luxury",
+    "variable font cyrillic greek",
+    "roboto",
+    "rounded friendly playful",
+]
+
+
+def _report(name, rows):
+    print(f"\n== {name} ==")
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label.ljust(width)}  {value}")
+
+
+def _google_fonts_index(backend="python"):
+    config = CSV_CONFIG["google-fonts"]
+    data = _load_csv(DATA_DIR / config["file"])
+    documents = [" ".join(str(row.get(col, "")) for col in config["search_cols"]) for row in data]
+    bm25 = BM25()
+    bm25.fit(documents)
+    bm25.backend = backend
+    return bm25
+
+
+def _full_scan_score(bm25):
+    """The pre-postings-list scorer: visits every document for every query."""
+    term_freqs = []
+    for doc in bm25.corpus:
+        tf = defaultdict(int)
+        for word in doc:
+            tf[word] += 1
+        term_freqs.append(tf)
+
+    def score(query):
+        query_tokens = bm25.tokenize(query)
+        scores = []
+        for idx in range(bm25.N):
+            total = 0
+            doc_len = bm25.doc_lengths[idx]
+            for token in query_tokens:
+                if token in bm25.idf:
+                    tf = term_freqs[idx].get(token, 0)
+                    numerator = tf * (bm25.k1 + 1)
+                    denominator = tf + bm25.k1 * (1 - bm25.b + bm25.b * doc_len / bm25.avgdl)
+                    total += bm25.idf[token] * numerator / denominator
+            scores.append((idx, total))
+        return sorted(scores, key=lambda x: x[1], reverse=True)
+
+    return score
+
+
+def bench_bm25(repeat=5):
+    """Inverted-index scoring and top-k selection vs. a full document scan
+    on google-fonts.csv."""
+    bm25 = _google_fonts_index()
+    reference = _full_scan_score(bm25)
+
+    for query in GOOGLE_FONTS_QUERIES:
+        expected = reference(query)
+        if bm25.score(query) != expected:
+            print(f"FAILED: ranking mismatch for query {query!r}")
+            return False
+        if bm25.top_k(query, MAX_RESULTS) != [hit for hit in expected[:MAX_RESULTS] if hit[1] > 0]:
+            print(f"FAILED: top_k mismatch for query {query!r}")
+            return False
+
+    def run(scorer):
+        return min(timeit.repeat(lambda: [scorer(q) for q in GOOGLE_FONTS_QUERIES],
+                                 number=1, repeat=repeat))
+
+    full_scan = run(reference)
+    postings = run(bm25.score)
+    def uncached_top_k(query):
+        _top_k_cache.clear()
+        return bm25.top_k(query, MAX_RESULTS)
+
+    top_k = run(uncached_top_k)
+    cached = run(lambda q: bm25.top_k(q, MAX_RESULTS))
+    per_query = len(GOOGLE_FONTS_QUERIES)
+    _report("bm25: google-fonts scoring", [
+        ("documents", bm25.N),
+        ("queries", per_query),
+        ("full scan", f"{full_scan / per_query * 1000:.3f} ms/query"),
+        ("postings lists", f"{postings / per_query * 1000:.3f} ms/query"),
+        (f"postings + top_k({MAX_RESULTS})", f"{top_k / per_query * 1000:.3f} ms/query"),
+        ("speedup (score)", f"{full_scan / postings:.1f}x"),
+        ("speedup (top_k)", f"{full_scan / top_k:.1f}x"),
+        ("repeat query (cached)", f"{cached / per_query * 1000:.3f} ms/query"),
+    ])
+    return True
+
+
+def bench_numpy(repeat=5):
+    """NumPy CSR scoring backend vs. the pure-Python postings walk on
+    google-fonts.csv (scores must agree within float tolerance)."""
+    if core._import_numpy() is None:
+        print("\n== numpy: skipped (NumPy not installed) ==")
+        return True
+    python = _google_fonts_index("python")
+    vectorized = _google_fonts_index("numpy")
+
+    for query in GOOGLE_FONTS_QUERIES:
+        expected, actual = dict(python.score(query)), dict(vectorized.score(query))
+        if any(abs(actual[idx] - score) > 1e-9 for idx, score in expected.items()):
+            print(f"FAILED: numpy score mismatch for query {query!r}")
+            return False
+
+    def run(bm25):
+        def uncached_top_k(query):
+            _top_k_cache.clear()
+            return bm25.top_k(query, MAX_RESULTS)
+        score = min(timeit.repeat(lambda: [bm25.score(q) for q in GOOGLE_FONTS_QUERIES],
+                                  number=1, repeat=repeat))
+        top_k = min(timeit.repeat(lambda: [uncached_top_k(q) for q in GOOGLE_FONTS_QUERIES],
+                                  number=1, repeat=repeat))
+        return score, top_k
+
+    py_score, py_top_k = run(python)
+    np_score, np_top_k = run(vectorized)
+    per_query = len(GOOGLE_FONTS_QUERIES)
+    _report("numpy: google-fonts scoring backends", [
+        ("python score", f"{py_score / per_query * 1000:.3f} ms/query"),
+        ("numpy score", f"{np_score / per_query * 1000:.3f} ms/query"),
+        (f"python top_k({MAX_RESULTS})", f"{py_top_k / per_query * 1000:.3f} ms/query"),
+        (f"numpy top_k({MAX_RESULTS})", f"{np_top_k / per_query * 1000:.3f} ms/query"),
+        ("speedup (top_k)", f"{py_top_k / np_top_k:.1f}x"),
+    ])
+    return True
+
+
+def _tuple_postings_scorer(bm25):
+    """The previous index layout: postings as lists of (idx, tf) tuples, with
+    the length normalization recomputed for every (document, token) pair."""
+    postings = {term: list(zip(idxs, tfs)) for term, (idxs, tfs) in bm25._postings.items()}
+
+    def accumulate(query):
+        scores = {}
+        for token in bm25.tokenize(query):
+            if token not in postings:
+                continue
+            idf = bm25.idf[token]
+            for idx, tf in postings[token]:
+                numerator = tf * (bm25.k1 + 1)
+                denominator = tf + bm25.k1 * (1 - bm25.b + bm25.b * bm25.doc_lengths[idx] / bm25.avgdl)
+                scores[idx] = scores.get(idx, 0) + idf * numerator / denominator
+        return scores
+
+    return accumulate
+
+
+def _traced_size(build):
+    """Bytes still allocated by build()'s result."""
+    tracemalloc.start()
+    try:
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def bench_layout(repeat=5):
+    """Precomputed norms + array('I') postings vs. tuple postings with
+    per-pair normalization, on google-fonts.csv (time and memory)."""
+    bm25 = _google_fonts_index()
+    legacy = _tuple_postings_scorer(bm25)
+    for query in GOOGLE_FONTS_QUERIES:
+        if bm25._accumulate(query) != legacy(query):
+            print(f"FAILED: score mismatch for query {query!r}")
+            return False
+
+    def run(accumulate):
+        return min(timeit.repeat(lambda: [accumulate(q) for q in GOOGLE_FONTS_QUERIES],
+                                 number=1, repeat=repeat))
+
+    before = run(legacy)
+    after = run(bm25._accumulate)
+    tuple_bytes = _traced_size(lambda: {term: list(zip(idxs, tfs)) for term, (idxs, tfs) in bm25._postings.items()})
+    array_bytes = _traced_size(lambda: ({term: (array('I', idxs), array('I', tfs))
+                                         for term, (idxs, tfs) in bm25._postings.items()},
+                                        array('d', bm25._norms)))
+    per_query = len(GOOGLE_FONTS_QUERIES)
+    _report("layout: google-fonts postings storage", [
+        ("tuple postings", f"{before / per_query * 1000:.3f} ms/query, {tuple_bytes / 1024:.0f} KiB"),
+        ("array postings + norms", f"{after / per_query * 1000:.3f} ms/query, {array_bytes / 1024:.0f} KiB"),
+        ("speedup", f"{before / after:.1f}x"),
+        ("memory", f"{array_bytes / tuple_bytes:.0%} of before"),
+    ])
+    return True
+
+
+SLIDES_SCRIPTS_DIR = Path(__file__).resolve().parent.parent.parent / "design-system" / "scripts"
+
+# A 9-slide investor pitch: (query, previous slide's emotion).
+PITCH_DECK = [
+    ("hook title vision", None),
+    ("problem pain point", "curiosity"),
+    ("agitation cost of inaction metric", "frustration"),
+    ("solution product demo", "fear"),
+    ("features benefits grid", "relief"),
+    ("traction revenue growth chart", "clarity"),
+    ("social proof testimonial", "confidence"),
+    ("team founders", "connection"),
+    ("cta call to action investor", "warmth"),
+]
+
+
+def _legacy_slide_search_csv(filepath, search_cols, output_cols, query, max_results):
+    """slide_search_core's previous _search_csv: re-read the CSV, refit a new
+    index and rebuild every document's term frequencies on every call."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = list(csv.DictReader(f))
+    bm25 = search_engine.BM25()
+    bm25.fit([" ".join(str(row.get(col, "")) for col in search_cols) for row in data])
+    ranked = _full_scan_score(bm25)(query)
+    return [{col: data[idx].get(col, "") for col in output_cols if col in data[idx]}
+            for idx, score in ranked[:max_results] if score > 0]
+
+
+def bench_slides(repeat=5):
+    """Context for a whole 9-slide deck (search_with_context per slide):
+    cached slide indexes vs. the per-call re-read + refit they replaced."""
+    if str(SLIDES_SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SLIDES_SCRIPTS_DIR))
+    import slide_search_core as slides
+
+    def deck():
+        total = len(PITCH_DECK)
+        return [slides.search_with_context(query, position, total, emotion)
+                for position, (query, emotion) in enumerate(PITCH_DECK, 1)]
+
+    def cold_deck():
+        search_engine._csv_cache.clear()
+        search_engine._bm25_cache.clear()
+        _top_k_cache.clear()
+        return deck()
+
+    with mock.patch.object(slides, "_search_csv", _legacy_slide_search_csv):
+        expected = deck()
+        legacy = min(timeit.repeat(deck, number=1, repeat=repeat))
+    if deck() != expected:
+        print("FAILED: deck context differs from the uncached implementation")
+        return False
+
+    with mock.patch.dict(os.environ, {"UI_PRO_MAX_NO_CACHE": "1"}):
+        cold = min(timeit.repeat(cold_deck, number=1, repeat=repeat))
+    disk = min(timeit.repeat(cold_deck, number=1, repeat=repeat))
+    _top_k_cache.clear()
+    warm = min(timeit.repeat(deck, number=1, repeat=repeat))
+
+    # plan_deck() over a 20-slide deck (queries repeat, as real decks do)
+    # vs. one search_with_context() sweep per slide.
+    long_deck = [query for query, _ in PITCH_DECK] * 2 + [PITCH_DECK[1][0], PITCH_DECK[-1][0]]
+
+    # The emotion chain search_with_context() callers thread by hand,
+    # worked out up front so per_slide() only times the searches.
+    previous_emotions = [None]
+    for position, query in enumerate(long_deck, 1):
+        previous_emotions.append(slides._slide_context(query, position, len(long_deck), previous_emotions[-1])[1])
+
+    def per_slide():
+        _top_k_cache.clear()
+        return [slides.search_with_context(query, position, len(long_deck), previous_emotions[position - 1])
+                for position, query in enumerate(long_deck, 1)]
+
+    def planned():
+        _top_k_cache.clear()
+        return slides.plan_deck(long_deck)
+
+    def comparable(results):
+        # plan_deck() additionally drops consecutive full-bleed slides.
+        return [dict(slide, context=dict(slide["context"], should_use_full_bleed=None)) for slide in results]
+
+    if comparable(planned()) != comparable(per_slide()):
+        print("FAILED: plan_deck differs from chained search_with_context")
+        return False
+    per_slide_time = min(timeit.repeat(per_slide, number=1, repeat=repeat))
+    planned_time = min(timeit.repeat(planned, number=1, repeat=repeat))
+
+    lookups = len(PITCH_DECK) * len(slides.AVAILABLE_DOMAINS)
+    _report("slides: 9-slide deck context", [
+        ("domain searches", lookups),
+        ("refit per search", f"{legacy * 1000:.1f} ms/deck"),
+        ("cached, first deck", f"{cold * 1000:.1f} ms/deck (fit once per CSV)"),
+        ("cached, from disk", f"{disk * 1000:.1f} ms/deck"),
+        ("cached, warm process", f"{warm * 1000:.1f} ms/deck"),
+        ("speedup (warm)", f"{legacy / warm:.1f}x"),
+        (f"{len(long_deck)} slides, per-slide calls", f"{per_slide_time * 1000:.1f} ms/deck"),
+        (f"{len(long_deck)} slides, plan_deck", f"{planned_time * 1000:.1f} ms/deck"),
+    ])
+    return True
+
+
+DETECT_DOMAIN_QUERIES = [
+    "saas dashboard analytics",
+    "font pairing for a luxury fashion brand",
+    "glassmorphism dark mode landing page",
+    "accessibility contrast wcag keyboard navigation",
+    "next.js rsc waterfall bundle",
+    "scroll-triggered parallax with gsap",
+    "fintech crypto wallet",
+    "icon set for a healthcare app",
+]
+
+
+def _regex_domain_scores(query_lower):
+    """detect_domain()'s previous scoring loop: one re.search per keyword."""
+    scores = {}
+    for domain, keywords in core._domain_keywords().items():
+        total = 0.0
+        for kw in keywords:
+            if re.search(r'\b' + re.escape(kw) + r'\b', query_lower):
+                total += max(1, len(kw.split()))
+        scores[domain] = total
+    return scores
+
+
+def bench_domains(repeat=5):
+    """detect_domain() keyword scoring: compiled KeywordMatcher vs. one
+    regex search per keyword (the product table alone has ~1000)."""
+    matcher = core._domain_matcher()
+    queries = [q.lower() for q in DETECT_DOMAIN_QUERIES]
+    for query in queries:
+        if matcher.scores(query) != _regex_domain_scores(query):
+            print(f"FAILED: domain scores differ for query {query!r}")
+            return False
+
+    def run(scorer):
+        return min(timeit.repeat(lambda: [scorer(q) for q in queries], number=1, repeat=repeat))
+
+    regex = run(_regex_domain_scores)
+    compiled = run(matcher.scores)
+    keywords = sum(len(kws) for kws in core._domain_keywords().values())
+    _report("domains: detect_domain keyword scoring", [
+        ("keywords", keywords),
+        ("regex per keyword", f"{regex / len(queries) * 1000:.3f} ms/query"),
+        ("KeywordMatcher", f"{compiled / len(queries) * 1000:.3f} ms/query"),
+        ("speedup", f"{regex / compiled:.1f}x"),
+    ])
+    return True
+
+
+def _legacy_tokenize(text):
+    """The previous tokenizer: punctuation stripped with re.sub before
+    str.split()."""
+    text = str(text).lower()
+    for variant, canonical in _SYNONYMS.items():
+        text = text.replace(variant, canonical)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return [w for w in text.split() if len(w) >= 2 and w not in _STOPWORDS]
+
+
+def bench_tokenizer(repeat=5):
+    """str.translate punctuation splitting vs. the per-call re.sub, over
+    every document in data/ and data/stacks/."""
+    documents = []
+    for path in sorted(DATA_DIR.glob("*.csv")) + sorted(DATA_DIR.glob("stacks/*.csv")):
+        for row in _load_csv(path):
+            documents.append(" ".join(str(value) for value in row.values()))
+
+    tokenize = BM25().tokenize
+    for doc in documents:
+        if tokenize(doc) != _legacy_tokenize(doc):
+            print(f"FAILED: token stream mismatch for {doc[:60]!r}")
+            return False
+
+    def run(tokenizer):
+        return min(timeit.repeat(lambda: [tokenizer(doc) for doc in documents],
+                                 number=1, repeat=repeat))
+
+    legacy = run(_legacy_tokenize)
+    current = run(tokenize)
+    _report("tokenizer: all shipped CSV rows", [
+        ("documents", len(documents)),
+        ("legacy", f"{legacy * 1000:.1f} ms"),
+        ("translate", f"{current * 1000:.1f} ms"),
+        ("speedup", f"{legacy / current:.1f}x"),
+    ])
+    return True
+
+
+def _legacy_suggest_terms(bm25, query, limit=6):
+    """core._suggest_terms before the suggestion index: every vocabulary term
+    sharing a 3-character prefix with a query token, in discovery order."""
+    query_tokens = set(bm25.tokenize(query))
+    candidates = []
+    for term in bm25.vocabulary():
+        for qt in query_tokens:
+            if term.startswith(qt[:3]) or qt.startswith(term[:3]):
+                candidates.append(term)
+                break
+    return list(dict.fromkeys(candidates))[:limit]
+
+
+def _typo_queries(bm25, count=200):
+    """(misspelled query, intended term): one deterministic edit (dropped,
+    doubled or swapped letter) per alphabetic term of 5+ characters."""
+    terms = sorted(t for t in bm25.doc_freqs if len(t) >= 5 and t.isalpha())
+    step = max(1, len(terms) // count)
+    queries = []
+    for n, term in enumerate(terms[::step]):
+        i = 1 + n % (len(term) - 2)
+        edits = (term[:i] + term[i + 1:], term[:i] + term[i] + term[i:],
+                 term[:i] + term[i + 1] + term[i] + term[i + 2:])
+        typo = edits[n % 3]
+        if typo not in bm25.doc_freqs:
+            queries.append((typo, term))
+    return queries
+
+
+def bench_suggest(repeat=5):
+    """Zero-hit suggestions: trigram SuggestionIndex vs. the 3-character
+    prefix scan over the whole vocabulary, on single-typo queries. Reports
+    how often the intended term is among the 6 suggestions."""
+    ok = True
+    rows = []
+    for domain in ("style", "product", "google-fonts"):
+        config = CSV_CONFIG[domain]
+        _, bm25 = core._load_index(DATA_DIR / config["file"], config["search_cols"])
+        queries = _typo_queries(bm25)
+        for typo, _ in queries:
+            for term in bm25.suggest(typo):
+                limit = search_engine.SuggestionIndex.max_distance(typo)
+                if search_engine._edit_distance(typo, term, limit) > limit and not term.startswith(typo):
+                    print(f"FAILED: {domain}: {term!r} is not a near match for {typo!r}")
+                    ok = False
+
+        def run(suggest):
+            return min(timeit.repeat(lambda: [suggest(bm25, typo) for typo, _ in queries],
+                                     number=1, repeat=repeat)) / len(queries)
+
+        def recall(suggest):
+            return sum(term in suggest(bm25, typo) for typo, term in queries) / len(queries)
+
+        def indexed(bm25, query):
+            return bm25.suggest(query)
+
+        build = min(timeit.repeat(lambda: search_engine.SuggestionIndex(bm25.doc_freqs), number=1, repeat=repeat))
+        rows += [
+            (f"{domain} ({len(bm25.doc_freqs)} terms, {len(queries)} typos)", ""),
+            ("  prefix scan", f"{run(_legacy_suggest_terms) * 1e6:.0f} us/query, "
+                              f"intended term found {recall(_legacy_suggest_terms):.0%}"),
+            ("  SuggestionIndex", f"{run(indexed) * 1e6:.0f} us/query, "
+                                  f"intended term found {recall(indexed):.0%} (built once in {build * 1000:.1f} ms)"),
+        ]
+    _report("suggest: zero-hit query suggestions", rows)
+    return ok
+
+
+FEDERATED_QUERIES = DETECT_DOMAIN_QUERIES + ["rgb hex token tailwind", "font pairing elegant crypto"]
+
+
+def bench_federated(repeat=5):
+    """search_all_domains() over every domain vs. one core.search() per
+    domain (how the design skills' search_all loops work), and the cost an
+    ambiguous auto-detected search pays for merging two domains. Checks that
+    the merged list keeps each domain's own ranking."""
+    k = MAX_RESULTS
+    for query in FEDERATED_QUERIES:
+        merged = core.search_all_domains(query, k * len(CSV_CONFIG))
+        for domain in CSV_CONFIG:
+            own = [{c: v for c, v in row.items() if c not in ("domain", "score")}
+                   for row in merged["results"] if row["domain"] == domain]
+            if own != core.search(query, domain, len(own))["results"][:len(own)]:
+                print(f"FAILED: merged ranking for {domain!r} differs from search() for {query!r}")
+                return False
+
+    def run(fn):
+        def once():
+            _top_k_cache.clear()
+            for query in FEDERATED_QUERIES:
+                fn(query)
+        return min(timeit.repeat(once, number=1, repeat=repeat)) / len(FEDERATED_QUERIES)
+
+    def cold(fn):
+        def once():
+            search_engine._bm25_cache.clear()
+            search_engine._csv_cache.clear()
+            fn(FEDERATED_QUERIES[0])
+        return min(timeit.repeat(once, number=1, repeat=repeat))
+
+    def loop(query):
+        return [core.search(query, domain, k) for domain in CSV_CONFIG]
+
+    def all_domains(query):
+        return core.search_all_domains(query, k)
+
+    def single(query):
+        return core.search(query, core.detect_domain(query), k)
+
+    _report(f"federated: {len(CSV_CONFIG)} domains, {len(FEDERATED_QUERIES)} queries (per query, warm indexes)", [
+        ("search() per domain", f"{run(loop) * 1000:.2f} ms"),
+        ("search_all_domains", f"{run(all_domains) * 1000:.2f} ms"),
+        ("  first query in a process", f"{cold(all_domains) * 1000:.2f} ms (indexes from the on-disk cache)"),
+        ("detected domain only", f"{run(single) * 1000:.2f} ms"),
+        ("auto-detect (merges on ties)", f"{run(core.search) * 1000:.2f} ms"),
+    ])
+    return True
+
+
+DESIGN_SYSTEM_QUERY = "saas analytics dashboard"
+
+
+def _clear_index_caches():
+    """Back to a fresh process's state: indexes come from the on-disk cache."""
+    search_engine._bm25_cache.clear()
+    search_engine._csv_cache.clear()
+    _top_k_cache.clear()
+
+
+def bench_designsystem(repeat=5):
+    """The generator's independent domain lookups on cold indexes, run one
+    after another (what generate() does) vs. through a thread pool and a
+    process pool, plus generate()'s own phase timings cold and warm."""
+    from design_system import SEARCH_CONFIG, DesignSystemGenerator
+
+    lookups = [(DESIGN_SYSTEM_QUERY, domain, config["max_results"]) for domain, config in SEARCH_CONFIG.items()]
+    lookups.append((f"{DESIGN_SYSTEM_QUERY} Standard", "gsap", 5))
+    expected = [core.search(*lookup) for lookup in lookups]
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    context = multiprocessing.get_context(start_method)
+
+    def sequential():
+        return [core.search(*lookup) for lookup in lookups]
+
+    def threads():
+        with ThreadPoolExecutor(len(lookups)) as pool:
+            return list(pool.map(lambda lookup: core.search(*lookup), lookups))
+
+    def processes():
+        with context.Pool(len(lookups)) as pool:
+            return pool.starmap(core.search, lookups)
+
+    rows = [("cpus", os.cpu_count())]
+    for label, run in (("sequential", sequential), ("thread pool", threads), (f"process pool ({context.get_start_method()})", processes)):
+        if run() != expected:
+            print(f"FAILED: {label} lookups differ from sequential search()")
+            return False
+
+        def cold():
+            _clear_index_caches()
+            run()
+        rows.append((f"{len(lookups)} cold lookups, {label}", f"{min(timeit.repeat(cold, number=1, repeat=repeat)) * 1000:.1f} ms"))
+
+    generator = DesignSystemGenerator()
+    for label, clear in (("generate() cold", True), ("generate() warm", False)):
+        best = None
+        for _ in range(repeat):
+            if clear:
+                _clear_index_caches()
+            generator.generate(DESIGN_SYSTEM_QUERY, motion=5)
+            timings = dict(generator.last_timings)
+            if best is None or sum(timings.values()) < sum(best.values()):
+                best = timings
+        rows.append((label, ", ".join(f"{phase} {ms:.1f}" for phase, ms in best.items()) + " ms"))
+    _report("designsystem: generator lookups", rows)
+    return True
+
+
+def _legacy_find_reasoning_rule(rows, category):
+    """DesignSystemGenerator._find_reasoning_rule() before the compiled table:
+    up to three scans, re-lowercasing and re-splitting every row."""
+    category_lower = category.lower()
+    for rule in rows:
+        if rule.get("UI_Category", "").lower() == category_lower:
+            return rule
+    for rule in rows:
+        ui_cat = rule.get("UI_Category", "").lower()
+        if ui_cat in category_lower or category_lower in ui_cat:
+            return rule
+    for rule in rows:
+        ui_cat = rule.get("UI_Category", "").lower()
+        keywords = ui_cat.replace("/", " ").replace("-", " ").split()
+        if any(kw in category_lower for kw in keywords):
+            return rule
+    return {}
+
+
+def bench_reasoning(repeat=5):
+    """Reasoning-rule lookup for every product category (what generate()
+    asks for): the compiled _ReasoningTable vs. the linear scans, plus the
+    cost of building a DesignSystemGenerator."""
+    import design_system
+
+    generator = design_system.DesignSystemGenerator()
+    rows = generator.reasoning_data
+    categories = [row.get("Product Type", "") for row in _load_csv(DATA_DIR / CSV_CONFIG["product"]["file"])]
+    categories += ["Totally Unknown Category", "ai saas", "luxury e-commerce"]
+    for category in categories:
+        if generator._find_reasoning_rule(category) != _legacy_find_reasoning_rule(rows, category):
+            print(f"FAILED: reasoning rule differs for category {category!r}")
+            return False
+
+    def run(find):
+        return min(timeit.repeat(lambda: [find(c) for c in categories], number=1, repeat=repeat)) / len(categories)
+
+    def legacy_apply(category):
+        rule = _legacy_find_reasoning_rule(rows, category)
+        return json.loads(rule.get("Decision_Rules", "{}")) if rule else {}
+
+    def first_lookups():
+        table = design_system._ReasoningTable(rows)
+        for category in categories:
+            table.find(category)
+
+    legacy = run(legacy_apply)
+    compiled = run(lambda category: generator._apply_reasoning(category, {}))
+    build = min(timeit.repeat(lambda: design_system._ReasoningTable(rows), number=1, repeat=repeat))
+    first = (min(timeit.repeat(first_lookups, number=1, repeat=repeat)) - build) / len(categories)
+    init = min(timeit.repeat(design_system.DesignSystemGenerator, number=1, repeat=repeat))
+
+    def legacy_init():
+        with open(DATA_DIR / design_system.REASONING_FILE, 'r', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    legacy_init_time = min(timeit.repeat(legacy_init, number=1, repeat=repeat))
+    _report(f"reasoning: {len(rows)} rules, {len(categories)} categories", [
+        ("linear scans + json.loads", f"{legacy * 1e6:.1f} us/lookup"),
+        ("compiled table (memoized)", f"{compiled * 1e6:.1f} us/lookup"),
+        ("  first lookup per category", f"{first * 1e6:.1f} us/lookup"),
+        ("table build", f"{build * 1000:.2f} ms (once per CSV change)"),
+        ("DesignSystemGenerator()", f"{init * 1e6:.1f} us (table cached), was {legacy_init_time * 1e6:.0f} us re-reading the CSV"),
+    ])
+    return True
+
+
+def _legacy_relative_luminance(hex_color):
+    """design_system._relative_luminance() before memoization: reparses the
+    hex on every call."""
+    if not hex_color:
+        return None
+    value = hex_color.strip().lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    if len(value) != 6:
+        return None
+    try:
+        rgb = [int(value[i:i + 2], 16) / 255 for i in (0, 2, 4)]
+    except ValueError:
+        return None
+    linear = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in rgb]
+    return 0.2126 * linear[0] + 0.7152 * linear[1] + 0.0722 * linear[2]
+
+
+def _legacy_palette_fits(palette, mode, min_contrast):
+    """Per-call palette classification: background luminance for the mode,
+    then both text pairs' contrast, all reparsed from hex."""
+    if mode == "dark":
+        luminance = _legacy_relative_luminance(palette.get("Background", ""))
+        if luminance is None or luminance >= 0.18:
+            return False
+    for text_col, surface_col in (("Foreground", "Background"), ("On Primary", "Primary")):
+        fg = _legacy_relative_luminance(palette.get(text_col, ""))
+        bg = _legacy_relative_luminance(palette.get(surface_col, ""))
+        if fg is None or bg is None or (max(fg, bg) + 0.05) / (min(fg, bg) + 0.05) < min_contrast:
+            return False
+    return True
+
+
+def bench_palettes(repeat=5):
+    """Palette selection with --min-contrast over every colors.csv row (the
+    widened search's worst case), dark and light: precomputed palette table
+    vs. reparsing and re-measuring each palette per call. "mode index" is
+    the table's own first_fit() walk, which the widened search falls back to."""
+    import design_system
+
+    table = design_system._palette_table()
+    rows = table.rows
+    cases = [(mode, ratio) for mode in ("dark", "light") for ratio in (3.0, 4.5, 7.0)]
+
+    def legacy_select(mode, ratio):
+        return next((row for row in rows if _legacy_palette_fits(row, mode, ratio)), {})
+
+    for mode, ratio in cases:
+        expected = legacy_select(mode, ratio)
+        if (design_system._select_palette_for_mode(rows, mode, ratio) is not expected
+                or table.first_fit(mode, ratio) is not expected):
+            print(f"FAILED: palette selection differs for {mode} / {ratio}:1")
+            return False
+
+    def run(select):
+        return min(timeit.repeat(lambda: [select(mode, ratio) for mode, ratio in cases],
+                                 number=20, repeat=repeat)) / (20 * len(cases))
+
+    legacy = run(legacy_select)
+    tabled = run(lambda mode, ratio: design_system._select_palette_for_mode(rows, mode, ratio))
+    indexed = run(table.first_fit)
+    build = min(timeit.repeat(lambda: design_system._PaletteTable(rows), number=1, repeat=repeat))
+    _report(f"palettes: {len(rows)} colors.csv rows, {len(cases)} mode/contrast cases", [
+        ("reparse per call", f"{legacy * 1e6:.1f} us/selection"),
+        ("palette table", f"{tabled * 1e6:.1f} us/selection"),
+        ("  mode index (first_fit)", f"{indexed * 1e6:.1f} us/selection"),
+        ("table build (memo warm)", f"{build * 1e6:.1f} us (once per CSV change)"),
+    ])
+    return True
+
+
+PAGE_NAMES = ["dashboard", "checkout", "settings", "profile", "login", "signup", "pricing", "blog", "article",
+              "product", "search", "cart", "orders", "billing", "notifications", "inbox", "analytics", "reports",
+              "team", "admin", "onboarding", "help", "faq", "contact", "about", "landing", "home", "404", "empty",
+              "calendar"]
+
+
+def _legacy_page_lookups(context):
+    """_generate_intelligent_overrides() before batching: three search() calls per page."""
+    import design_system
+
+    return {domain: core.search(context, domain, cfg["max_results"]).get("results", [])
+            for domain, cfg in design_system.PAGE_SEARCH_CONFIG.items()}
+
+
+def bench_pages(repeat=5):
+    """Page-override lookups for 3 vs 30 pages: three search() calls per page
+    vs. one _page_lookups() pass over each index for the whole batch."""
+    import design_system
+
+    contexts = [design_system._page_context(page, "saas analytics dashboard") for page in PAGE_NAMES]
+    batched = design_system._page_lookups(contexts)
+    for context in contexts:
+        if batched[context] != _legacy_page_lookups(context):
+            print(f"FAILED: page lookups differ for {context!r}")
+            return False
+
+    rows = []
+    for count in (3, 30):
+        subset = contexts[:count]
+
+        def legacy():
+            _top_k_cache.clear()
+            for context in subset:
+                _legacy_page_lookups(context)
+
+        def batch():
+            _top_k_cache.clear()
+            design_system._page_lookups(subset)
+
+        legacy_time = min(timeit.repeat(legacy, number=1, repeat=repeat))
+        batch_time = min(timeit.repeat(batch, number=1, repeat=repeat))
+        rows.append((f"{count} pages: search() per page", f"{legacy_time * 1000:.2f} ms"))
+        rows.append((f"{count} pages: batched lookups", f"{batch_time * 1000:.2f} ms ({legacy_time / batch_time:.1f}x)"))
+    _report("pages: override lookups (style + ux + landing)", rows)
+    return True
+
+
+GOLDEN_DIR = Path(__file__).resolve().parent / "tests" / "golden"
+
+
+def bench_render(repeat=5):
+    """The design-system formatters on the golden fixtures (tests/golden/),
+    collected into a string and streamed to a file. Output must stay
+    byte-identical to the goldens."""
+    import design_system
+
+    fixtures = json.loads((GOLDEN_DIR / "design_systems.json").read_text(encoding="utf-8"))
+    frozen = mock.Mock(wraps=design_system.datetime)
+    frozen.now.return_value = design_system.datetime(2026, 1, 1, 9, 30, 0)
+    formatters = [
+        ("ascii box", "box.txt", design_system.format_ascii_box),
+        ("markdown", "design-system.md", design_system.format_markdown),
+        ("MASTER.md", "MASTER.md", design_system.format_master_md),
+    ]
+    rows = []
+    with mock.patch.object(design_system, "datetime", frozen), mock.patch.dict(os.environ, {"COLORTERM": ""}), \
+            open(os.devnull, "w", encoding="utf-8") as devnull:
+        for name, filename, formatter in formatters:
+            for fixture_name, fixture in fixtures.items():
+                golden = (GOLDEN_DIR / fixture_name / filename).read_text(encoding="utf-8")
+                if formatter(fixture["design_system"]) != golden:
+                    print(f"FAILED: {name} differs from tests/golden/{fixture_name}/{filename}")
+                    return False
+            systems = [fixture["design_system"] for fixture in fixtures.values()]
+            collected = min(timeit.repeat(lambda: [formatter(ds) for ds in systems], number=50, repeat=repeat))
+            streamed = min(timeit.repeat(lambda: [formatter(ds, out=devnull) for ds in systems], number=50, repeat=repeat))
+            per_render = 50 * len(systems)
+            rows.append((name, f"{collected / per_render * 1e6:.1f} us returned, "
+                               f"{streamed / per_render * 1e6:.1f} us streamed"))
+
+        pages = [(fixture["design_system"], page, fixture["page_query"], lookups)
+                 for fixture in fixtures.values() for page, lookups in fixture["pages"].items()]
+        page_time = min(timeit.repeat(lambda: [design_system.format_page_override_md(*args) for args in pages],
+                                      number=50, repeat=repeat))
+        rows.append(("page override", f"{page_time / (50 * len(pages)) * 1e6:.1f} us (incl. override rules)"))
+    _report(f"render: design-system formatters, {len(fixtures)} golden fixtures", rows)
+    return True
+
+
+# search.py invocations per CLI mode, with the modules each one must not
+# import. --no-daemon keeps a running daemon from answering instead.
+STARTUP_MODES = [
+    ("domain", ["blue", "-d", "color", "--no-daemon"], {"design_system", "socketserver"}),
+    ("auto-domain", ["saas dashboard", "--no-daemon"], {"design_system", "socketserver"}),
+    ("stack", ["form validation", "-s", "react", "--no-daemon"], {"design_system", "socketserver"}),
+    ("design-system", ["saas dashboard", "--design-system", "--no-daemon"], {"socketserver"}),
+    ("batch", ["--batch"], {"design_system", "socketserver"}),
+    ("help", ["--help"], {"design_system", "socketserver"}),
+]
+BATCH_STDIN = '{"query": "blue", "domain": "color"}\n'
+
+
+def _run_search_cli(args, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["search.py"] + args
+    stdin = BATCH_STDIN if "--batch" in args else ""
+    return subprocess.run(command, cwd=Path(__file__).resolve().parent, input=stdin,
+                          capture_output=True, text=True, check=True)
+
+
+def _parse_importtime(stderr):
+    """{module: self_us} from `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def bench_startup(repeat=5):
+    """Cold search.py startup per CLI mode: wall time and `-X importtime`
+    totals. Fails if a mode imports a module it has no use for (a plain
+    domain search must never load design_system or the daemon's server)."""
+    rows = []
+    ok = True
+    for mode, args, forbidden in STARTUP_MODES:
+        _run_search_cli(args)  # warm the on-disk index cache and OS file cache
+        wall = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _run_search_cli(args)
+            wall.append(time.perf_counter() - start)
+        modules = _parse_importtime(_run_search_cli(args, importtime=True).stderr)
+        loaded = sorted(forbidden & modules.keys())
+        if loaded:
+            print(f"FAILED: search.py {mode} mode imports {', '.join(loaded)}")
+            ok = False
+        rows.append((mode, f"{min(wall) * 1000:.0f} ms wall, "
+                           f"{sum(modules.values()) / 1000:.1f} ms in {len(modules)} imports"))
+    _report("startup: search.py per CLI mode (-X importtime)", rows)
+    return ok
+
+
+BENCHMARKS = {
+    "bm25": bench_bm25,
+    "numpy": bench_numpy,
+    "layout": bench_layout,
+    "slides": bench_slides,
+    "domains": bench_domains,
+    "tokenizer": bench_tokenizer,
+    "suggest": bench_suggest,
+    "federated": bench_federated,
+    "designsystem": bench_designsystem,
+    "reasoning": bench_reasoning,
+    "pages": bench_pages,
+    "render": bench_render,
+    "palettes": bench_palettes,
+    "startup": bench_startup,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UI Pro Max search benchmarks")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"Benchmarks to run (default: all). Available: {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    ok = True
+    for name in args.names or list(BENCHMARKS):
+        ok = BENCHMARKS[name]() and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,33 @@
 # -*- coding: utf-8 -*-
 """
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
+
+Ranking, caching and the index cache live in search_engine.py (shared with
+the design-system and design skills); this module adds the UI/UX data
+configuration, its tokenizer, domain detection and search().
 """
 
 import csv
+import heapq
 import re
 from pathlib import Path
-from math import log
-from collections import defaultdict
+
+import search_engine
+from search_engine import (  # noqa: F401 -- re-exported for daemon.py, benchmark.py and tests
+    KeywordMatcher,
+    NUMPY_MIN_DOCS,
+    _CSRScorer,
+    _LRUCache,
+    _PUNCTUATION_TO_SPACE,
+    _bm25_cache,
+    _csv_cache,
+    _import_numpy,
+    _load_csv,
+    _query_token_cache,
+    _scoring_backend,
+    _top_k_cache,
+    cache_stats,
+)
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
@@ -157,136 +177,32 @@ def _normalize(text):
     return text
 
 
-# ============ BM25 IMPLEMENTATION ============
-class BM25:
-    """BM25 ranking algorithm for text search"""
+# Bump whenever tokenize() output changes (stopwords, synonyms, splitting
+# rules); it invalidates every cached index built with the old tokenizer.
+TOKENIZER_VERSION = 1
+
 
-    def __init__(self, k1=1.5, b=0.75):
-        self.k1 = k1
-        self.b = b
-        self.corpus = []
-        self.doc_lengths = []
-        self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
-        self.N = 0
-        self._term_freqs = []  # precomputed per-doc term frequencies
+class BM25(search_engine.BM25):
+    """BM25 over UI/UX vocabulary: keeps 2-letter terms (ui, ux, 3d, ai),
+    drops stopwords and folds synonyms."""
+
+    TOKENIZER = f"ui-ux-pro-max-{TOKENIZER_VERSION}"
 
     def tokenize(self, text):
         """Lowercase, normalize synonyms, split, remove punctuation, filter stopwords"""
-        text = _normalize(str(text).lower())
-        text = re.sub(r'[^\w\s]', ' ', text)
-        return [w for w in text.split() if len(w) >= 2 and w not in _STOPWORDS]
-
-    def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
-        if self.N == 0:
-            return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
-
-        self._term_freqs = []
-        for doc in self.corpus:
-            tf = defaultdict(int)
-            for word in doc:
-                tf[word] += 1
-            self._term_freqs.append(tf)
-            for word in tf:
-                self.doc_freqs[word] += 1
-
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
-
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
-
-        for idx in range(self.N):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = self._term_freqs[idx]
-
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs.get(token, 0)
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
-
-            scores.append((idx, score))
-
-        return sorted(scores, key=lambda x: x[1], reverse=True)
-
-    def vocabulary(self):
-        """All indexed terms, for suggestion/typo-recovery purposes."""
-        return list(self.idf.keys())
-
-
-# ============ CSV / INDEX CACHE ============
-# Data files are small and reused across multiple domain searches within a
-# single --design-system run; avoid re-reading + re-indexing the same file
-# repeatedly in one process.
-_csv_cache = {}   # filepath -> (mtime, rows)
-_bm25_cache = {}  # (filepath, tuple(search_cols)) -> (mtime, BM25 instance)
-
-
-def _load_csv(filepath):
-    """Load CSV and return list of dicts, with mtime-based caching."""
-    mtime = filepath.stat().st_mtime
-    cached = _csv_cache.get(filepath)
-    if cached and cached[0] == mtime:
-        return cached[1]
-
-    with open(filepath, 'r', encoding='utf-8') as f:
-        rows = list(csv.DictReader(f))
-
-    _csv_cache[filepath] = (mtime, rows)
-    return rows
-
-
-def _get_bm25(filepath, search_cols, data):
-    """Fitted BM25 index for this file+columns, with mtime-based caching."""
-    key = (filepath, tuple(search_cols))
-    mtime = filepath.stat().st_mtime
-    cached = _bm25_cache.get(key)
-    if cached and cached[0] == mtime:
-        return cached[1]
-
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
-    bm25 = BM25()
-    bm25.fit(documents)
-    _bm25_cache[key] = (mtime, bm25)
-    return bm25
+        words = _normalize(str(text).lower()).translate(_PUNCTUATION_TO_SPACE).split()
+        return [w for w in words if len(w) >= 2 and w not in _STOPWORDS]
+
+
+def _load_index(filepath, search_cols):
+    """(rows, fitted BM25) for file+columns; see search_engine._load_index."""
+    return search_engine._load_index(filepath, search_cols, BM25)
 
 
 # ============ SEARCH FUNCTIONS ============
 def _search_csv(filepath, search_cols, output_cols, query, max_results):
     """Core search function using BM25. Returns (results, bm25_or_none)."""
-    if not filepath.exists():
-        return [], None
-
-    try:
-        data = _load_csv(filepath)
-    except (csv.Error, OSError, UnicodeDecodeError) as e:
-        return [{"_error": f"Failed to read {filepath.name}: {e}"}], None
-
-    if not data:
-        return [], None
-
-    bm25 = _get_bm25(filepath, search_cols, data)
-    ranked = bm25.score(query)
-
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
-
-    return results, bm25
+    return search_engine.search_csv(filepath, search_cols, output_cols, query, max_results, BM25)
 
 
 def _suggest_terms(bm25, query, limit=6):
@@ -294,26 +210,7 @@ def _suggest_terms(bm25, query, limit=6):
     so the caller can retry instead of silently reporting nothing."""
     if bm25 is None:
         return []
-    query_tokens = set(bm25.tokenize(query))
-    if not query_tokens:
-        return []
-
-    candidates = []
-    for term in bm25.vocabulary():
-        for qt in query_tokens:
-            if term.startswith(qt[:3]) or qt.startswith(term[:3]):
-                candidates.append(term)
-                break
-
-    # Stable de-dup, most frequent terms first (doc_freqs available via idf keys only,
-    # so just de-dup preserving discovery order).
-    seen = set()
-    ordered = []
-    for term in candidates:
-        if term not in seen:
-            seen.add(term)
-            ordered.append(term)
-    return ordered[:limit]
+    return bm25.suggest(query, limit)
 
 
 # Load the product-domain keyword list from products.csv at import time so
@@ -342,13 +239,24 @@ def _load_product_keywords():
 
 
 _DOMAIN_KEYWORDS = None
+_DOMAIN_KEYWORDS_MTIME = None  # products.csv mtime the table was built from
+_DOMAIN_MATCHER = None         # _DOMAIN_KEYWORDS compiled for detect_domain()
+
+
+def _products_mtime():
+    filepath = DATA_DIR / CSV_CONFIG["product"]["file"]
+    return filepath.stat().st_mtime if filepath.exists() else None
 
 
 def _domain_keywords():
-    global _DOMAIN_KEYWORDS
-    if _DOMAIN_KEYWORDS is not None:
+    global _DOMAIN_KEYWORDS, _DOMAIN_KEYWORDS_MTIME, _DOMAIN_MATCHER
+    # Rebuilt when products.csv changes, so a long-running search daemon
+    # picks up new product keywords without a restart.
+    mtime = _products_mtime()
+    if _DOMAIN_KEYWORDS is not None and mtime == _DOMAIN_KEYWORDS_MTIME:
         return _DOMAIN_KEYWORDS
 
+    _DOMAIN_KEYWORDS_MTIME = mtime
     _DOMAIN_KEYWORDS = {
         "color": ["color", "palette", "hex", "#", "rgb", "token", "semantic", "accent", "destructive", "muted", "foreground"],
         "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
@@ -363,9 +271,16 @@ def _domain_keywords():
         "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
         "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
     }
+    # weight = 1 point per word in the keyword phrase
+    _DOMAIN_MATCHER = KeywordMatcher(_DOMAIN_KEYWORDS, whole_words=True, weight=lambda kw: max(1, len(kw.split())))
     return _DOMAIN_KEYWORDS
 
 
+def _domain_matcher():
+    _domain_keywords()
+    return _DOMAIN_MATCHER
+
+
 # Domains checked in this fixed order when scores tie, so results are
 # deterministic instead of depending on dict/hash ordering.
 _DOMAIN_TIEBREAK_ORDER = [
@@ -378,20 +293,11 @@ def detect_domain(query, return_scores=False):
     """Auto-detect the most relevant domain from query.
 
     Matches are weighted by keyword length (multi-word/longer phrases are
-    more specific and score higher than short generic words). Ties are
-    broken by a fixed domain priority order, not dict/insertion order.
+    more specific and score higher than short generic words), and all
+    keywords are matched in one pass by the compiled KeywordMatcher. Ties
+    are broken by a fixed domain priority order, not dict/insertion order.
     """
-    query_lower = query.lower()
-    domain_keywords = _domain_keywords()
-
-    scores = {}
-    for domain, keywords in domain_keywords.items():
-        total = 0.0
-        for kw in keywords:
-            if re.search(r'\b' + re.escape(kw) + r'\b', query_lower):
-                # weight = 1 point per word in the keyword phrase
-                total += max(1, len(kw.split()))
-        scores[domain] = total
+    scores = _domain_matcher().scores(query.lower())
 
     ranked = sorted(
         scores.items(),
@@ -408,12 +314,129 @@ def detect_domain(query, return_scores=False):
     return result
 
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+def _relaxed_query(bm25, query):
+    """query with each token replaced by its closest indexed term (tokens
+    with no near match are dropped), or None if nothing could be replaced."""
+    if bm25 is None:
+        return None
+    terms = []
+    for token in bm25.tokenize(query):
+        closest = bm25.suggest_tokens([token], limit=1)
+        if closest:
+            terms.append(closest[0])
+    return " ".join(dict.fromkeys(terms)) or None
+
+
+def _reroute(query, domain):
+    """(other domain, corrected query) for a zero-hit query that `domain`'s
+    vocabulary has nothing close to: the first other domain whose index can
+    correct it (e.g. "robotto" -> typography's "roboto"), or None."""
+    for other, config in CSV_CONFIG.items():
+        filepath = DATA_DIR / config["file"]
+        if other == domain or not filepath.exists():
+            continue
+        try:
+            _, bm25 = _load_index(filepath, config["search_cols"])
+        except (csv.Error, OSError, UnicodeDecodeError):
+            continue
+        corrected = _relaxed_query(bm25, query)
+        if corrected:
+            return other, corrected
+    return None
+
+
+def _relax(out, attempts):
+    """Run `attempts` -- (strategy, query, run) triples, in order -- until one
+    finds something, and return that result annotated with how the query
+    was relaxed; the original zero-hit `out` if none do.
+
+    Stopwords never reach the index and a zero-hit query has no indexed
+    token left to keep, so relaxation rewrites or re-routes the query
+    instead of dropping terms.
+    """
+    tried = []
+    for strategy, query, run in attempts:
+        tried.append(strategy)
+        result = run(query)
+        if result.get("count"):
+            result["relaxed"] = {"strategy": strategy, "original_query": out["query"],
+                                 "original_domain": out.get("stack") or out["domain"], "tried": tried}
+            return result
+    out["relaxed"] = {"strategy": None, "tried": tried}
+    return out
+
+
+def search_all_domains(query, k=MAX_RESULTS, domains=None):
+    """Best k rows for query across domains (default: all), as one ranked list.
+
+    Raw BM25 scores aren't comparable between CSVs of different sizes and
+    vocabularies, so every hit is scored as a fraction of its own index's
+    score_ceiling() for the query. Each domain index is queried once (top_k,
+    so the query caches apply) and the per-domain hits are merged. Rows are
+    tagged with "domain" and the normalized "score"; ties keep domain order.
+    """
+    domains = list(domains or CSV_CONFIG)
+    hits = []
+    for order, domain in enumerate(domains):
+        config = CSV_CONFIG[domain]
+        filepath = DATA_DIR / config["file"]
+        if not filepath.exists():
+            continue
+        try:
+            rows, bm25 = _load_index(filepath, config["search_cols"])
+        except (csv.Error, OSError, UnicodeDecodeError):
+            continue
+        if not rows:
+            continue
+        ceiling = bm25.score_ceiling(query)
+        for idx, score in bm25.top_k(query, k):
+            hits.append((score / ceiling, -order, -idx, domain, rows[idx]))
+
+    results = []
+    for score, _, _, domain, row in heapq.nlargest(k, hits):
+        output_cols = CSV_CONFIG[domain]["output_cols"]
+        results.append({"domain": domain, "score": round(score, 4),
+                        **{col: row.get(col, "") for col in output_cols if col in row}})
+    return {"query": query, "domains": domains, "count": len(results), "results": results}
+
+
+def search(query, domain=None, max_results=MAX_RESULTS, relax=False):
+    """Main search function with auto-domain detection.
+
+    When auto-detection is ambiguous (a runner-up domain also matched), the
+    detected and runner-up domains are searched together with
+    search_all_domains() and the merged, domain-tagged list is returned.
+    "file" stays the detected domain's CSV; "files" lists every CSV the
+    rows came from. Each row keeps its own domain's output columns, so the
+    rows of a federated result don't share one set of keys.
+
+    With relax=True a zero-hit search is retried in-process: with
+    misspelled tokens replaced by their closest known terms, then (when the
+    domain was auto-detected) with that corrected query re-routed to the
+    domain it detects as. When the detected domain has no close terms at
+    all, an auto-detected query is instead corrected against, and re-routed
+    to, the first other domain that has (see _reroute). The first one with
+    hits is returned, with a "relaxed" entry saying which.
+    """
     auto_detected = domain is None
     runner_up = None
     if domain is None:
         domain, runner_up = detect_domain(query, return_scores=True)
+        if runner_up:
+            federated = search_all_domains(query, max_results, (domain, runner_up))
+            if federated["count"]:
+                files = dict.fromkeys(CSV_CONFIG[row["domain"]]["file"] for row in federated["results"])
+                return {
+                    "domain": domain,
+                    "query": query,
+                    "file": CSV_CONFIG[domain]["file"],
+                    "files": list(files),
+                    "count": federated["count"],
+                    "results": federated["results"],
+                    "auto_detected": True,
+                    "runner_up_domain": runner_up,
+                    "federated": federated["domains"],
+                }
 
     config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
     filepath = DATA_DIR / config["file"]
@@ -436,11 +459,27 @@ def search(query, domain=None, max_results=MAX_RESULTS):
             out["runner_up_domain"] = runner_up
     if not results:
         out["suggestions"] = _suggest_terms(bm25, query)
+        if relax:
+            # An ambiguous query has already been tried on the runner-up too.
+            attempts = []
+            relaxed = _relaxed_query(bm25, query)
+            if relaxed:
+                attempts.append(("suggested_terms", relaxed, lambda q: search(q, domain, max_results)))
+                redetected = detect_domain(relaxed) if auto_detected else domain
+                if redetected != domain:
+                    attempts.append(("redetected_domain", relaxed, lambda q: search(q, redetected, max_results)))
+            elif auto_detected:
+                rerouted = _reroute(query, domain)
+                if rerouted:
+                    other, corrected = rerouted
+                    attempts.append(("redetected_domain", corrected, lambda q: search(q, other, max_results)))
+            return _relax(out, attempts)
     return out
 
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
-    """Search stack-specific guidelines"""
+def search_stack(query, stack, max_results=MAX_RESULTS, relax=False):
+    """Search stack-specific guidelines. relax=True retries a zero-hit query
+    with misspelled tokens replaced by their closest known terms."""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
 
@@ -461,4 +500,8 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     }
     if not results:
         out["suggestions"] = _suggest_terms(bm25, query)
+        if relax:
+            relaxed = _relaxed_query(bm25, query)
+            attempts = [("suggested_terms", relaxed, lambda q: search_stack(q, stack, max_results))] if relaxed else []
+            return _relax(out, attempts)
     return out
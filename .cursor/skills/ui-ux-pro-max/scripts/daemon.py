@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search daemon for search.py - keeps core's CSV/BM25 caches and the design
+system generator warm in one long-running process, so each CLI call only
+pays for a socket round trip instead of interpreter startup + CSV loading.
+
+Start it with `python search.py --serve`. search.py then forwards every
+request to the daemon when it is reachable and runs in-process when it is
+not, so results are identical either way (both paths go through
+handle_request()). Once a request has been sent it is never re-run
+in-process: a timeout or daemon-side failure comes back as an error.
+
+Protocol (Unix domain socket, one request per connection):
+    client -> daemon:  one JSON object + "\\n"
+                       {"op": "search", "query": ..., "domain": ..., "max_results": ..., "relax": ...}
+                       {"op": "stack", "query": ..., "stack": ..., "max_results": ..., "relax": ...}
+                       {"op": "design_system", "query": ..., <generate_design_system kwargs>}
+                       {"op": "stats"}   query-cache hit/miss counters
+                       {"op": "ping"}
+                       Every request also carries the client's "cwd" and
+                       "colorterm" so relative paths and ANSI output match.
+    daemon -> client:  one JSON object + "\\n"
+                       {"ok": true, "result": {...}} or {"ok": false, "error": "..."}
+
+Domains are reloaded automatically when their CSV changes: core's caches
+are mtime-validated, and the generator is rebuilt when ui-reasoning.csv
+changes.
+
+socket, socketserver, signal and tempfile are imported where they are used:
+a plain search with no daemon running never needs them, and together they
+are a sizeable share of CLI startup (see `benchmark.py startup`).
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from core import DATA_DIR, MAX_RESULTS, cache_stats, search, search_stack
+
+# How long the thin client waits on the daemon's answer before reporting an
+# error. Design-system generation is the slowest request.
+CLIENT_TIMEOUT = 30.0
+
+# Request keys forwarded verbatim to generate_design_system().
+_DESIGN_SYSTEM_ARGS = (
+    "project_name", "output_format", "persist", "page", "output_dir",
+    "variance", "motion", "density", "min_contrast", "force", "pages",
+)
+
+
+def default_socket_path() -> Path:
+    """Per-user socket path; UI_PRO_MAX_SOCKET overrides it."""
+    override = os.environ.get("UI_PRO_MAX_SOCKET")
+    if override:
+        return Path(override)
+    import tempfile
+
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return Path(tempfile.gettempdir()) / f"ui-ux-pro-max-{user}.sock"
+
+
+def daemon_supported() -> bool:
+    import socket
+
+    return hasattr(socket, "AF_UNIX")
+
+
+# ============ REQUEST DISPATCH ============
+class _GeneratorCache:
+    """One DesignSystemGenerator, rebuilt when ui-reasoning.csv changes."""
+
+    def __init__(self):
+        self._mtime = None
+        self._generator = None
+
+    def get(self):
+        from design_system import DesignSystemGenerator, REASONING_FILE
+
+        reasoning_path = DATA_DIR / REASONING_FILE
+        mtime = reasoning_path.stat().st_mtime if reasoning_path.exists() else None
+        if self._generator is None or mtime != self._mtime:
+            self._generator = DesignSystemGenerator()
+            self._mtime = mtime
+        return self._generator
+
+
+def handle_request(request: dict, generators: _GeneratorCache = None) -> dict:
+    """Run one request in this process and return the same dict the CLI prints."""
+    op = request.get("op")
+    if op == "search":
+        return search(request["query"], request.get("domain"), request.get("max_results", MAX_RESULTS),
+                      relax=request.get("relax", False))
+    if op == "stack":
+        return search_stack(request["query"], request["stack"], request.get("max_results", MAX_RESULTS),
+                            relax=request.get("relax", False))
+    if op == "design_system":
+        from design_system import generate_design_system
+
+        kwargs = {key: request[key] for key in _DESIGN_SYSTEM_ARGS if key in request}
+        generator = generators.get() if generators else None
+        return generate_design_system(request["query"], generator=generator, **kwargs)
+    if op == "stats":
+        return cache_stats()
+    if op == "ping":
+        return {"pid": os.getpid()}
+    raise ValueError(f"Unknown op: {op!r}")
+
+
+# ============ SERVER ============
+_server_class = None
+
+
+def _search_server_class():
+    """SearchServer, defined on first use so clients never import socketserver."""
+    global _server_class
+    if _server_class is not None:
+        return _server_class
+    import socketserver
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline().decode("utf-8"))
+                with _client_context(request):
+                    response = {"ok": True, "result": handle_request(request, self.server.generators)}
+            except Exception as e:  # report to the client as {"ok": false}
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    class SearchServer(socketserver.UnixStreamServer):
+        def __init__(self, socket_path):
+            self.generators = _GeneratorCache()
+            super().__init__(str(socket_path), _Handler)
+
+    _server_class = SearchServer
+    return _server_class
+
+
+def __getattr__(name):
+    # daemon.SearchServer keeps working for callers that construct the server directly.
+    if name == "SearchServer":
+        return _search_server_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@contextmanager
+def _client_context(request):
+    """Run a request as if it were in the client process.
+
+    Persistence resolves relative --output-dir against the cwd, and the ascii
+    box's ANSI swatches depend on COLORTERM -- both belong to the client.
+    Requests are served one at a time, so swapping them per call is safe.
+    """
+    previous_cwd = os.getcwd()
+    previous_colorterm = os.environ.get("COLORTERM")
+    try:
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+        _set_env("COLORTERM", request.get("colorterm"))
+        yield
+    finally:
+        os.chdir(previous_cwd)
+        _set_env("COLORTERM", previous_colorterm)
+
+
+def _set_env(name, value):
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
+
+
+def serve(socket_path: Path = None, on_ready=None):
+    """Serve requests until interrupted. Refuses to start over a live daemon."""
+    if not daemon_supported():
+        raise RuntimeError("--serve needs Unix domain socket support (AF_UNIX)")
+
+    socket_path = Path(socket_path or default_socket_path())
+    if socket_path.exists():
+        if request({"op": "ping"}, socket_path) is not None:
+            raise RuntimeError(f"A search daemon is already listening on {socket_path}")
+        socket_path.unlink()  # stale socket left by a daemon that was killed
+
+    old_umask = os.umask(0o177)  # socket is owner read/write only
+    try:
+        server = _search_server_class()(socket_path)
+    finally:
+        os.umask(old_umask)
+
+    import signal
+
+    # `kill <pid>` should clean up the socket just like Ctrl+C does.
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        if on_ready:
+            on_ready(socket_path)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+# ============ CLIENT ============
+def request(payload: dict, socket_path: Path = None, timeout: float = CLIENT_TIMEOUT):
+    """Send one request to the daemon.
+
+    Returns the result dict, or None when no daemon is reachable -- the
+    caller then runs handle_request() itself. Once connected, the daemon may
+    already be acting on the request (a persisting design_system run writes
+    files), so a timeout, broken connection or daemon-side error is returned
+    as {"error": ...} instead of None: re-running it in-process could repeat
+    its side effects.
+    """
+    socket_path = Path(socket_path or default_socket_path())
+    if not socket_path.exists() or not daemon_supported():
+        return None
+    import socket
+
+    payload = dict(payload, cwd=os.getcwd(), colorterm=os.environ.get("COLORTERM"))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(socket_path))
+        except OSError:  # stale socket file, nothing listening
+            return None
+        try:
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                response = json.loads(stream.readline().decode("utf-8"))
+        except socket.timeout:
+            return {"error": f"Search daemon at {socket_path} did not answer within {timeout:g}s"}
+        except (OSError, ValueError) as e:
+            return {"error": f"Search daemon at {socket_path} failed: {type(e).__name__}: {e}"}
+
+    if not isinstance(response, dict):
+        return {"error": f"Search daemon at {socket_path} sent an invalid response"}
+    if not response.get("ok"):
+        return {"error": f"Search daemon: {response.get('error', 'unknown error')}"}
+    return response.get("result")
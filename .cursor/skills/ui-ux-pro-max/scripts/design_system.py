@@ -11,19 +11,24 @@ Usage:
 
     # With persistence (Master + Overrides pattern)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, output_dir="/path/to/project")
-    result["persistence"]  # {"status": "success"|"skipped_exists", "created_files": [...], ...}
+    result["persistence"]  # {"status": "success"|"skipped_exists", "created_files": [...],
+                           #  "files": {path: "written"|"unchanged"|"skipped"}, ...}
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard", output_dir="/path/to/project")
 """
 
-import csv
 import json
 import os
 import re
+import string
 import sys
 import io
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from core import search, DATA_DIR
+from core import search, CSV_CONFIG, DATA_DIR, KeywordMatcher, _load_csv, _load_index
 
 # Force UTF-8 for stdout/stderr to handle emojis/box-drawing chars on Windows (cp1252 default)
 if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
@@ -43,6 +48,13 @@ SEARCH_CONFIG = {
     "typography": {"max_results": 2}
 }
 
+# Per-page lookups behind each page override file (see _page_lookups)
+PAGE_SEARCH_CONFIG = {
+    "style": {"max_results": 1},
+    "ux": {"max_results": 3},
+    "landing": {"max_results": 1},
+}
+
 # ============ DESIGN DIALS (1-10) ============
 # Inspired by taste-skill's DESIGN_VARIANCE / MOTION_INTENSITY / VISUAL_DENSITY
 # knobs: three optional 1-10 sliders that bias the existing query-based search
@@ -105,8 +117,13 @@ _DARK_ANTI_PATTERN_MARKERS = ("dark mode", "dark modes", "dark theme")
 _DARK_BACKGROUND_MAX_LUMINANCE = 0.18
 
 
-def _relative_luminance(hex_color: str):
-    """WCAG relative luminance of a #RRGGBB string, or None if unparseable."""
+@lru_cache(maxsize=1024)
+def _hex_to_rgb(hex_color: str):
+    """(r, g, b) 0-255 of a #RGB / #RRGGBB string, or None if unparseable.
+
+    Memoized, like the rest of the color math below: batch generation keeps
+    classifying the same few hundred colors.csv values.
+    """
     if not hex_color:
         return None
     value = hex_color.strip().lstrip("#")
@@ -115,18 +132,84 @@ def _relative_luminance(hex_color: str):
     if len(value) != 6:
         return None
     try:
-        channels = [int(value[i:i + 2], 16) / 255 for i in (0, 2, 4)]
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
     except ValueError:
         return None
+
+
+@lru_cache(maxsize=1024)
+def _relative_luminance(hex_color: str):
+    """WCAG relative luminance of a #RRGGBB string, or None if unparseable."""
+    rgb = _hex_to_rgb(hex_color)
+    if rgb is None:
+        return None
     linear = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
-              for c in channels]
+              for c in (channel / 255 for channel in rgb)]
     return 0.2126 * linear[0] + 0.7152 * linear[1] + 0.0722 * linear[2]
 
 
+def _contrast_ratio(foreground: str, background: str):
+    """WCAG contrast ratio (1-21) of two hex colors, or None if either is unparseable."""
+    fg = _relative_luminance(foreground)
+    bg = _relative_luminance(background)
+    if fg is None or bg is None:
+        return None
+    lighter, darker = max(fg, bg), min(fg, bg)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+# Text-on-surface pairs whose contrast every palette is classified by (and
+# --min-contrast filters on): name -> (text column, surface column).
+_CONTRAST_PAIRS = {
+    "foreground": ("Foreground", "Background"),
+    "on_primary": ("On Primary", "Primary"),
+}
+_PALETTE_KEY_COLS = ("Background", "Foreground", "Primary", "On Primary")
+
+
+@lru_cache(maxsize=1024)
+def _classify_colors(background: str, foreground: str, primary: str, on_primary: str) -> dict:
+    hexes = dict(zip(_PALETTE_KEY_COLS, (background, foreground, primary, on_primary)))
+    luminance = _relative_luminance(background)
+    contrast = {}
+    for name, (text_col, surface_col) in _CONTRAST_PAIRS.items():
+        ratio = _contrast_ratio(hexes[text_col], hexes[surface_col])
+        if ratio is not None:
+            contrast[name] = ratio
+    return {
+        "rgb": {col: _hex_to_rgb(value) for col, value in hexes.items()},
+        "luminance": luminance,
+        "dark": luminance is not None and luminance < _DARK_BACKGROUND_MAX_LUMINANCE,
+        "contrast": contrast,
+        "min_contrast": min(contrast.values()) if contrast else None,
+    }
+
+
+def _palette_info(palette: dict) -> dict:
+    """Parsed RGB, background luminance, dark flag and text contrast ratios
+    of a colors.csv row (or any dict with its color columns).
+
+    Shared across every palette with the same colors; don't mutate it.
+    """
+    palette = palette or {}
+    return _classify_colors(*(palette.get(col) or "" for col in _PALETTE_KEY_COLS))
+
+
 def _palette_is_dark(palette: dict) -> bool:
     """True when a colors.csv row's Background is a dark surface."""
-    luminance = _relative_luminance((palette or {}).get("Background", ""))
-    return luminance is not None and luminance < _DARK_BACKGROUND_MAX_LUMINANCE
+    return _palette_info(palette)["dark"]
+
+
+def _palette_fits(palette: dict, mode: str, min_contrast: float = None) -> bool:
+    """True when a palette agrees with the resolved mode and, if asked, every
+    text pair reaches min_contrast. Only the dark mode filters (see
+    _select_palette_for_mode)."""
+    info = _palette_info(palette)
+    if mode == "dark" and not info["dark"]:
+        return False
+    if min_contrast is not None:
+        return info["min_contrast"] is not None and info["min_contrast"] >= min_contrast
+    return True
 
 
 def _style_is_dark_primary(style: dict) -> bool:
@@ -152,20 +235,67 @@ def _resolve_color_mode(query: str, style: dict) -> str:
     return "light"
 
 
-def _select_palette_for_mode(palettes: list, mode: str) -> dict:
+def _select_palette_for_mode(palettes: list, mode: str, min_contrast: float = None) -> dict:
     """Pick the highest-ranked palette matching the resolved mode.
 
     Only the dark case filters. Light is left on the existing "top hit wins"
     behaviour so queries that never mention a mode keep their current palette.
     Falls back to the top hit when the data has no matching ramp.
+
+    With min_contrast, only palettes whose text pairs all reach that WCAG
+    ratio qualify, and {} is returned when none does so the caller can widen
+    the search.
     """
     if not palettes:
         return {}
-    if mode == "dark":
-        for palette in palettes:
-            if _palette_is_dark(palette):
-                return palette
-    return palettes[0]
+    for palette in palettes:
+        if _palette_fits(palette, mode, min_contrast):
+            return palette
+    return {} if min_contrast is not None else palettes[0]
+
+
+# ============ PALETTE TABLE ============
+class _PaletteTable:
+    """colors.csv classified once: every row's _palette_info() is computed
+    (and memoized) when the CSV is loaded, and rows are indexed by mode."""
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.info = [_palette_info(row) for row in rows]
+        self.by_mode = {"dark": [], "light": []}
+        for idx, info in enumerate(self.info):
+            self.by_mode["dark" if info["dark"] else "light"].append(idx)
+
+    def first_fit(self, mode: str, min_contrast: float = None) -> dict:
+        """First row, in table order, that _palette_fits(); {} if none does.
+
+        Dark mode only walks the dark index; the checks read the precomputed
+        info instead of reclassifying rows.
+        """
+        candidates = self.by_mode["dark"] if mode == "dark" else range(len(self.rows))
+        for idx in candidates:
+            info = self.info[idx]
+            if min_contrast is None or (info["min_contrast"] is not None
+                                        and info["min_contrast"] >= min_contrast):
+                return self.rows[idx]
+        return {}
+
+
+_palette_tables = {}  # filepath -> (mtime, _PaletteTable)
+
+
+def _palette_table() -> _PaletteTable:
+    """The classified palette table, rebuilt only when colors.csv changes."""
+    filepath = DATA_DIR / CSV_CONFIG["color"]["file"]
+    if not filepath.exists():
+        return _PaletteTable([])
+    mtime = filepath.stat().st_mtime
+    cached = _palette_tables.get(filepath)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    table = _PaletteTable(_load_csv(filepath))
+    _palette_tables[filepath] = (mtime, table)
+    return table
 
 
 def _filter_anti_patterns_for_mode(anti_patterns: str, mode: str) -> str:
@@ -179,26 +309,120 @@ def _filter_anti_patterns_for_mode(anti_patterns: str, mode: str) -> str:
     return " + ".join(clause.strip() for clause in kept if clause.strip())
 
 
+# ============ REASONING RULES ============
+class _ReasoningTable:
+    """ui-reasoning.csv compiled for DesignSystemGenerator._find_reasoning_rule().
+
+    Resolution is unchanged -- an exact UI_Category match, else the first
+    row whose category contains or is contained in the text, else the first
+    row with a category keyword inside the text -- but each stage is an
+    index lookup rather than a scan that re-lowercases and re-splits every
+    row, and each category is resolved only once. Decision_Rules JSON is
+    parsed once per row.
+    """
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        categories = [row.get("UI_Category", "").lower() for row in rows]
+        self._exact = {}
+        for idx, category in enumerate(categories):
+            self._exact.setdefault(category, idx)
+        # The first occurrence of a text in the joined categories lies in the
+        # earliest row containing it; _starts maps it back to that row.
+        self._joined = "\0".join(categories)
+        self._starts = []
+        offset = 0
+        for category in categories:
+            self._starts.append(offset)
+            offset += len(category) + 1
+        self._categories_in_text = KeywordMatcher({idx: [category] for idx, category in enumerate(categories)})
+        self._empty_category = next((idx for idx, category in enumerate(categories) if not category), None)
+        self._keywords_in_text = KeywordMatcher({
+            idx: category.replace("/", " ").replace("-", " ").split() for idx, category in enumerate(categories)
+        })
+        self.decision_rules = [_parse_decision_rules(row) for row in rows]
+        self._resolved = {}  # lowercased category -> row index or None
+
+    def find(self, category: str):
+        """Index of the row for category, or None when nothing matches."""
+        text = category.lower()
+        if text not in self._resolved:
+            self._resolved[text] = self._resolve(text)
+        return self._resolved[text]
+
+    def _resolve(self, text: str):
+        if text in self._exact:
+            return self._exact[text]
+        if not self.rows:
+            return None
+
+        # Partial: a category inside the text, or the text inside a category.
+        partial = [idx for idx, hits in self._categories_in_text.scores(text).items() if hits]
+        if self._empty_category is not None:
+            partial.append(self._empty_category)
+        position = self._joined.find(text) if "\0" not in text else -1
+        if position >= 0:
+            partial.append(bisect_right(self._starts, position) - 1)
+        if partial:
+            return min(partial)
+
+        return next((idx for idx, hits in self._keywords_in_text.scores(text).items() if hits), None)
+
+
+def _parse_decision_rules(row: dict) -> dict:
+    try:
+        rules = json.loads(row.get("Decision_Rules", "{}"))
+    except json.JSONDecodeError:
+        return {}
+    return rules if isinstance(rules, dict) else {}
+
+
+_reasoning_tables = {}  # filepath -> (mtime, _ReasoningTable)
+
+
+def _reasoning_table() -> _ReasoningTable:
+    """The compiled reasoning table, rebuilt only when the CSV changes."""
+    filepath = DATA_DIR / REASONING_FILE
+    if not filepath.exists():
+        return _ReasoningTable([])
+    mtime = filepath.stat().st_mtime
+    cached = _reasoning_tables.get(filepath)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    table = _ReasoningTable(_load_csv(filepath))
+    _reasoning_tables[filepath] = (mtime, table)
+    return table
+
+
+@contextmanager
+def _timed(timings: dict, phase: str):
+    """Record the wall time of the with-block in timings[phase], in ms."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = round((time.perf_counter() - start) * 1000, 2)
+
+
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
     def __init__(self):
-        self.reasoning_data = self._load_reasoning()
-
-    def _load_reasoning(self) -> list:
-        """Load reasoning rules from CSV."""
-        filepath = DATA_DIR / REASONING_FILE
-        if not filepath.exists():
-            return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
-
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
+        self._reasoning = _reasoning_table()
+        self.reasoning_data = self._reasoning.rows
+        # Per-phase wall time (ms) of the last generate() call. Kept out of
+        # the returned dict so the design system itself stays deterministic.
+        self.last_timings = {}
+
+    def _multi_domain_search(self, query: str, style_priority: list = None, product_result: dict = None) -> dict:
+        """Execute searches across multiple domains, reusing product_result
+        (generate() has already searched products to pick the category)."""
         results = {}
         for domain, config in SEARCH_CONFIG.items():
-            if domain == "style" and style_priority:
+            if domain == "product" and product_result is not None:
+                results[domain] = product_result
+            elif domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
                 combined_query = f"{query} {priority_query}"
@@ -209,33 +433,14 @@ class DesignSystemGenerator:
 
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
-
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
-
-        return {}
+        idx = self._reasoning.find(category)
+        return self.reasoning_data[idx] if idx is not None else {}
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
+        idx = self._reasoning.find(category)
 
-        if not rule:
+        if idx is None:
             return {
                 "pattern": "Hero + Features + CTA",
                 "style_priority": ["Minimalism", "Flat Design"],
@@ -247,13 +452,7 @@ class DesignSystemGenerator:
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
+        rule = self.reasoning_data[idx]
         return {
             "pattern": rule.get("Recommended_Pattern", ""),
             "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
@@ -261,7 +460,9 @@ class DesignSystemGenerator:
             "typography_mood": rule.get("Typography_Mood", ""),
             "key_effects": rule.get("Key_Effects", ""),
             "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
+            # Parsed once per row; the rules are a flat string map, so a
+            # shallow copy keeps callers from editing the shared table.
+            "decision_rules": dict(self._reasoning.decision_rules[idx]),
             "severity": rule.get("Severity", "MEDIUM")
         }
 
@@ -307,26 +508,36 @@ class DesignSystemGenerator:
         return search_result.get("results", [])
 
     def generate(self, query: str, project_name: str = None,
-                 variance: int = None, motion: int = None, density: int = None) -> dict:
+                 variance: int = None, motion: int = None, density: int = None,
+                 min_contrast: float = None) -> dict:
         """Generate complete design system recommendation.
 
         variance/motion/density are optional 1-10 dials (see DIAL_TIERS) that bias
         style selection, pull in a matching motion.csv snippet, and override the
         spacing scale, without changing behavior when left unset.
+
+        min_contrast (e.g. 4.5 for WCAG AA) restricts the palette to ones whose
+        text pairs reach that contrast ratio; the chosen palette's ratios are
+        then reported under colors["contrast"].
         """
         variance_info = _resolve_dial("variance", variance)
         motion_info = _resolve_dial("motion", motion)
         density_info = _resolve_dial("density", density)
 
+        timings = {}
+        self.last_timings = timings
+
         # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+        with _timed(timings, "product"):
+            product_result = search(query, "product", 1)
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
             category = product_results[0].get("Product Type", "General")
 
         # Step 2: Get reasoning rules for this category
-        reasoning = self._apply_reasoning(category, {})
+        with _timed(timings, "reasoning"):
+            reasoning = self._apply_reasoning(category, {})
         style_priority = reasoning.get("style_priority", [])
 
         # DESIGN_VARIANCE dial: bias style retrieval/selection toward
@@ -336,30 +547,36 @@ class DesignSystemGenerator:
             effective_style_priority = variance_info["style_keywords"] + style_priority
 
         # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, effective_style_priority)
-        search_results["product"] = product_result  # Reuse product search
+        with _timed(timings, "domains"):
+            search_results = self._multi_domain_search(query, effective_style_priority, product_result)
 
         # Step 4: Select best matches from each domain using priority
-        style_results = self._extract_results(search_results.get("style", {}))
-        color_results = self._extract_results(search_results.get("color", {}))
-        typography_results = self._extract_results(search_results.get("typography", {}))
-        landing_results = self._extract_results(search_results.get("landing", {}))
-
-        best_style = self._select_best_match(style_results, effective_style_priority)
-        # Resolve the mode from the style + query first, then pick a palette that
-        # agrees with it. Ranking colors independently is what let a dark-primary
-        # style ship with a light background.
-        color_mode = _resolve_color_mode(query, best_style)
-        best_color = _select_palette_for_mode(color_results, color_mode)
-        best_typography = typography_results[0] if typography_results else {}
-        best_landing = landing_results[0] if landing_results else {}
+        with _timed(timings, "select"):
+            style_results = self._extract_results(search_results.get("style", {}))
+            color_results = self._extract_results(search_results.get("color", {}))
+            typography_results = self._extract_results(search_results.get("typography", {}))
+            landing_results = self._extract_results(search_results.get("landing", {}))
+
+            best_style = self._select_best_match(style_results, effective_style_priority)
+            # Resolve the mode from the style + query first, then pick a palette that
+            # agrees with it. Ranking colors independently is what let a dark-primary
+            # style ship with a light background.
+            color_mode = _resolve_color_mode(query, best_style)
+            best_color = _select_palette_for_mode(color_results, color_mode, min_contrast)
+            contrast_note = ""
+            if min_contrast is not None and not best_color:
+                best_color, contrast_note = self._widen_palette_search(
+                    query, color_results, color_mode, min_contrast)
+            best_typography = typography_results[0] if typography_results else {}
+            best_landing = landing_results[0] if landing_results else {}
 
         # MOTION_INTENSITY dial: pull a matching GSAP skeleton from motion.csv
         # (domain key is "gsap", not "motion" - PR #296 already owns the "motion"
         # domain for Emil Kowalski's motion-design principles, motion-principles.csv).
         motion_snippet = {}
         if motion_info:
-            motion_result = search(f"{query} {motion_info['tier']}", "gsap", 5)
+            with _timed(timings, "motion"):
+                motion_result = search(f"{query} {motion_info['tier']}", "gsap", 5)
             motion_matches = motion_result.get("results", [])
             tiered = [m for m in motion_matches if m.get("Intensity Tier") == motion_info["tier"]]
             if tiered:
@@ -373,7 +590,7 @@ class DesignSystemGenerator:
         reasoning_effects = reasoning.get("key_effects", "")
         combined_effects = style_effects if style_effects else reasoning_effects
 
-        return {
+        design_system = {
             "project_name": project_name or query.upper(),
             "category": category,
             "pattern": {
@@ -405,7 +622,7 @@ class DesignSystemGenerator:
                 "border": best_color.get("Border", ""),
                 "destructive": best_color.get("Destructive", ""),
                 "ring": best_color.get("Ring", ""),
-                "notes": best_color.get("Notes", ""),
+                "notes": (best_color.get("Notes", "") + contrast_note).strip(),
                 # Keep legacy keys for backward compat in MASTER.md
                 "cta": best_color.get("Accent", "#F97316"),
                 "text": best_color.get("Foreground", "#1E293B"),
@@ -435,11 +652,36 @@ class DesignSystemGenerator:
             "motion_snippet": motion_snippet,
             "spacing_scale": density_info["spacing"] if density_info else None,
         }
+        if min_contrast is not None:
+            design_system["colors"]["contrast"] = {
+                name: round(ratio, 2) for name, ratio in _palette_info(best_color)["contrast"].items()
+            }
+        return design_system
+
+    def _widen_palette_search(self, query: str, color_results: list, mode: str,
+                              min_contrast: float):
+        """No top color hit reaches min_contrast: take the best-ranked color hit
+        that does, else the first palette in colors.csv that does (search() only
+        returns rows sharing a term with the query), else keep the usual pick
+        and say so.
+
+        Returns (palette, note to append to the color notes).
+        """
+        table = _palette_table()
+        fallback = table.first_fit(mode, min_contrast)
+        if fallback:
+            wider = search(query, "color", len(table.rows)).get("results", [])
+            return _select_palette_for_mode(wider, mode, min_contrast) or fallback, ""
+        palette = _select_palette_for_mode(color_results, mode)
+        kind = "dark palette" if mode == "dark" else "palette"
+        return palette, f" (No {kind} reaches {min_contrast:g}:1 text contrast.)"
 
 
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
 
+_ANSI_ESCAPE = re.compile(r'\033\[[0-9;]*m')
+
 
 def hex_to_ansi(hex_color: str) -> str:
     """Convert hex color to ANSI True Color swatch (██) with fallback."""
@@ -448,17 +690,21 @@ def hex_to_ansi(hex_color: str) -> str:
     colorterm = os.environ.get('COLORTERM', '')
     if colorterm not in ('truecolor', '24bit'):
         return ""
-    hex_color = hex_color.lstrip('#')
-    if len(hex_color) != 6:
+    return _ansi_swatch(hex_color)
+
+
+@lru_cache(maxsize=1024)
+def _ansi_swatch(hex_color: str) -> str:
+    rgb = _hex_to_rgb(hex_color) if len(hex_color.lstrip('#')) == 6 else None
+    if rgb is None:
         return ""
-    r, g, b = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
+    r, g, b = rgb
     return f"\033[38;2;{r};{g};{b}m██\033[0m "
 
 
 def ansi_ljust(s: str, width: int) -> str:
     """Like str.ljust but accounts for zero-width ANSI escape sequences."""
-    import re
-    visible_len = len(re.sub(r'\033\[[0-9;]*m', '', s))
+    visible_len = len(_ANSI_ESCAPE.sub('', s))
     pad = width - visible_len
     return s + (" " * max(0, pad))
 
@@ -470,8 +716,149 @@ def section_header(name: str, width: int) -> str:
     return f"├{label}{fill}┤"
 
 
-def format_ascii_box(design_system: dict) -> str:
-    """Format design system as Unicode box with ANSI color swatches."""
+class _Template:
+    """A section skeleton compiled once into literal runs and {field} slots.
+
+    The source uses str.format field syntax ({name}, {{ and }} for literal
+    braces) but is parsed at import, not on every render: render() only
+    interleaves the precompiled runs with str(fields[name]) and hands the
+    section to write() -- list.append when a formatter collects its text,
+    or a file's write() when it streams.
+    """
+
+    def __init__(self, source: str):
+        self.head = ""
+        self.slots = []  # (field name, literal run after it)
+        for text, field, _spec, _conversion in _FORMATTER.parse(source):
+            if self.slots:
+                name, run = self.slots[-1]
+                self.slots[-1] = (name, run + text)
+            else:
+                self.head += text
+            if field is not None:
+                self.slots.append((field, ""))
+
+    def render(self, write, fields: dict = None):
+        if not self.slots:
+            write(self.head)
+            return
+        chunks = [self.head]
+        for name, run in self.slots:
+            chunks.append(str(fields[name]))
+            chunks.append(run)
+        write("".join(chunks))
+
+
+_FORMATTER = string.Formatter()
+
+# (label, design_system["colors"] key, CSS variable), in display order
+_COLOR_ENTRIES = [
+    ("Primary",      "primary",      "--color-primary"),
+    ("On Primary",   "on_primary",   "--color-on-primary"),
+    ("Secondary",    "secondary",    "--color-secondary"),
+    ("Accent/CTA",   "accent",       "--color-accent"),
+    ("Background",   "background",   "--color-background"),
+    ("Foreground",   "foreground",   "--color-foreground"),
+    ("Muted",        "muted",        "--color-muted"),
+    ("Border",       "border",       "--color-border"),
+    ("Destructive",  "destructive",  "--color-destructive"),
+    ("Ring",         "ring",         "--color-ring"),
+]
+
+_DIAL_NAMES = ("variance", "motion", "density")
+
+
+def _dials_set(dials: dict) -> bool:
+    return any(dials.get(k) is not None for k in _DIAL_NAMES)
+
+
+def _motion_summary(motion_snippet: dict) -> str:
+    """The "**Category** (Tier) — Trigger: ..." line shared by both markdown formats."""
+    return (f"**{motion_snippet.get('Category', '')}** ({motion_snippet.get('Intensity Tier', '')}) — "
+            f"Trigger: {motion_snippet.get('Trigger', '')} | Duration: {motion_snippet.get('Duration', '')} | "
+            f"Easing: `{motion_snippet.get('Easing', '')}`")
+
+
+def _render(render, out, *args):
+    """Run a _render_* function: stream it to `out` when given (sys.stdout,
+    an open file), else collect and return the text.
+
+    The renderers write every line with its newline except the last, so the
+    output is exactly the "\\n".join(lines) the formatters always returned.
+    """
+    if out is not None:
+        render(out.write, *args)
+        return None
+    chunks = []
+    render(chunks.append, *args)
+    return "".join(chunks)
+
+
+# Ascii box: pre-rendered section rules and static blocks
+def _wrap_text(text: str, prefix: str, width: int) -> list:
+    """Wrap long text into multiple lines."""
+    if not text:
+        return []
+    words = text.split()
+    lines = []
+    current_line = prefix
+    for word in words:
+        if len(current_line) + len(word) + 1 <= width - 2:
+            current_line += (" " if current_line != prefix else "") + word
+        else:
+            if current_line != prefix:
+                lines.append(current_line)
+            current_line = prefix + word
+    if current_line != prefix:
+        lines.append(current_line)
+    return lines
+
+
+def _box_row(content: str) -> str:
+    return content.ljust(BOX_WIDTH) + "│\n"
+
+
+def _box_wrapped(write, text: str):
+    for line in _wrap_text(text, "│     ", BOX_WIDTH):
+        write(_box_row(line))
+
+
+_BOX_SECTIONS = {
+    name: section_header(name, BOX_WIDTH + 1) + "\n"
+    for name in ("DESIGN DIALS", "PATTERN", "STYLE", "COLORS", "TYPOGRAPHY", "KEY EFFECTS", "MOTION", "AVOID")
+}
+
+_BOX_HEADER = _Template(
+    "╔" + "═" * (BOX_WIDTH - 1) + "╗\n"
+    "{title}║\n"
+    "╚" + "═" * (BOX_WIDTH - 1) + "╝\n"
+    "┌" + "─" * (BOX_WIDTH - 1) + "┐\n"
+)
+
+_BOX_CHECKLIST = _Template(
+    section_header("PRE-DELIVERY CHECKLIST", BOX_WIDTH + 1) + "\n"
+    + "".join(_box_row(f"│     {item}") for item in [
+        "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
+        "[ ] cursor-pointer on all clickable elements",
+        "[ ] Hover states with smooth transitions (150-300ms)",
+        "[ ] Light mode: text contrast 4.5:1 minimum",
+        "[ ] Focus states visible for keyboard nav",
+        "[ ] prefers-reduced-motion respected",
+        "[ ] Responsive: 375px, 768px, 1024px, 1440px",
+    ]).replace("{", "{{").replace("}", "}}")
+    + "└" + "─" * (BOX_WIDTH - 1) + "┘"
+)
+
+
+def format_ascii_box(design_system: dict, out=None) -> str:
+    """Format design system as Unicode box with ANSI color swatches.
+
+    With `out` (a text stream), the box is written there instead of returned.
+    """
+    return _render(_render_ascii_box, out, design_system)
+
+
+def _render_ascii_box(write, design_system: dict):
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -482,159 +869,121 @@ def format_ascii_box(design_system: dict) -> str:
     dials = design_system.get("dials", {})
     motion_snippet = design_system.get("motion_snippet", {})
 
-    def wrap_text(text: str, prefix: str, width: int) -> list:
-        """Wrap long text into multiple lines."""
-        if not text:
-            return []
-        words = text.split()
-        lines = []
-        current_line = prefix
-        for word in words:
-            if len(current_line) + len(word) + 1 <= width - 2:
-                current_line += (" " if current_line != prefix else "") + word
-            else:
-                if current_line != prefix:
-                    lines.append(current_line)
-                current_line = prefix + word
-        if current_line != prefix:
-            lines.append(current_line)
-        return lines
-
     # Build sections from pattern
     sections = pattern.get("sections", "").split(">")
     sections = [s.strip() for s in sections if s.strip()]
 
-    # Build output lines
-    lines = []
-    w = BOX_WIDTH - 1
-
     # Header with double-line box
-    lines.append("╔" + "═" * w + "╗")
-    lines.append(ansi_ljust(f"║  TARGET: {project} - RECOMMENDED DESIGN SYSTEM", BOX_WIDTH) + "║")
-    lines.append("╚" + "═" * w + "╝")
-    lines.append("┌" + "─" * w + "┐")
+    _BOX_HEADER.render(write, {"title": ansi_ljust(f"║  TARGET: {project} - RECOMMENDED DESIGN SYSTEM", BOX_WIDTH)})
 
     # Design Dials section (only if at least one dial was set)
-    if any(dials.get(k) is not None for k in ("variance", "motion", "density")):
-        lines.append(section_header("DESIGN DIALS", BOX_WIDTH + 1))
+    if _dials_set(dials):
+        write(_BOX_SECTIONS["DESIGN DIALS"])
         if dials.get("variance") is not None:
-            lines.append(f"│  Variance: {dials['variance']}/10 — {dials['variance_label']}".ljust(BOX_WIDTH) + "│")
+            write(_box_row(f"│  Variance: {dials['variance']}/10 — {dials['variance_label']}"))
         if dials.get("motion") is not None:
-            lines.append(f"│  Motion:   {dials['motion']}/10 — {dials['motion_label']}".ljust(BOX_WIDTH) + "│")
+            write(_box_row(f"│  Motion:   {dials['motion']}/10 — {dials['motion_label']}"))
         if dials.get("density") is not None:
-            lines.append(f"│  Density:  {dials['density']}/10 — {dials['density_label']}".ljust(BOX_WIDTH) + "│")
+            write(_box_row(f"│  Density:  {dials['density']}/10 — {dials['density_label']}"))
 
     # Pattern section
-    lines.append(section_header("PATTERN", BOX_WIDTH + 1))
-    lines.append(f"│  Name: {pattern.get('name', '')}".ljust(BOX_WIDTH) + "│")
+    write(_BOX_SECTIONS["PATTERN"])
+    write(_box_row(f"│  Name: {pattern.get('name', '')}"))
     if pattern.get('conversion'):
-        lines.append(f"│     Conversion: {pattern.get('conversion', '')}".ljust(BOX_WIDTH) + "│")
+        write(_box_row(f"│     Conversion: {pattern.get('conversion', '')}"))
     if pattern.get('cta_placement'):
-        lines.append(f"│     CTA: {pattern.get('cta_placement', '')}".ljust(BOX_WIDTH) + "│")
-    lines.append("│     Sections:".ljust(BOX_WIDTH) + "│")
+        write(_box_row(f"│     CTA: {pattern.get('cta_placement', '')}"))
+    write(_box_row("│     Sections:"))
     for i, section in enumerate(sections, 1):
-        lines.append(f"│       {i}. {section}".ljust(BOX_WIDTH) + "│")
+        write(_box_row(f"│       {i}. {section}"))
 
     # Style section
-    lines.append(section_header("STYLE", BOX_WIDTH + 1))
-    lines.append(f"│  Name: {style.get('name', '')}".ljust(BOX_WIDTH) + "│")
+    write(_BOX_SECTIONS["STYLE"])
+    write(_box_row(f"│  Name: {style.get('name', '')}"))
     light = style.get("light_mode", "")
     dark = style.get("dark_mode", "")
     if light or dark:
-        lines.append(f"│     Mode Support: Light {light}  Dark {dark}".ljust(BOX_WIDTH) + "│")
+        write(_box_row(f"│     Mode Support: Light {light}  Dark {dark}"))
     if style.get("keywords"):
-        for line in wrap_text(f"Keywords: {style.get('keywords', '')}", "│     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "│")
+        _box_wrapped(write, f"Keywords: {style.get('keywords', '')}")
     if style.get("best_for"):
-        for line in wrap_text(f"Best For: {style.get('best_for', '')}", "│     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "│")
+        _box_wrapped(write, f"Best For: {style.get('best_for', '')}")
     if style.get("performance") or style.get("accessibility"):
         perf_a11y = f"Performance: {style.get('performance', '')} | Accessibility: {style.get('accessibility', '')}"
-        lines.append(f"│     {perf_a11y}".ljust(BOX_WIDTH) + "│")
+        write(_box_row(f"│     {perf_a11y}"))
 
     # Colors section (extended palette with ANSI swatches)
-    lines.append(section_header("COLORS", BOX_WIDTH + 1))
-    color_entries = [
-        ("Primary",      "primary",      "--color-primary"),
-        ("On Primary",   "on_primary",   "--color-on-primary"),
-        ("Secondary",    "secondary",    "--color-secondary"),
-        ("Accent/CTA",   "accent",       "--color-accent"),
-        ("Background",   "background",   "--color-background"),
-        ("Foreground",   "foreground",   "--color-foreground"),
-        ("Muted",        "muted",        "--color-muted"),
-        ("Border",       "border",       "--color-border"),
-        ("Destructive",  "destructive",  "--color-destructive"),
-        ("Ring",         "ring",         "--color-ring"),
-    ]
-    for label, key, css_var in color_entries:
+    write(_BOX_SECTIONS["COLORS"])
+    swatches = os.environ.get('COLORTERM', '') in ('truecolor', '24bit')
+    for label, key, css_var in _COLOR_ENTRIES:
         hex_val = colors.get(key, "")
         if not hex_val:
             continue
-        swatch = hex_to_ansi(hex_val)
+        swatch = hex_to_ansi(hex_val) if swatches else ""
         content = f"│     {swatch}{label + ':':14s} {hex_val:10s} ({css_var})"
-        lines.append(ansi_ljust(content, BOX_WIDTH) + "│")
+        write(ansi_ljust(content, BOX_WIDTH) + "│\n")
     if colors.get("notes"):
-        for line in wrap_text(f"Notes: {colors.get('notes', '')}", "│     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "│")
+        _box_wrapped(write, f"Notes: {colors.get('notes', '')}")
 
     # Typography section
-    lines.append(section_header("TYPOGRAPHY", BOX_WIDTH + 1))
-    lines.append(f"│  {typography.get('heading', '')} / {typography.get('body', '')}".ljust(BOX_WIDTH) + "│")
+    write(_BOX_SECTIONS["TYPOGRAPHY"])
+    write(_box_row(f"│  {typography.get('heading', '')} / {typography.get('body', '')}"))
     if typography.get("mood"):
-        for line in wrap_text(f"Mood: {typography.get('mood', '')}", "│     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "│")
+        _box_wrapped(write, f"Mood: {typography.get('mood', '')}")
     if typography.get("best_for"):
-        for line in wrap_text(f"Best For: {typography.get('best_for', '')}", "│     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "│")
+        _box_wrapped(write, f"Best For: {typography.get('best_for', '')}")
     if typography.get("google_fonts_url"):
-        lines.append(f"│     Google Fonts: {typography.get('google_fonts_url', '')}".ljust(BOX_WIDTH) + "│")
+        write(_box_row(f"│     Google Fonts: {typography.get('google_fonts_url', '')}"))
     if typography.get("css_import"):
-        lines.append(f"│     CSS Import: {typography.get('css_import', '')[:70]}...".ljust(BOX_WIDTH) + "│")
+        write(_box_row(f"│     CSS Import: {typography.get('css_import', '')[:70]}..."))
 
     # Key Effects section
     if effects:
-        lines.append(section_header("KEY EFFECTS", BOX_WIDTH + 1))
-        for line in wrap_text(effects, "│     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "│")
+        write(_BOX_SECTIONS["KEY EFFECTS"])
+        _box_wrapped(write, effects)
 
     # Motion section (GSAP skeleton, only if --motion dial was set)
     if motion_snippet:
-        lines.append(section_header("MOTION", BOX_WIDTH + 1))
-        lines.append(f"│  {motion_snippet.get('Category', '')} ({motion_snippet.get('Intensity Tier', '')})".ljust(BOX_WIDTH) + "│")
-        lines.append(f"│     Trigger: {motion_snippet.get('Trigger', '')} | Duration: {motion_snippet.get('Duration', '')} | Easing: {motion_snippet.get('Easing', '')}".ljust(BOX_WIDTH) + "│")
-        for line in wrap_text(f"GSAP: {motion_snippet.get('GSAP Snippet', '')}", "│     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "│")
+        write(_BOX_SECTIONS["MOTION"])
+        write(_box_row(f"│  {motion_snippet.get('Category', '')} ({motion_snippet.get('Intensity Tier', '')})"))
+        write(_box_row(f"│     Trigger: {motion_snippet.get('Trigger', '')} | Duration: {motion_snippet.get('Duration', '')} | Easing: {motion_snippet.get('Easing', '')}"))
+        _box_wrapped(write, f"GSAP: {motion_snippet.get('GSAP Snippet', '')}")
         if motion_snippet.get("Framework Notes"):
-            for line in wrap_text(f"Framework: {motion_snippet.get('Framework Notes', '')}", "│     ", BOX_WIDTH):
-                lines.append(line.ljust(BOX_WIDTH) + "│")
+            _box_wrapped(write, f"Framework: {motion_snippet.get('Framework Notes', '')}")
 
     # Anti-patterns section
     if anti_patterns:
-        lines.append(section_header("AVOID", BOX_WIDTH + 1))
-        for line in wrap_text(anti_patterns, "│     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "│")
+        write(_BOX_SECTIONS["AVOID"])
+        _box_wrapped(write, anti_patterns)
+
+    # Pre-Delivery Checklist section and box bottom
+    _BOX_CHECKLIST.render(write)
 
-    # Pre-Delivery Checklist section
-    lines.append(section_header("PRE-DELIVERY CHECKLIST", BOX_WIDTH + 1))
-    checklist_items = [
-        "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
-        "[ ] cursor-pointer on all clickable elements",
-        "[ ] Hover states with smooth transitions (150-300ms)",
-        "[ ] Light mode: text contrast 4.5:1 minimum",
-        "[ ] Focus states visible for keyboard nav",
-        "[ ] prefers-reduced-motion respected",
-        "[ ] Responsive: 375px, 768px, 1024px, 1440px"
-    ]
-    for item in checklist_items:
-        lines.append(f"│     {item}".ljust(BOX_WIDTH) + "│")
 
-    lines.append("└" + "─" * w + "┘")
+# Markdown summary skeletons
+_MD_PATTERN = _Template("### Pattern\n- **Name:** {name}\n")
+_MD_STYLE = _Template("### Style\n- **Name:** {name}\n")
+_MD_COLORS = _Template("### Colors\n| Role | Hex | CSS Variable |\n|------|-----|--------------|\n")
+_MD_TYPOGRAPHY = _Template("### Typography\n- **Heading:** {heading}\n- **Body:** {body}\n")
+_MD_CSS_IMPORT = _Template("- **CSS Import:**\n```css\n{css_import}\n```\n")
+_MD_MOTION = _Template("### Motion\n{summary}\n```js\n{snippet}\n```\n")
+_MD_CHECKLIST = _Template("""### Pre-Delivery Checklist
+- [ ] No emojis as icons (use SVG: Heroicons/Lucide)
+- [ ] cursor-pointer on all clickable elements
+- [ ] Hover states with smooth transitions (150-300ms)
+- [ ] Light mode: text contrast 4.5:1 minimum
+- [ ] Focus states visible for keyboard nav
+- [ ] prefers-reduced-motion respected
+- [ ] Responsive: 375px, 768px, 1024px, 1440px
+""")
 
-    return "\n".join(lines)
 
+def format_markdown(design_system: dict, out=None) -> str:
+    """Format design system as markdown (written to `out` instead, if given)."""
+    return _render(_render_markdown, out, design_system)
 
-def format_markdown(design_system: dict) -> str:
-    """Format design system as markdown."""
+
+def _render_markdown(write, design_system: dict):
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -645,138 +994,98 @@ def format_markdown(design_system: dict) -> str:
     dials = design_system.get("dials", {})
     motion_snippet = design_system.get("motion_snippet", {})
 
-    lines = []
-    lines.append(f"## Design System: {project}")
-    lines.append("")
+    write(f"## Design System: {project}\n\n")
 
     # Design Dials section (only if at least one dial was set)
-    if any(dials.get(k) is not None for k in ("variance", "motion", "density")):
-        lines.append("### Design Dials")
+    if _dials_set(dials):
+        write("### Design Dials\n")
         if dials.get("variance") is not None:
-            lines.append(f"- **Variance:** {dials['variance']}/10 — {dials['variance_label']}")
+            write(f"- **Variance:** {dials['variance']}/10 — {dials['variance_label']}\n")
         if dials.get("motion") is not None:
-            lines.append(f"- **Motion:** {dials['motion']}/10 — {dials['motion_label']}")
+            write(f"- **Motion:** {dials['motion']}/10 — {dials['motion_label']}\n")
         if dials.get("density") is not None:
-            lines.append(f"- **Density:** {dials['density']}/10 — {dials['density_label']}")
-        lines.append("")
+            write(f"- **Density:** {dials['density']}/10 — {dials['density_label']}\n")
+        write("\n")
 
     # Pattern section
-    lines.append("### Pattern")
-    lines.append(f"- **Name:** {pattern.get('name', '')}")
+    _MD_PATTERN.render(write, {"name": pattern.get('name', '')})
     if pattern.get('conversion'):
-        lines.append(f"- **Conversion Focus:** {pattern.get('conversion', '')}")
+        write(f"- **Conversion Focus:** {pattern.get('conversion', '')}\n")
     if pattern.get('cta_placement'):
-        lines.append(f"- **CTA Placement:** {pattern.get('cta_placement', '')}")
+        write(f"- **CTA Placement:** {pattern.get('cta_placement', '')}\n")
     if pattern.get('color_strategy'):
-        lines.append(f"- **Color Strategy:** {pattern.get('color_strategy', '')}")
-    lines.append(f"- **Sections:** {pattern.get('sections', '')}")
-    lines.append("")
+        write(f"- **Color Strategy:** {pattern.get('color_strategy', '')}\n")
+    write(f"- **Sections:** {pattern.get('sections', '')}\n\n")
 
     # Style section
-    lines.append("### Style")
-    lines.append(f"- **Name:** {style.get('name', '')}")
+    _MD_STYLE.render(write, {"name": style.get('name', '')})
     light = style.get("light_mode", "")
     dark = style.get("dark_mode", "")
     if light or dark:
-        lines.append(f"- **Mode Support:** Light {light} | Dark {dark}")
+        write(f"- **Mode Support:** Light {light} | Dark {dark}\n")
     if style.get('keywords'):
-        lines.append(f"- **Keywords:** {style.get('keywords', '')}")
+        write(f"- **Keywords:** {style.get('keywords', '')}\n")
     if style.get('best_for'):
-        lines.append(f"- **Best For:** {style.get('best_for', '')}")
+        write(f"- **Best For:** {style.get('best_for', '')}\n")
     if style.get('performance') or style.get('accessibility'):
-        lines.append(f"- **Performance:** {style.get('performance', '')} | **Accessibility:** {style.get('accessibility', '')}")
-    lines.append("")
+        write(f"- **Performance:** {style.get('performance', '')} | **Accessibility:** {style.get('accessibility', '')}\n")
+    write("\n")
 
     # Colors section (extended palette)
-    lines.append("### Colors")
-    lines.append("| Role | Hex | CSS Variable |")
-    lines.append("|------|-----|--------------|")
-    md_color_entries = [
-        ("Primary",      "primary",      "--color-primary"),
-        ("On Primary",   "on_primary",   "--color-on-primary"),
-        ("Secondary",    "secondary",    "--color-secondary"),
-        ("Accent/CTA",   "accent",       "--color-accent"),
-        ("Background",   "background",   "--color-background"),
-        ("Foreground",   "foreground",   "--color-foreground"),
-        ("Muted",        "muted",        "--color-muted"),
-        ("Border",       "border",       "--color-border"),
-        ("Destructive",  "destructive",  "--color-destructive"),
-        ("Ring",         "ring",         "--color-ring"),
-    ]
-    for label, key, css_var in md_color_entries:
+    _MD_COLORS.render(write)
+    for label, key, css_var in _COLOR_ENTRIES:
         hex_val = colors.get(key, "")
         if hex_val:
-            lines.append(f"| {label} | `{hex_val}` | `{css_var}` |")
+            write(f"| {label} | `{hex_val}` | `{css_var}` |\n")
     if colors.get("notes"):
-        lines.append(f"\n*Notes: {colors.get('notes', '')}*")
-    lines.append("")
+        write(f"\n*Notes: {colors.get('notes', '')}*\n")
+    write("\n")
 
     # Typography section
-    lines.append("### Typography")
-    lines.append(f"- **Heading:** {typography.get('heading', '')}")
-    lines.append(f"- **Body:** {typography.get('body', '')}")
+    _MD_TYPOGRAPHY.render(write, {"heading": typography.get('heading', ''), "body": typography.get('body', '')})
     if typography.get("mood"):
-        lines.append(f"- **Mood:** {typography.get('mood', '')}")
+        write(f"- **Mood:** {typography.get('mood', '')}\n")
     if typography.get("best_for"):
-        lines.append(f"- **Best For:** {typography.get('best_for', '')}")
+        write(f"- **Best For:** {typography.get('best_for', '')}\n")
     if typography.get("google_fonts_url"):
-        lines.append(f"- **Google Fonts:** {typography.get('google_fonts_url', '')}")
+        write(f"- **Google Fonts:** {typography.get('google_fonts_url', '')}\n")
     if typography.get("css_import"):
-        lines.append(f"- **CSS Import:**")
-        lines.append(f"```css")
-        lines.append(f"{typography.get('css_import', '')}")
-        lines.append(f"```")
-    lines.append("")
+        _MD_CSS_IMPORT.render(write, {"css_import": typography.get('css_import', '')})
+    write("\n")
 
     # Key Effects section
     if effects:
-        lines.append("### Key Effects")
-        lines.append(f"{effects}")
-        lines.append("")
+        write(f"### Key Effects\n{effects}\n\n")
 
     # Motion section (GSAP skeleton, only if --motion dial was set)
     if motion_snippet:
-        lines.append("### Motion")
-        lines.append(f"**{motion_snippet.get('Category', '')}** ({motion_snippet.get('Intensity Tier', '')}) — Trigger: {motion_snippet.get('Trigger', '')} | Duration: {motion_snippet.get('Duration', '')} | Easing: `{motion_snippet.get('Easing', '')}`")
-        lines.append("```js")
-        lines.append(motion_snippet.get("GSAP Snippet", ""))
-        lines.append("```")
+        _MD_MOTION.render(write, {"summary": _motion_summary(motion_snippet),
+                                    "snippet": motion_snippet.get("GSAP Snippet", "")})
         if motion_snippet.get("Framework Notes"):
-            lines.append(f"*Framework notes: {motion_snippet.get('Framework Notes', '')}*")
+            write(f"*Framework notes: {motion_snippet.get('Framework Notes', '')}*\n")
         motion_do = motion_snippet.get("Do", "")
         motion_dont = motion_snippet.get("Don't", "")
         if motion_do:
-            lines.append(f"- ✅ {motion_do}")
+            write(f"- ✅ {motion_do}\n")
         if motion_dont:
-            lines.append(f"- ❌ {motion_dont}")
-        lines.append("")
+            write(f"- ❌ {motion_dont}\n")
+        write("\n")
 
     # Anti-patterns section
     if anti_patterns:
-        lines.append("### Avoid (Anti-patterns)")
         newline_bullet = '\n- '
-        lines.append(f"- {anti_patterns.replace(' + ', newline_bullet)}")
-        lines.append("")
+        write(f"### Avoid (Anti-patterns)\n- {anti_patterns.replace(' + ', newline_bullet)}\n\n")
 
     # Pre-Delivery Checklist section
-    lines.append("### Pre-Delivery Checklist")
-    lines.append("- [ ] No emojis as icons (use SVG: Heroicons/Lucide)")
-    lines.append("- [ ] cursor-pointer on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard nav")
-    lines.append("- [ ] prefers-reduced-motion respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("")
-
-    return "\n".join(lines)
+    _MD_CHECKLIST.render(write)
 
 
 # ============ MAIN ENTRY POINT ============
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii",
                            persist: bool = False, page: str = None, output_dir: str = None,
                            variance: int = None, motion: int = None, density: int = None,
-                           force: bool = False) -> dict:
+                           force: bool = False, generator: "DesignSystemGenerator" = None,
+                           pages: list = None, min_contrast: float = None) -> dict:
     """
     Main entry point for design system generation.
 
@@ -790,27 +1099,44 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         variance: Optional 1-10 DESIGN_VARIANCE dial (1=centered/minimal, 10=bold/asymmetric)
         motion: Optional 1-10 MOTION_INTENSITY dial, pulls a matching GSAP snippet from motion.csv
         density: Optional 1-10 VISUAL_DENSITY dial, overrides the spacing scale (1=spacious, 10=dense)
-        force: If True, overwrite an existing MASTER.md; otherwise persistence
-               is skipped (with a status message) when one already exists
+        force: If True, overwrite an existing MASTER.md (files whose content
+               is unchanged are left alone); otherwise persistence is skipped
+               (with a status message) when one already exists
+        generator: Optional warm DesignSystemGenerator to reuse (e.g. from the
+                   search daemon) instead of building a new one
+        pages: Optional list of page names to persist override files for, in
+               addition to `page`
+        min_contrast: Optional minimum WCAG contrast ratio (e.g. 4.5) the
+                      palette's text pairs must reach
 
     Returns:
         dict with keys: "text" (formatted design system string), "design_system"
-        (raw dict, useful for --json callers), and "persistence" (result of
-        persist_design_system(), or None if persist=False)
+        (raw dict, useful for --json callers), "persistence" (result of
+        persist_design_system(), or None if persist=False) and "timings"
+        (wall time per phase in ms: product, reasoning, domains, select,
+        motion, persist (including the page-override searches), format and
+        total)
     """
-    generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name, variance=variance, motion=motion, density=density)
+    start = time.perf_counter()
+    generator = generator or DesignSystemGenerator()
+    design_system = generator.generate(query, project_name, variance=variance, motion=motion, density=density,
+                                       min_contrast=min_contrast)
+    timings = dict(generator.last_timings)
 
     persistence_result = None
     if persist:
-        persistence_result = persist_design_system(design_system, page, output_dir, query, force=force)
+        with _timed(timings, "persist"):
+            persistence_result = persist_design_system(design_system, page, output_dir, query, force=force, pages=pages)
 
-    text = format_markdown(design_system) if output_format == "markdown" else format_ascii_box(design_system)
+    with _timed(timings, "format"):
+        text = format_markdown(design_system) if output_format == "markdown" else format_ascii_box(design_system)
+    timings["total"] = round((time.perf_counter() - start) * 1000, 2)
 
     return {
         "text": text,
         "design_system": design_system,
         "persistence": persistence_result,
+        "timings": timings,
     }
 
 
@@ -827,10 +1153,15 @@ def safe_slug(name, fallback: str = "default") -> str:
 
 
 def persist_design_system(design_system: dict, page: str = None, output_dir: str = None,
-                           page_query: str = None, force: bool = False) -> dict:
+                           page_query: str = None, force: bool = False, pages: list = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
 
+    Every file is rendered in memory first and only written when its content
+    differs from what is on disk (ignoring the "Generated" timestamp), so
+    re-running with --force over an unchanged design system touches nothing
+    and doesn't wake file watchers. Writes are atomic (temp file + rename).
+
     Args:
         design_system: The generated design system dictionary
         page: Optional page name for page-specific override file
@@ -839,10 +1170,13 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
         force: If True, overwrite an existing MASTER.md. If False (default) and
                MASTER.md already exists, persistence is skipped so prior design
                decisions aren't silently discarded.
+        pages: Optional list of further page names, each getting its own
+               override file like `page`
 
     Returns:
-        dict with created file paths and status. status is "skipped_exists" if
-        MASTER.md already existed and force was not set.
+        dict with status, the files written ("created_files") and a per-path
+        "files" map of "written" | "unchanged" | "skipped". status is
+        "skipped_exists" if MASTER.md already existed and force was not set.
     """
     base_dir = Path(output_dir) if output_dir else Path.cwd()
 
@@ -855,6 +1189,10 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     pages_dir = design_system_dir / "pages"
 
     master_file = design_system_dir / "MASTER.md"
+    page_files = {
+        pages_dir / f"{safe_slug(page_name, 'page')}.md": page_name
+        for page_name in dict.fromkeys(([page] if page else []) + list(pages or []))
+    }
 
     if master_file.exists() and not force:
         return {
@@ -862,6 +1200,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
             "design_system_dir": str(design_system_dir),
             "master_file": str(master_file),
             "created_files": [],
+            "files": {str(path): "skipped" for path in [master_file, *page_files]},
             "message": (
                 f"{master_file} already exists and was not modified. "
                 "Read it first to check for prior design decisions, then "
@@ -869,36 +1208,267 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
             ),
         }
 
-    created_files = []
-
-    # Create directories
-    design_system_dir.mkdir(parents=True, exist_ok=True)
     pages_dir.mkdir(parents=True, exist_ok=True)
 
-    # Generate and write MASTER.md
-    master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
-    created_files.append(str(master_file))
+    # Render everything before touching the disk
+    rendered = {master_file: format_master_md(design_system)}
+    page_contents = format_page_overrides_md(design_system, list(page_files.values()), page_query)
+    for page_file, page_name in page_files.items():
+        rendered[page_file] = page_contents[page_name]
 
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{safe_slug(page, 'page')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
-        created_files.append(str(page_file))
+    files = {str(path): _write_if_changed(path, content) for path, content in rendered.items()}
 
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
         "master_file": str(master_file),
-        "created_files": created_files
+        "created_files": [path for path, state in files.items() if state == "written"],
+        "files": files,
     }
 
 
-def format_master_md(design_system: dict) -> str:
-    """Format design system as MASTER.md with hierarchical override logic."""
+# "**Generated:** <timestamp>" lines (MASTER.md and page overrides) change on
+# every render, so they don't count as a content change.
+_GENERATED_LINE = re.compile(r"^(> )?\*\*Generated:\*\* .*$", re.MULTILINE)
+
+
+def _write_if_changed(path: Path, content: str) -> str:
+    """Atomically write `content` to `path` unless it already holds it.
+
+    Returns "written" or "unchanged".
+    """
+    try:
+        existing = path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        existing = None
+    if existing is not None and _GENERATED_LINE.sub("", existing) == _GENERATED_LINE.sub("", content):
+        return "unchanged"
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+    return "written"
+
+
+_MASTER_HEADER = _Template("""# Design System Master File
+
+> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`.
+> If that file exists, its rules **override** this Master file.
+> If not, strictly follow the rules below.
+
+---
+
+**Project:** {project}
+**Generated:** {timestamp}
+**Category:** {category}
+""")
+
+_MASTER_PALETTE = _Template("""
+---
+
+## Global Rules
+
+### Color Palette
+
+| Role | Hex | CSS Variable |
+|------|-----|--------------|
+""")
+
+_MASTER_TYPOGRAPHY = _Template("""### Typography
+
+- **Heading Font:** {heading}
+- **Body Font:** {body}
+""")
+
+_MASTER_CSS_IMPORT = _Template("""**CSS Import:**
+```css
+{css_import}
+```
+
+""")
+
+_SPACING_USAGE = {
+    "xs": "Tight gaps", "sm": "Icon gaps, inline spacing", "md": "Standard padding",
+    "lg": "Section padding", "xl": "Large gaps", "2xl": "Section margins", "3xl": "Hero padding",
+}
+
+# Shadow depths and component specs; only the colors vary.
+_MASTER_COMPONENTS = _Template("""### Shadow Depths
+
+| Level | Value | Usage |
+|-------|-------|-------|
+| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |
+| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |
+| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |
+| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |
+
+---
+
+## Component Specs
+
+### Buttons
+
+```css
+/* Primary Button */
+.btn-primary {{
+  background: {cta};
+  color: white;
+  padding: 12px 24px;
+  border-radius: 8px;
+  font-weight: 600;
+  transition: all 200ms ease;
+  cursor: pointer;
+}}
+
+.btn-primary:hover {{
+  opacity: 0.9;
+  transform: translateY(-1px);
+}}
+
+/* Secondary Button */
+.btn-secondary {{
+  background: transparent;
+  color: {primary};
+  border: 2px solid {primary};
+  padding: 12px 24px;
+  border-radius: 8px;
+  font-weight: 600;
+  transition: all 200ms ease;
+  cursor: pointer;
+}}
+```
+
+### Cards
+
+```css
+.card {{
+  background: {background};
+  border-radius: 12px;
+  padding: 24px;
+  box-shadow: var(--shadow-md);
+  transition: all 200ms ease;
+  cursor: pointer;
+}}
+
+.card:hover {{
+  box-shadow: var(--shadow-lg);
+  transform: translateY(-2px);
+}}
+```
+
+### Inputs
+
+```css
+.input {{
+  padding: 12px 16px;
+  border: 1px solid #E2E8F0;
+  border-radius: 8px;
+  font-size: 16px;
+  transition: border-color 200ms ease;
+}}
+
+.input:focus {{
+  border-color: {primary};
+  outline: none;
+  box-shadow: 0 0 0 3px {primary}20;
+}}
+```
+
+### Modals
+
+```css
+.modal-overlay {{
+  background: rgba(0, 0, 0, 0.5);
+  backdrop-filter: blur(4px);
+}}
+
+.modal {{
+  background: white;
+  border-radius: 16px;
+  padding: 32px;
+  box-shadow: var(--shadow-xl);
+  max-width: 500px;
+  width: 90%;
+}}
+```
+
+---
+
+## Style Guidelines
+
+**Style:** {style}
+
+""")
+
+_MASTER_PATTERN = _Template("""### Page Pattern
+
+**Pattern Name:** {name}
+
+""")
+
+_MASTER_MOTION = _Template("""---
+
+## Motion
+
+{summary}
+
+```js
+{snippet}
+```
+
+""")
+
+_MASTER_ANTI_PATTERNS = _Template("""---
+
+## Anti-Patterns (Do NOT Use)
+
+""")
+
+_MASTER_FOOTER = _Template("""
+### Additional Forbidden Patterns
+
+- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)
+- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer
+- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout
+- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio
+- ❌ **Instant state changes** — Always use transitions (150-300ms)
+- ❌ **Invisible focus states** — Focus states must be visible for a11y
+
+---
+
+## Pre-Delivery Checklist
+
+Before delivering any UI code, verify:
+
+- [ ] No emojis used as icons (use SVG instead)
+- [ ] All icons from consistent icon set (Heroicons/Lucide)
+- [ ] `cursor-pointer` on all clickable elements
+- [ ] Hover states with smooth transitions (150-300ms)
+- [ ] Light mode: text contrast 4.5:1 minimum
+- [ ] Focus states visible for keyboard navigation
+- [ ] `prefers-reduced-motion` respected
+- [ ] Responsive: 375px, 768px, 1024px, 1440px
+- [ ] No content hidden behind fixed navbars
+- [ ] No horizontal scroll on mobile
+""")
+
+
+def format_master_md(design_system: dict, out=None) -> str:
+    """Format design system as MASTER.md with hierarchical override logic
+    (written to `out` instead, if given)."""
+    return _render(_render_master_md, out, design_system)
+
+
+def _render_master_md(write, design_system: dict):
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -912,21 +1482,11 @@ def format_master_md(design_system: dict) -> str:
 
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    lines = []
-
     # Logic header
-    lines.append("# Design System Master File")
-    lines.append("")
-    lines.append("> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`.")
-    lines.append("> If that file exists, its rules **override** this Master file.")
-    lines.append("> If not, strictly follow the rules below.")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    lines.append(f"**Project:** {project}")
-    lines.append(f"**Generated:** {timestamp}")
-    lines.append(f"**Category:** {design_system.get('category', 'General')}")
-    if any(dials.get(k) is not None for k in ("variance", "motion", "density")):
+    _MASTER_HEADER.render(write, {
+        "project": project, "timestamp": timestamp, "category": design_system.get('category', 'General'),
+    })
+    if _dials_set(dials):
         dial_parts = []
         if dials.get("variance") is not None:
             dial_parts.append(f"Variance {dials['variance']}/10 ({dials['variance_label']})")
@@ -934,417 +1494,230 @@ def format_master_md(design_system: dict) -> str:
             dial_parts.append(f"Motion {dials['motion']}/10 ({dials['motion_label']})")
         if dials.get("density") is not None:
             dial_parts.append(f"Density {dials['density']}/10 ({dials['density_label']})")
-        lines.append(f"**Design Dials:** {' | '.join(dial_parts)}")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    
-    # Global Rules section
-    lines.append("## Global Rules")
-    lines.append("")
-    
-    # Color Palette
-    lines.append("### Color Palette")
-    lines.append("")
-    lines.append("| Role | Hex | CSS Variable |")
-    lines.append("|------|-----|--------------|")
-    master_color_entries = [
-        ("Primary",      "primary",      "--color-primary"),
-        ("On Primary",   "on_primary",   "--color-on-primary"),
-        ("Secondary",    "secondary",    "--color-secondary"),
-        ("Accent/CTA",   "accent",       "--color-accent"),
-        ("Background",   "background",   "--color-background"),
-        ("Foreground",   "foreground",   "--color-foreground"),
-        ("Muted",        "muted",        "--color-muted"),
-        ("Border",       "border",       "--color-border"),
-        ("Destructive",  "destructive",  "--color-destructive"),
-        ("Ring",         "ring",         "--color-ring"),
-    ]
-    for label, key, css_var in master_color_entries:
+        write(f"**Design Dials:** {' | '.join(dial_parts)}\n")
+
+    # Global Rules: Color Palette
+    _MASTER_PALETTE.render(write)
+    for label, key, css_var in _COLOR_ENTRIES:
         hex_val = colors.get(key, "")
         if hex_val:
-            lines.append(f"| {label} | `{hex_val}` | `{css_var}` |")
-    lines.append("")
+            write(f"| {label} | `{hex_val}` | `{css_var}` |\n")
+    write("\n")
     if colors.get("notes"):
-        lines.append(f"**Color Notes:** {colors.get('notes', '')}")
-        lines.append("")
-    
+        write(f"**Color Notes:** {colors.get('notes', '')}\n\n")
+
     # Typography
-    lines.append("### Typography")
-    lines.append("")
-    lines.append(f"- **Heading Font:** {typography.get('heading', 'Inter')}")
-    lines.append(f"- **Body Font:** {typography.get('body', 'Inter')}")
+    _MASTER_TYPOGRAPHY.render(write, {
+        "heading": typography.get('heading', 'Inter'), "body": typography.get('body', 'Inter'),
+    })
     if typography.get("mood"):
-        lines.append(f"- **Mood:** {typography.get('mood', '')}")
+        write(f"- **Mood:** {typography.get('mood', '')}\n")
     if typography.get("google_fonts_url"):
-        lines.append(f"- **Google Fonts:** [{typography.get('heading', '')} + {typography.get('body', '')}]({typography.get('google_fonts_url', '')})")
-    lines.append("")
+        write(f"- **Google Fonts:** [{typography.get('heading', '')} + {typography.get('body', '')}]({typography.get('google_fonts_url', '')})\n")
+    write("\n")
     if typography.get("css_import"):
-        lines.append("**CSS Import:**")
-        lines.append("```css")
-        lines.append(typography.get("css_import", ""))
-        lines.append("```")
-        lines.append("")
-    
+        _MASTER_CSS_IMPORT.render(write, {"css_import": typography.get("css_import", "")})
+
     # Spacing Variables (overridden by the VISUAL_DENSITY dial when set)
     default_spacing = DIAL_TIERS["density"][1][2]["spacing"]  # mid-tier = the historical defaults
     scale = spacing_scale or default_spacing
-    spacing_usage = {
-        "xs": "Tight gaps", "sm": "Icon gaps, inline spacing", "md": "Standard padding",
-        "lg": "Section padding", "xl": "Large gaps", "2xl": "Section margins", "3xl": "Hero padding",
-    }
-    lines.append("### Spacing Variables")
-    lines.append("")
+    write("### Spacing Variables\n\n")
     if spacing_scale:
-        lines.append(f"*Density: {dials.get('density')}/10 — {dials.get('density_label')}*")
-        lines.append("")
-    lines.append("| Token | Value | Usage |")
-    lines.append("|-------|-------|-------|")
+        write(f"*Density: {dials.get('density')}/10 — {dials.get('density_label')}*\n\n")
+    write("| Token | Value | Usage |\n|-------|-------|-------|\n")
     for token in ("xs", "sm", "md", "lg", "xl", "2xl", "3xl"):
         px_value = scale[token]
         rem_value = f"{int(px_value.rstrip('px')) / 16:g}rem"
-        lines.append(f"| `--space-{token}` | `{px_value}` / `{rem_value}` | {spacing_usage[token]} |")
-    lines.append("")
-    
-    # Shadow Depths
-    lines.append("### Shadow Depths")
-    lines.append("")
-    lines.append("| Level | Value | Usage |")
-    lines.append("|-------|-------|-------|")
-    lines.append("| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |")
-    lines.append("| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |")
-    lines.append("| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |")
-    lines.append("| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |")
-    lines.append("")
-    
-    # Component Specs section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Component Specs")
-    lines.append("")
-    
-    # Buttons
-    lines.append("### Buttons")
-    lines.append("")
-    lines.append("```css")
-    lines.append("/* Primary Button */")
-    lines.append(".btn-primary {")
-    lines.append(f"  background: {colors.get('cta', '#F97316')};")
-    lines.append("  color: white;")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".btn-primary:hover {")
-    lines.append("  opacity: 0.9;")
-    lines.append("  transform: translateY(-1px);")
-    lines.append("}")
-    lines.append("")
-    lines.append("/* Secondary Button */")
-    lines.append(".btn-secondary {")
-    lines.append(f"  background: transparent;")
-    lines.append(f"  color: {colors.get('primary', '#2563EB')};")
-    lines.append(f"  border: 2px solid {colors.get('primary', '#2563EB')};")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Cards
-    lines.append("### Cards")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".card {")
-    lines.append(f"  background: {colors.get('background', '#FFFFFF')};")
-    lines.append("  border-radius: 12px;")
-    lines.append("  padding: 24px;")
-    lines.append("  box-shadow: var(--shadow-md);")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".card:hover {")
-    lines.append("  box-shadow: var(--shadow-lg);")
-    lines.append("  transform: translateY(-2px);")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Inputs
-    lines.append("### Inputs")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".input {")
-    lines.append("  padding: 12px 16px;")
-    lines.append("  border: 1px solid #E2E8F0;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-size: 16px;")
-    lines.append("  transition: border-color 200ms ease;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".input:focus {")
-    lines.append(f"  border-color: {colors.get('primary', '#2563EB')};")
-    lines.append("  outline: none;")
-    lines.append(f"  box-shadow: 0 0 0 3px {colors.get('primary', '#2563EB')}20;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Modals
-    lines.append("### Modals")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".modal-overlay {")
-    lines.append("  background: rgba(0, 0, 0, 0.5);")
-    lines.append("  backdrop-filter: blur(4px);")
-    lines.append("}")
-    lines.append("")
-    lines.append(".modal {")
-    lines.append("  background: white;")
-    lines.append("  border-radius: 16px;")
-    lines.append("  padding: 32px;")
-    lines.append("  box-shadow: var(--shadow-xl);")
-    lines.append("  max-width: 500px;")
-    lines.append("  width: 90%;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
-    
-    # Style section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Style Guidelines")
-    lines.append("")
-    lines.append(f"**Style:** {style.get('name', 'Minimalism')}")
-    lines.append("")
+        write(f"| `--space-{token}` | `{px_value}` / `{rem_value}` | {_SPACING_USAGE[token]} |\n")
+    write("\n")
+
+    # Shadow Depths, Component Specs and the Style Guidelines heading
+    _MASTER_COMPONENTS.render(write, {
+        "cta": colors.get('cta', '#F97316'),
+        "primary": colors.get('primary', '#2563EB'),
+        "background": colors.get('background', '#FFFFFF'),
+        "style": style.get('name', 'Minimalism'),
+    })
     if style.get("keywords"):
-        lines.append(f"**Keywords:** {style.get('keywords', '')}")
-        lines.append("")
+        write(f"**Keywords:** {style.get('keywords', '')}\n\n")
     if style.get("best_for"):
-        lines.append(f"**Best For:** {style.get('best_for', '')}")
-        lines.append("")
+        write(f"**Best For:** {style.get('best_for', '')}\n\n")
     if effects:
-        lines.append(f"**Key Effects:** {effects}")
-        lines.append("")
-    
+        write(f"**Key Effects:** {effects}\n\n")
+
     # Layout Pattern
-    lines.append("### Page Pattern")
-    lines.append("")
-    lines.append(f"**Pattern Name:** {pattern.get('name', '')}")
-    lines.append("")
+    _MASTER_PATTERN.render(write, {"name": pattern.get('name', '')})
     if pattern.get('conversion'):
-        lines.append(f"- **Conversion Strategy:** {pattern.get('conversion', '')}")
+        write(f"- **Conversion Strategy:** {pattern.get('conversion', '')}\n")
     if pattern.get('cta_placement'):
-        lines.append(f"- **CTA Placement:** {pattern.get('cta_placement', '')}")
-    lines.append(f"- **Section Order:** {pattern.get('sections', '')}")
-    lines.append("")
+        write(f"- **CTA Placement:** {pattern.get('cta_placement', '')}\n")
+    write(f"- **Section Order:** {pattern.get('sections', '')}\n\n")
 
     # Motion section (GSAP skeleton, only if --motion dial was set)
     if motion_snippet:
-        lines.append("---")
-        lines.append("")
-        lines.append("## Motion")
-        lines.append("")
-        lines.append(f"**{motion_snippet.get('Category', '')}** ({motion_snippet.get('Intensity Tier', '')}) — Trigger: {motion_snippet.get('Trigger', '')} | Duration: {motion_snippet.get('Duration', '')} | Easing: `{motion_snippet.get('Easing', '')}`")
-        lines.append("")
-        lines.append("```js")
-        lines.append(motion_snippet.get("GSAP Snippet", ""))
-        lines.append("```")
-        lines.append("")
+        _MASTER_MOTION.render(write, {"summary": _motion_summary(motion_snippet),
+                                        "snippet": motion_snippet.get("GSAP Snippet", "")})
         if motion_snippet.get("Framework Notes"):
-            lines.append(f"**Framework notes:** {motion_snippet.get('Framework Notes', '')}")
-            lines.append("")
+            write(f"**Framework notes:** {motion_snippet.get('Framework Notes', '')}\n\n")
         motion_do = motion_snippet.get("Do", "")
         motion_dont = motion_snippet.get("Don't", "")
         if motion_do:
-            lines.append(f"- ✅ {motion_do}")
+            write(f"- ✅ {motion_do}\n")
         if motion_dont:
-            lines.append(f"- ❌ {motion_dont}")
+            write(f"- ❌ {motion_dont}\n")
         if motion_snippet.get("Performance Notes"):
-            lines.append(f"- ⚡ {motion_snippet.get('Performance Notes', '')}")
-        lines.append("")
-
-    # Anti-Patterns section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Anti-Patterns (Do NOT Use)")
-    lines.append("")
+            write(f"- ⚡ {motion_snippet.get('Performance Notes', '')}\n")
+        write("\n")
+
+    # Anti-Patterns section, forbidden patterns and Pre-Delivery Checklist
+    _MASTER_ANTI_PATTERNS.render(write)
     if anti_patterns:
-        anti_list = [a.strip() for a in anti_patterns.split("+")]
-        for anti in anti_list:
+        for anti in (a.strip() for a in anti_patterns.split("+")):
             if anti:
-                lines.append(f"- ❌ {anti}")
-    lines.append("")
-    lines.append("### Additional Forbidden Patterns")
-    lines.append("")
-    lines.append("- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)")
-    lines.append("- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer")
-    lines.append("- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout")
-    lines.append("- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio")
-    lines.append("- ❌ **Instant state changes** — Always use transitions (150-300ms)")
-    lines.append("- ❌ **Invisible focus states** — Focus states must be visible for a11y")
-    lines.append("")
-    
-    # Pre-Delivery Checklist
-    lines.append("---")
-    lines.append("")
-    lines.append("## Pre-Delivery Checklist")
-    lines.append("")
-    lines.append("Before delivering any UI code, verify:")
-    lines.append("")
-    lines.append("- [ ] No emojis used as icons (use SVG instead)")
-    lines.append("- [ ] All icons from consistent icon set (Heroicons/Lucide)")
-    lines.append("- [ ] `cursor-pointer` on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard navigation")
-    lines.append("- [ ] `prefers-reduced-motion` respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("- [ ] No content hidden behind fixed navbars")
-    lines.append("- [ ] No horizontal scroll on mobile")
-    lines.append("")
-    
-    return "\n".join(lines)
+                write(f"- ❌ {anti}\n")
+    _MASTER_FOOTER.render(write)
+
+
+def format_page_overrides_md(design_system: dict, page_names: list, page_query: str = None) -> dict:
+    """Format override files for many pages at once: {page_name: markdown}.
+
+    The style/ux/landing lookups for every page are made in one pass over
+    each index (see _page_lookups), so thirty pages cost little more than three.
+    """
+    contexts = {page_name: _page_context(page_name, page_query) for page_name in page_names}
+    lookups = _page_lookups(contexts.values())
+    return {
+        page_name: format_page_override_md(design_system, page_name, page_query, lookups[context])
+        for page_name, context in contexts.items()
+    }
+
+
+_PAGE_HEADER = _Template("""# {title} Page Overrides
+
+> **PROJECT:** {project}
+> **Generated:** {timestamp}
+> **Page Type:** {page_type}
+
+> ⚠️ **IMPORTANT:** Rules in this file **override** the Master file (`design-system/MASTER.md`).
+> Only deviations from the Master are documented here. For all other rules, refer to the Master.
+
+---
+
+## Page-Specific Rules
+
+""")
+
+# (override key, heading, fallback line) for the "Page-Specific Rules" subsections
+_PAGE_OVERRIDE_SECTIONS = [
+    ("layout", "### Layout Overrides\n\n", "- No overrides — use Master layout\n"),
+    ("spacing", "### Spacing Overrides\n\n", "- No overrides — use Master spacing\n"),
+    ("typography", "### Typography Overrides\n\n", "- No overrides — use Master typography\n"),
+    ("colors", "### Color Overrides\n\n", "- No overrides — use Master colors\n"),
+]
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
-    """Format a page-specific override file with intelligent AI-generated content."""
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None,
+                            lookups: dict = None, out=None) -> str:
+    """Format a page-specific override file with intelligent AI-generated content
+    (written to `out` instead, if given)."""
+    return _render(_render_page_override_md, out, design_system, page_name, page_query, lookups)
+
+
+def _render_page_override_md(write, design_system: dict, page_name: str, page_query: str, lookups: dict):
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
-    
+
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
-    
-    lines = []
-    
-    lines.append(f"# {page_title} Page Overrides")
-    lines.append("")
-    lines.append(f"> **PROJECT:** {project}")
-    lines.append(f"> **Generated:** {timestamp}")
-    lines.append(f"> **Page Type:** {page_overrides.get('page_type', 'General')}")
-    lines.append("")
-    lines.append("> ⚠️ **IMPORTANT:** Rules in this file **override** the Master file (`design-system/MASTER.md`).")
-    lines.append("> Only deviations from the Master are documented here. For all other rules, refer to the Master.")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    
+    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system, lookups)
+
+    _PAGE_HEADER.render(write, {
+        "title": page_title, "project": project, "timestamp": timestamp,
+        "page_type": page_overrides.get('page_type', 'General'),
+    })
+
     # Page-specific rules with actual content
-    lines.append("## Page-Specific Rules")
-    lines.append("")
-    
-    # Layout Overrides
-    lines.append("### Layout Overrides")
-    lines.append("")
-    layout = page_overrides.get("layout", {})
-    if layout:
-        for key, value in layout.items():
-            lines.append(f"- **{key}:** {value}")
-    else:
-        lines.append("- No overrides — use Master layout")
-    lines.append("")
-    
-    # Spacing Overrides
-    lines.append("### Spacing Overrides")
-    lines.append("")
-    spacing = page_overrides.get("spacing", {})
-    if spacing:
-        for key, value in spacing.items():
-            lines.append(f"- **{key}:** {value}")
-    else:
-        lines.append("- No overrides — use Master spacing")
-    lines.append("")
-    
-    # Typography Overrides
-    lines.append("### Typography Overrides")
-    lines.append("")
-    typography = page_overrides.get("typography", {})
-    if typography:
-        for key, value in typography.items():
-            lines.append(f"- **{key}:** {value}")
-    else:
-        lines.append("- No overrides — use Master typography")
-    lines.append("")
-    
-    # Color Overrides
-    lines.append("### Color Overrides")
-    lines.append("")
-    colors = page_overrides.get("colors", {})
-    if colors:
-        for key, value in colors.items():
-            lines.append(f"- **{key}:** {value}")
-    else:
-        lines.append("- No overrides — use Master colors")
-    lines.append("")
-    
+    for key, heading, fallback in _PAGE_OVERRIDE_SECTIONS:
+        write(heading)
+        overrides = page_overrides.get(key, {})
+        if overrides:
+            for name, value in overrides.items():
+                write(f"- **{name}:** {value}\n")
+        else:
+            write(fallback)
+        write("\n")
+
     # Component Overrides
-    lines.append("### Component Overrides")
-    lines.append("")
+    write("### Component Overrides\n\n")
     components = page_overrides.get("components", [])
     if components:
         for comp in components:
-            lines.append(f"- {comp}")
+            write(f"- {comp}\n")
     else:
-        lines.append("- No overrides — use Master component specs")
-    lines.append("")
-    
+        write("- No overrides — use Master component specs\n")
+    write("\n")
+
     # Page-Specific Components
-    lines.append("---")
-    lines.append("")
-    lines.append("## Page-Specific Components")
-    lines.append("")
+    write("---\n\n## Page-Specific Components\n\n")
     unique_components = page_overrides.get("unique_components", [])
     if unique_components:
         for comp in unique_components:
-            lines.append(f"- {comp}")
+            write(f"- {comp}\n")
     else:
-        lines.append("- No unique components for this page")
-    lines.append("")
-    
+        write("- No unique components for this page\n")
+    write("\n")
+
     # Recommendations
-    lines.append("---")
-    lines.append("")
-    lines.append("## Recommendations")
-    lines.append("")
-    recommendations = page_overrides.get("recommendations", [])
-    if recommendations:
-        for rec in recommendations:
-            lines.append(f"- {rec}")
-    lines.append("")
-    
-    return "\n".join(lines)
+    write("---\n\n## Recommendations\n\n")
+    for rec in page_overrides.get("recommendations", []):
+        write(f"- {rec}\n")
+
+
+def _page_context(page_name: str, page_query: str) -> str:
+    """The text a page's override lookups and page-type detection run on."""
+    return f"{page_name.lower()} {(page_query or '').lower()}"
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+def _page_lookups(contexts) -> dict:
+    """{context: {domain: rows}} for every PAGE_SEARCH_CONFIG domain.
+
+    Each index is loaded once for the whole batch, and the rows match what
+    search(context, domain, max_results) returns. search() itself isn't used:
+    page contexts often miss every row, and it would then compute typo
+    suggestions nobody reads.
+    """
+    lookups = {context: {} for context in contexts}
+    for domain, cfg in PAGE_SEARCH_CONFIG.items():
+        config = CSV_CONFIG[domain]
+        filepath = DATA_DIR / config["file"]
+        rows, bm25 = _load_index(filepath, config["search_cols"]) if filepath.exists() else ([], None)
+        output_cols = config["output_cols"]
+        for context, results in lookups.items():
+            hits = bm25.top_k(context, cfg["max_results"]) if rows else []
+            results[domain] = [
+                {col: rows[idx].get(col, "") for col in output_cols if col in rows[idx]}
+                for idx, _score in hits
+            ]
+    return lookups
+
+
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict,
+                                    lookups: dict = None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
-    data instead of hardcoded page types.
+    data instead of hardcoded page types. `lookups` is this page's entry from
+    _page_lookups() when the caller batched them across pages.
     """
-    from core import search
-    
-    page_lower = page_name.lower()
-    query_lower = (page_query or "").lower()
-    combined_context = f"{page_lower} {query_lower}"
-    
-    # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
+    combined_context = _page_context(page_name, page_query)
+    if lookups is None:
+        lookups = _page_lookups([combined_context])[combined_context]
     
-    # Extract results from search response
-    style_results = style_search.get("results", [])
-    ux_results = ux_search.get("results", [])
-    landing_results = landing_search.get("results", [])
+    # Search results for page-specific guidance
+    style_results = lookups["style"]
+    ux_results = lookups["ux"]
+    landing_results = lookups["landing"]
     
     # Detect page type from search results or context
     page_type = _detect_page_type(combined_context, style_results)
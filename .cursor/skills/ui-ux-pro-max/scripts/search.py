@@ -2,10 +2,14 @@
 # -*- coding: utf-8 -*-
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
-Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
-       python search.py "<query>" --design-system [-p "Project Name"]
+Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3] [--relax]
+       python search.py "<query>" --design-system [-p "Project Name"] [--timings]
        python search.py "<query>" --design-system --persist [-p "Project Name"] --output-dir "<project-root>" [--page "dashboard"]
+       python search.py "<query>" --design-system --persist --output-dir "<project-root>" --pages dashboard,checkout,settings
        python search.py "<query>" --design-system --variance 8 --motion 9 --density 7
+       python search.py "<query>" --design-system --min-contrast 4.5
+       python search.py --batch [--workers 4] < requests.jsonl
+       python search.py --design-system --batch projects.jsonl --output-dir "<root>" [--workers 4]
 
 Domains: style, color, chart, landing, product, ux, typography, google-fonts, icons, gsap, react, web
 Stacks: react, nextjs, vue, svelte, astro, swiftui, react-native, flutter, nuxtjs, nuxt-ui,
@@ -16,21 +20,73 @@ Design dials (1-10, only with --design-system):
   --motion     MOTION_INTENSITY: 1=subtle, 10=complex; attaches a GSAP snippet from motion.csv
   --density    VISUAL_DENSITY: 1=spacious, 10=dense/dashboard; overrides the spacing scale
 
+Palette contrast (only with --design-system):
+  --min-contrast  Only pick a palette whose foreground/background and on-primary/primary
+                  pairs reach this WCAG contrast ratio (4.5 = AA, 7 = AAA); widens the
+                  color search when the top hits don't, and reports the ratios
+
 Persistence (Master + Overrides pattern):
   --persist      Save design system to design-system/<project-slug>/MASTER.md
   --output-dir   Directory the design-system/ folder is created under (defaults to cwd --
                  always pass this explicitly, pointed at the project root)
   --page         Also create a page-specific override file in design-system/<project-slug>/pages/
+  --pages        Comma-separated pages to create override files for, in one run
+  --pages-file   File listing pages, one per line (blank lines and # comments ignored);
+                 combines with --page / --pages. Lookups are batched across pages, so
+                 thirty pages cost about the same as a few
   --force        Overwrite an existing MASTER.md (without this, persistence is skipped
-                 if MASTER.md already exists, so prior design decisions aren't lost)
+                 if MASTER.md already exists, so prior design decisions aren't lost);
+                 files whose content hasn't changed are left untouched
+
+Zero-hit relaxation:
+  --relax        When nothing matches, retry in the same process -- with misspelled
+                 words replaced by the closest known terms, and with that corrected
+                 query re-routed to the domain it detects as -- and report which retry
+                 produced the results
+
+Ambiguous queries:
+  Without --domain, a query that also matches a runner-up domain searches both
+  domains and returns one list ranked by normalized score, each row tagged with
+  its domain (core.search_all_domains). With --json, such a result has
+  "federated" (the domains searched) and "files" (every CSV the rows came
+  from) next to "file" (the detected domain's CSV). Each row carries "domain"
+  and "score" plus its own domain's columns, so rows can have different keys.
+
+Batch mode:
+  --batch [FILE] Read JSONL requests ({"query", "domain"|"stack", "max_results"}) from FILE
+                 (default: stdin) and stream one JSON result per line to stdout, in input
+                 order (see batch.py)
+  --design-system --batch projects.jsonl
+                 One design system per line ({"query", "project_name", "variance",
+                 "motion", "density", "min_contrast", "pages"}), each persisted under --output-dir
+                 (--force to overwrite); prints a JSON summary with per-project timings
+  --workers      With --batch, fan requests (or projects) out across N processes
+
+Search daemon:
+  --serve        Keep indexes and the design system generator warm in one process,
+                 answering requests over a Unix socket (see daemon.py). Every other
+                 invocation uses it automatically when running, else searches in-process.
+  --socket       Socket path (default: $UI_PRO_MAX_SOCKET or a per-user temp path)
+  --no-daemon    Always search in-process
+
+Index cache:
+  Parsed CSVs and fitted BM25 indexes are cached as JSON under
+  $XDG_CACHE_HOME/ui-ux-pro-max (default ~/.cache/ui-ux-pro-max) and rebuilt
+  automatically when a data file changes. UI_PRO_MAX_CACHE_DIR overrides the
+  location; UI_PRO_MAX_NO_CACHE=1 disables it.
+
+Scoring backend:
+  Large domains (google-fonts) are scored with NumPy when it is installed;
+  everything else uses the pure-Python scorer. UI_PRO_MAX_SCORER=numpy|python
+  forces one backend.
 """
 
 import argparse
 import json as json_module
 import sys
 import io
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, UNTRUNCATED_COLS, search, search_stack
-from design_system import generate_design_system
+from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, UNTRUNCATED_COLS
+from daemon import handle_request, request as daemon_request, serve
 
 # Force UTF-8 for stdout/stderr to handle emojis on Windows (cp1252 default)
 if sys.stdout.encoding and sys.stdout.encoding.lower() != 'utf-8':
@@ -53,13 +109,20 @@ def format_output(result, full=False):
     else:
         output.append("## UI Pro Max Search Results")
         domain_note = result['domain']
-        if result.get("auto_detected"):
+        if result.get("federated"):
+            domain_note = f"{' + '.join(result['federated'])} (auto-detected, ambiguous: merged by normalized score)"
+        elif result.get("auto_detected"):
             domain_note += " (auto-detected"
             if result.get("runner_up_domain"):
                 domain_note += f", runner-up: {result['runner_up_domain']}"
             domain_note += ")"
         output.append(f"**Domain:** {domain_note} | **Query:** {result['query']}")
-    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
+    relaxed = result.get("relaxed") or {}
+    if relaxed.get("strategy"):
+        output.append(f"**Relaxed ({relaxed['strategy']}):** no matches for \"{relaxed['original_query']}\" "
+                      f"in {relaxed['original_domain']}; showing results for this query instead")
+    source = ", ".join(result.get("files") or [result["file"]])
+    output.append(f"**Source:** {source} | **Found:** {result['count']} results\n")
 
     if result['count'] == 0:
         output.append(
@@ -68,6 +131,9 @@ def format_output(result, full=False):
             "before falling back to general defaults, and say explicitly that "
             "no database match was found if you do fall back."
         )
+        if "relaxed" in result:
+            tried = ", ".join(result["relaxed"]["tried"]) or "no applicable retry"
+            output.append(f"**--relax tried:** {tried} -- none matched either.")
         suggestions = result.get("suggestions") or []
         if suggestions:
             output.append(f"**Closest known terms:** {', '.join(suggestions)}")
@@ -85,14 +151,57 @@ def format_output(result, full=False):
     return "\n".join(output)
 
 
+def _build_request(args):
+    """The daemon/in-process request equivalent to these CLI arguments."""
+    if args.design_system:
+        return {
+            "op": "design_system",
+            "query": args.query,
+            "project_name": args.project_name,
+            "output_format": args.format,
+            "persist": args.persist,
+            "page": args.page,
+            "pages": _requested_pages(args),
+            "output_dir": args.output_dir,
+            "variance": args.variance,
+            "motion": args.motion,
+            "density": args.density,
+            "min_contrast": args.min_contrast,
+            "force": args.force,
+        }
+    if args.stack:
+        return {"op": "stack", "query": args.query, "stack": args.stack, "max_results": args.max_results,
+                "relax": args.relax}
+    return {"op": "search", "query": args.query, "domain": args.domain, "max_results": args.max_results,
+            "relax": args.relax}
+
+
+def _requested_pages(args):
+    """--pages plus --pages-file, in order."""
+    pages = [page.strip() for page in (args.pages or "").split(",")]
+    if args.pages_file:
+        with open(args.pages_file, encoding="utf-8") as f:
+            pages.extend(line.split("#", 1)[0].strip() for line in f)
+    return [page for page in pages if page]
+
+
+def _print_cache_stats(stats):
+    for name, counters in stats.items():
+        lookups = counters["hits"] + counters["misses"]
+        rate = f"{counters['hits'] / lookups:.0%}" if lookups else "n/a"
+        print(f"[cache] {name}: {counters['hits']} hits / {counters['misses']} misses ({rate}), "
+              f"{counters['size']}/{counters['maxsize']} entries", file=sys.stderr)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query (omit with --batch / --serve)")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help=f"Stack-specific search. Available: {', '.join(AVAILABLE_STACKS)}")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
     parser.add_argument("--full", action="store_true", help="Do not truncate long field values in text output")
+    parser.add_argument("--relax", action="store_true", help="On zero hits, retry with corrected spelling / re-detected domain and report which retry matched")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
@@ -100,30 +209,68 @@ if __name__ == "__main__":
     # Persistence (Master + Overrides pattern)
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/<project-slug>/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/<project-slug>/pages/")
+    parser.add_argument("--pages", type=str, default=None, help="Comma-separated page names to create override files for in one run (e.g. dashboard,checkout,settings)")
+    parser.add_argument("--pages-file", type=str, default=None, help="File with one page name per line to create override files for (blank lines and # comments ignored)")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory -- pass this explicitly, pointed at the project root)")
     parser.add_argument("--force", action="store_true", help="Overwrite an existing MASTER.md when persisting (default: skip if it already exists)")
     # Design dials (1-10), only applied with --design-system
     parser.add_argument("--variance", type=int, choices=range(1, 11), metavar="1-10", help="DESIGN_VARIANCE dial: 1=centered/minimal, 10=bold/asymmetric (only with --design-system)")
     parser.add_argument("--motion", type=int, choices=range(1, 11), metavar="1-10", help="MOTION_INTENSITY dial: 1=subtle, 10=complex; pulls a matching GSAP snippet from motion.csv (only with --design-system)")
     parser.add_argument("--density", type=int, choices=range(1, 11), metavar="1-10", help="VISUAL_DENSITY dial: 1=spacious, 10=dense/dashboard; overrides the spacing scale (only with --design-system)")
+    parser.add_argument("--min-contrast", type=float, default=None, metavar="RATIO", help="Minimum WCAG contrast ratio (e.g. 4.5 for AA) the palette's text pairs must reach (only with --design-system)")
+    # Batch mode
+    parser.add_argument("--batch", nargs="?", const="-", default=None, metavar="FILE", help="Read JSONL requests from FILE (default: stdin) and stream JSONL results to stdout, in order; with --design-system, generate and persist one design system per line and print a JSON summary (see batch.py)")
+    parser.add_argument("--workers", type=int, default=1, help="With --batch: fan requests out across N processes (default: 1)")
+    # Search daemon
+    parser.add_argument("--serve", action="store_true", help="Run the search daemon: keep indexes warm and answer requests over a Unix socket")
+    parser.add_argument("--socket", type=str, default=None, help="Daemon socket path (default: $UI_PRO_MAX_SOCKET or a per-user temp path)")
+    parser.add_argument("--no-daemon", action="store_true", help="Always search in-process, even when a daemon is running")
+    parser.add_argument("--cache-stats", action="store_true", help="Print query-cache hit/miss counters to stderr when done")
+    parser.add_argument("--timings", action="store_true", help="With --design-system: print per-phase timings (ms) to stderr")
 
     args = parser.parse_args()
 
+    if args.serve:
+        try:
+            serve(args.socket, on_ready=lambda path: print(f"Search daemon listening on {path}", file=sys.stderr, flush=True))
+        except RuntimeError as e:
+            parser.exit(1, f"Error: {e}\n")
+        sys.exit(0)
+    if args.batch is not None:
+        try:
+            lines = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        except OSError as e:
+            parser.exit(1, f"Error: {e}\n")
+        with lines:
+            if args.design_system:
+                from batch import run_design_system_batch
+                summary = run_design_system_batch(lines, sys.stdout, workers=max(1, args.workers),
+                                                  output_dir=args.output_dir, force=args.force)
+            else:
+                from batch import run_batch
+                run_batch(lines, sys.stdout, workers=max(1, args.workers))
+        if args.cache_stats:
+            _print_cache_stats(handle_request({"op": "stats"}))
+        sys.exit(1 if args.design_system and summary["failed"] else 0)
+    if args.query is None:
+        parser.error("the following arguments are required: query")
+
+    # Use a running daemon when there is one; otherwise run the identical
+    # request in this process. A request the daemon received and then failed
+    # (or timed out on) is reported, not re-run.
+    try:
+        payload = _build_request(args)
+    except OSError as e:
+        parser.exit(1, f"Error: {e}\n")
+    result = None if args.no_daemon else daemon_request(payload, args.socket)
+    served_by_daemon = result is not None
+    if result is None:
+        result = handle_request(payload)
+    elif args.design_system and "error" in result:
+        parser.exit(1, f"Error: {result['error']}\n")
+
     # Design system takes priority
     if args.design_system:
-        result = generate_design_system(
-            args.query,
-            args.project_name,
-            args.format,
-            persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir,
-            variance=args.variance,
-            motion=args.motion,
-            density=args.density,
-            force=args.force,
-        )
-
         if args.json:
             print(json_module.dumps(
                 {"design_system": result["design_system"], "persistence": result["persistence"]},
@@ -140,23 +287,23 @@ if __name__ == "__main__":
                 else:
                     ds_dir = persistence.get("design_system_dir", "design-system/<project>")
                     print(f"✅ Design system persisted to {ds_dir}/")
-                    for f in persistence.get("created_files", []):
-                        print(f"   📄 {f}")
+                    for f, state in persistence.get("files", {}).items():
+                        print(f"   📄 {f}" + (" (unchanged)" if state == "unchanged" else ""))
                     print("")
                     print(f"📖 Usage: When building a page, check {ds_dir}/pages/[page].md first.")
                     print("   If it exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
                 print("=" * 60)
-    # Stack search
-    elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
-        if args.json:
-            print(json_module.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result, full=args.full))
-    # Domain search
+        if args.timings:
+            timings = result.get("timings") or {}
+            print("[timings] " + ", ".join(f"{phase} {ms:.1f} ms" for phase, ms in timings.items()), file=sys.stderr)
+    # Stack / domain search
+    elif args.json:
+        print(json_module.dumps(result, indent=2, ensure_ascii=False))
     else:
-        result = search(args.query, args.domain, args.max_results)
-        if args.json:
-            print(json_module.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result, full=args.full))
+        print(format_output(result, full=args.full))
+
+    if args.cache_stats:
+        stats = daemon_request({"op": "stats"}, args.socket) if served_by_daemon else None
+        if not stats or "error" in stats:
+            stats = handle_request({"op": "stats"})
+        _print_cache_stats(stats)
@@ -0,0 +1,761 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared BM25 search engine for the skills' CSV databases.
+
+Used by ui-ux-pro-max (core.py), design-system (slide_search_core.py) and
+design (logo/core.py, cip/core.py); each keeps its own CSV_CONFIG, domain
+detection and search() output, and calls search_csv() for the ranking, so
+postings lists, top-k selection, the query caches, the index caches and the
+optional NumPy backend apply to every skill.
+
+The other skills import this module from ui-ux-pro-max/scripts (see
+their core modules), so ui-ux-pro-max must be installed alongside them.
+"""
+
+from array import array
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import threading
+from pathlib import Path
+from math import log
+from collections import OrderedDict, defaultdict
+
+
+# ============ TOKENIZATION ============
+class _PunctuationToSpace(dict):
+    r"""str.translate table mapping every non-word, non-space character to a
+    space: the same result as re.sub(r'[^\w\s]', ' ', text) -- \w is
+    isalnum() or "_", \s is isspace() -- but applied in C without the regex
+    engine. Filled lazily so it covers any Unicode input."""
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        value = codepoint if char.isalnum() or char == "_" or char.isspace() else " "
+        self[codepoint] = value
+        return value
+
+
+_PUNCTUATION_TO_SPACE = _PunctuationToSpace()
+
+
+# ============ QUERY CACHES ============
+class _LRUCache:
+    """Small thread-safe LRU map with hit/miss counters (see cache_stats())."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._data), "maxsize": self.maxsize}
+
+
+# --design-system and page-override generation search the same (or
+# overlapping) query text several times per run. Query tokenization only
+# depends on the tokenizer; top-k results are keyed by the index's generation, so
+# an index rebuilt after its CSV changed never serves stale hits (old
+# entries just age out).
+_query_token_cache = _LRUCache(maxsize=1024)  # (tokenizer, query) -> tuple(tokens)
+_top_k_cache = _LRUCache(maxsize=512)         # (generation, backend, query, k) -> ((idx, score), ...)
+_index_generations = itertools.count()
+
+
+def cache_stats():
+    """Hit/miss counters for the query caches."""
+    return {"query_tokens": _query_token_cache.stats(), "top_k": _top_k_cache.stats()}
+
+
+# ============ SCORING BACKENDS ============
+# BM25 scores with a pure-Python postings walk by default. Large indexes
+# (google-fonts) can instead score with NumPy over a CSR matrix of
+# precomputed term weights: one vectorized pass per query term.
+#
+# UI_PRO_MAX_SCORER=numpy|python forces a backend; unset, NumPy is used when
+# it imports and the index has at least NUMPY_MIN_DOCS documents -- below
+# that, importing NumPy costs more than it saves in a one-shot CLI call.
+NUMPY_MIN_DOCS = 1000
+
+_numpy = None
+
+
+def _import_numpy():
+    """numpy module, or None when it isn't installed (imported on first use)."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def _scoring_backend(n_docs):
+    """'numpy' or 'python' for an index of n_docs documents."""
+    forced = os.environ.get("UI_PRO_MAX_SCORER", "").strip().lower()
+    if forced == "python":
+        return "python"
+    if forced == "numpy":
+        if _import_numpy() is None:
+            raise ImportError("UI_PRO_MAX_SCORER=numpy but NumPy is not installed")
+        return "numpy"
+    if forced:
+        raise ValueError(f"UI_PRO_MAX_SCORER must be 'numpy' or 'python', not {forced!r}")
+    if n_docs >= NUMPY_MIN_DOCS and _import_numpy() is not None:
+        return "numpy"
+    return "python"
+
+
+class _CSRScorer:
+    """Term-major CSR matrix of BM25 term weights, scored with NumPy.
+
+    Row t holds tf * (k1 + 1) / (tf + k1 * norm(doc)) for every document
+    containing term t, so a query is one idf-scaled scatter-add per token.
+    """
+
+    def __init__(self, bm25):
+        np = _import_numpy()
+        self.np = np
+        self.N = bm25.N
+        self.rows = {}
+        indptr = [0]
+        indices = array('I')
+        tfs = array('I')
+        for term, (idxs, freqs) in bm25._postings.items():
+            self.rows[term] = len(indptr) - 1
+            indices.extend(idxs)
+            tfs.extend(freqs)
+            indptr.append(len(indices))
+        self.indptr = indptr
+        self.indices = np.array(indices, dtype=np.int32)
+        tf = np.array(tfs, dtype=np.float64)
+        norms = np.frombuffer(bm25._norms, dtype=np.float64)
+        self.weights = tf * (bm25.k1 + 1) / (tf + norms[self.indices])
+
+    def scores(self, tokens, idf):
+        """Dense float64 score vector for a tokenized query."""
+        scores = self.np.zeros(self.N)
+        for token in tokens:
+            row = self.rows.get(token)
+            if row is None:
+                continue
+            start, end = self.indptr[row], self.indptr[row + 1]
+            # Each document appears at most once per row, so fancy-index += is safe.
+            scores[self.indices[start:end]] += idf[token] * self.weights[start:end]
+        return scores
+
+    def top_k(self, tokens, idf, k):
+        scores = self.scores(tokens, idf)
+        candidates = self.np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            # Keep everything tied with the k-th best so ties still resolve by index.
+            kth = self.np.partition(scores[candidates], -k)[-k]
+            candidates = candidates[scores[candidates] >= kth]
+        return [(int(idx), float(scores[idx])) for idx in candidates]
+
+
+# ============ BM25 IMPLEMENTATION ============
+class BM25:
+    """BM25 ranking algorithm for text search.
+
+    Subclasses may override tokenize(); they must then set TOKENIZER to a
+    new id (and change it whenever their token output changes), since it
+    keys the query-token and on-disk index caches.
+    """
+
+    TOKENIZER = "simple-1"
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.corpus = []
+        self.doc_lengths = []
+        self.avgdl = 0
+        self.idf = {}
+        self.doc_freqs = defaultdict(int)
+        self.N = 0
+        self._postings = {}  # term -> (array('I') doc idxs, array('I') term freqs), in doc order
+        self._norms = array('d')  # per-doc k1 * (1 - b + b * doc_len / avgdl)
+        self._generation = next(_index_generations)  # identifies this fit in _top_k_cache
+        self.backend = None  # 'numpy' | 'python'; chosen on first query unless set explicitly
+        self._csr = None  # _CSRScorer for the numpy backend
+        self._suggestions = None  # SuggestionIndex, built on the first suggest()
+
+    def tokenize(self, text):
+        """Lowercase, split, remove punctuation, filter short words"""
+        words = str(text).lower().translate(_PUNCTUATION_TO_SPACE).split()
+        return [w for w in words if len(w) > 2]
+
+    def fit(self, documents):
+        """Build BM25 index (with per-term postings lists) from documents"""
+        self._generation = next(_index_generations)
+        self._csr = None
+        self._suggestions = None
+        self.idf = {}
+        self.doc_freqs = defaultdict(int)
+        self.corpus = [self.tokenize(doc) for doc in documents]
+        self.N = len(self.corpus)
+        if self.N == 0:
+            return
+        self.doc_lengths = [len(doc) for doc in self.corpus]
+        self.avgdl = sum(self.doc_lengths) / self.N
+
+        self._postings = {}
+        for idx, doc in enumerate(self.corpus):
+            tf = defaultdict(int)
+            for word in doc:
+                tf[word] += 1
+            for word, freq in tf.items():
+                self.doc_freqs[word] += 1
+                postings = self._postings.get(word)
+                if postings is None:
+                    postings = self._postings[word] = (array('I'), array('I'))
+                postings[0].append(idx)
+                postings[1].append(freq)
+
+        self._compute_idf()
+        self._compute_norms()
+
+    def _compute_idf(self):
+        for word, freq in self.doc_freqs.items():
+            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+
+    def _compute_norms(self):
+        # avgdl is 0 when no document has a single token; nothing is ever
+        # scored then, so any finite norm will do.
+        k1, b, avgdl = self.k1, self.b, self.avgdl or 1
+        self._norms = array('d', (k1 * (1 - b + b * doc_len / avgdl) for doc_len in self.doc_lengths))
+
+    def to_state(self):
+        """JSON-serializable snapshot of the fitted index, for from_state().
+
+        Postings are flattened to [idx, tf, idx, tf, ...] to keep the on-disk
+        cache compact. The tokenized corpus is not included.
+        """
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "doc_lengths": self.doc_lengths,
+            "postings": {
+                term: [value for pair in zip(idxs, tfs) for value in pair]
+                for term, (idxs, tfs) in self._postings.items()
+            },
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a fitted index from to_state() output without re-tokenizing.
+
+        Scores, rankings and vocabulary() order match the original index;
+        only `corpus` is left empty.
+        """
+        bm25 = cls(k1=state["k1"], b=state["b"])
+        bm25.doc_lengths = list(state["doc_lengths"])
+        bm25.N = len(bm25.doc_lengths)
+        if bm25.N == 0:
+            return bm25
+        bm25.avgdl = sum(bm25.doc_lengths) / bm25.N
+        for term, flat in state["postings"].items():
+            bm25._postings[term] = (array('I', flat[0::2]), array('I', flat[1::2]))
+            bm25.doc_freqs[term] = len(flat) // 2
+        bm25._compute_idf()
+        bm25._compute_norms()
+        return bm25
+
+    def _query_tokens(self, query):
+        """tokenize() for queries, memoized in _query_token_cache."""
+        key = (self.TOKENIZER, query)
+        tokens = _query_token_cache.get(key)
+        if tokens is None:
+            tokens = tuple(self.tokenize(query))
+            _query_token_cache.put(key, tokens)
+        return tokens
+
+    def _vectorized(self):
+        """The _CSRScorer when the numpy backend is selected, else None."""
+        if self.backend is None:
+            self.backend = _scoring_backend(self.N)
+        if self.backend != "numpy" or not self.N:
+            return None
+        if self._csr is None:
+            self._csr = _CSRScorer(self)
+        return self._csr
+
+    def _accumulate(self, query):
+        """Sparse {doc idx: score} for documents sharing a term with query."""
+        scores = {}
+        k1_plus_1 = self.k1 + 1
+        norms = self._norms
+        for token in self._query_tokens(query):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = self.idf[token]
+            for idx, tf in zip(*postings):
+                scores[idx] = scores.get(idx, 0) + idf * (tf * k1_plus_1) / (tf + norms[idx])
+        return scores
+
+    def score(self, query):
+        """Score all documents against query.
+
+        Only documents on a query term's postings list are visited; the rest
+        keep a score of 0, so the ranking is identical to a full scan.
+        """
+        csr = self._vectorized()
+        if csr is not None:
+            scores = csr.scores(self._query_tokens(query), self.idf).tolist()
+            return sorted(enumerate(scores), key=lambda x: x[1], reverse=True)
+        scores = [0] * self.N
+        for idx, score in self._accumulate(query).items():
+            scores[idx] = score
+        return sorted(enumerate(scores), key=lambda x: x[1], reverse=True)
+
+    def top_k(self, query, k):
+        """Best k (idx, score) pairs with score > 0, highest first.
+
+        Bounded heap selection instead of sorting every document. Ties go to
+        the lower document index, matching the stable order of score().
+        """
+        if k <= 0:
+            return []
+        csr = self._vectorized()
+        key = (self._generation, self.backend, query, k)
+        hits = _top_k_cache.get(key)
+        if hits is None:
+            if csr is not None:
+                scored = csr.top_k(self._query_tokens(query), self.idf, k)
+            else:
+                scored = ((idx, score) for idx, score in self._accumulate(query).items() if score > 0)
+            hits = tuple(heapq.nlargest(k, scored, key=lambda x: (x[1], -x[0])))
+            _top_k_cache.put(key, hits)
+        return list(hits)
+
+    def score_ceiling(self, query):
+        """Upper bound on any document's score for query in this index.
+
+        Each term contributes at most idf * (k1 + 1) however often it occurs.
+        Only terms this index contains count: charging absent terms at some
+        notional idf grew the ceiling with corpus size and with the number of
+        query words a domain lacks, which favoured small CSVs. Dividing by the
+        ceiling puts scores from indexes of different sizes on one 0-1 scale,
+        where a document scores high by matching the index's share of the
+        query strongly. 0 when no query term is indexed (there are no hits).
+        """
+        return (self.k1 + 1) * sum(self.idf[token] for token in self._query_tokens(query) if token in self.idf)
+
+    def vocabulary(self):
+        """All indexed terms, for suggestion/typo-recovery purposes."""
+        return list(self.idf.keys())
+
+    def suggest(self, query, limit=6):
+        """Indexed terms closest to query's tokens (typos, truncated words),
+        most common first -- for retrying a query that matched nothing."""
+        return self.suggest_tokens(self._query_tokens(query), limit)
+
+    def suggest_tokens(self, tokens, limit=6):
+        """suggest() for tokens that are already tokenized (tokenize() output),
+        which must not be normalized a second time."""
+        if not tokens or not self.N:
+            return []
+        if self._suggestions is None:
+            self._suggestions = SuggestionIndex(self.doc_freqs)
+        return self._suggestions.suggest(tokens, limit)
+
+
+# ============ SUGGESTIONS ============
+def _trigrams(term):
+    padded = f"^{term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, limit):
+    """Optimal string alignment distance (a swap counts as one edit), or
+    limit + 1 as soon as it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cost = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb and previous2[j - 2] + 1 < cost:
+                cost = previous2[j - 2] + 1
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SuggestionIndex:
+    """Typo-tolerant lookup over an index's vocabulary.
+
+    Terms are indexed by their character trigrams. A query token is only
+    compared against the MAX_CANDIDATES terms sharing the most trigrams
+    with it, so lookups cost the same on a 50-row domain as on
+    google-fonts. Candidates within a length-scaled edit distance, or that
+    complete the token as a prefix, are kept and ranked by distance, then
+    by document frequency.
+    """
+
+    MAX_CANDIDATES = 64
+
+    def __init__(self, doc_freqs):
+        self.doc_freqs = dict(doc_freqs)
+        self._grams = defaultdict(list)
+        for term in self.doc_freqs:
+            for gram in _trigrams(term):
+                self._grams[gram].append(term)
+
+    @staticmethod
+    def max_distance(token):
+        """Edits tolerated for a token: 1 up to 7 chars, 2 up to 11, then 3."""
+        return min(3, max(1, len(token) // 4))
+
+    def suggest(self, tokens, limit=6):
+        best = {}  # term -> smallest distance to any token
+        for token in tokens:
+            for term, distance in self._matches(token):
+                if distance < best.get(term, distance + 1):
+                    best[term] = distance
+        ranked = sorted(best, key=lambda term: (best[term], -self.doc_freqs[term], term))
+        return ranked[:limit]
+
+    def _matches(self, token):
+        if token in self.doc_freqs:
+            yield token, 0
+            return
+        grams = _trigrams(token)
+        shared = defaultdict(int)
+        for gram in grams:
+            for term in self._grams.get(gram, ()):
+                shared[term] += 1
+        limit = self.max_distance(token)
+        # Each edit changes at most three of a term's trigrams; terms sharing
+        # fewer can't be within `limit` edits (a prefix completion shares all
+        # but the token's final one).
+        needed = max(1, min(len(grams) - 4 * limit, len(grams) - 1))
+        candidates = heapq.nlargest(
+            self.MAX_CANDIDATES,
+            ((term, count) for term, count in shared.items() if count >= needed),
+            key=lambda item: (item[1], self.doc_freqs[item[0]]),
+        )
+        for term, _ in candidates:
+            distance = _edit_distance(token, term, limit)
+            if distance <= limit:
+                yield term, distance
+            elif term.startswith(token):
+                yield term, limit
+
+
+# ============ CSV / INDEX CACHE ============
+# Data files are small and reused across multiple domain searches within a
+# single --design-system run; avoid re-reading + re-indexing the same file
+# repeatedly in one process.
+_csv_cache = {}   # filepath -> (mtime, rows)
+_bm25_cache = {}  # (filepath, tuple(search_cols), tokenizer) -> (mtime, BM25 instance)
+
+
+def _load_csv(filepath):
+    """Load CSV and return list of dicts, with mtime-based caching."""
+    mtime = filepath.stat().st_mtime
+    cached = _csv_cache.get(filepath)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    _csv_cache[filepath] = (mtime, rows)
+    return rows
+
+
+def _get_bm25(filepath, search_cols, data, index_class=BM25):
+    """Fitted index for this file+columns, with mtime-based caching."""
+    key = (filepath, tuple(search_cols), index_class.TOKENIZER)
+    mtime = filepath.stat().st_mtime
+    cached = _bm25_cache.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    bm25 = index_class()
+    bm25.fit(documents)
+    _bm25_cache[key] = (mtime, bm25)
+    return bm25
+
+
+# ============ ON-DISK INDEX CACHE ============
+# Every search CLI call is a new process, so the caches above
+# start empty each time. The parsed rows and fitted index are also written
+# to CACHE_DIR as JSON (never pickle -- loading a cache file must not be
+# able to run code) and reused by later processes until the CSV changes.
+#
+# Cache files are keyed by the index class's TOKENIZER id (change it
+# whenever tokenize() output changes) and INDEX_FORMAT (bump it whenever
+# to_state() changes shape); either one invalidates existing cache files.
+INDEX_FORMAT = 1
+
+
+def _cache_dir(namespace=None):
+    """Cache directory, or None when disabled via UI_PRO_MAX_NO_CACHE.
+
+    Other skills searching through this engine pass their own namespace and
+    get a subdirectory of their own, so their entries never mix with
+    ui-ux-pro-max's.
+    """
+    if os.environ.get("UI_PRO_MAX_NO_CACHE"):
+        return None
+    override = os.environ.get("UI_PRO_MAX_CACHE_DIR")
+    if override:
+        root = Path(override)
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        root = Path(base) / "ui-ux-pro-max"
+    return root / namespace if namespace else root
+
+
+def _index_cache_path(cache_dir, filepath, search_cols, index_class):
+    key = json.dumps([str(filepath.resolve()), list(search_cols), index_class.TOKENIZER, INDEX_FORMAT])
+    return cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+
+def _file_sha256(filepath):
+    return hashlib.sha256(filepath.read_bytes()).hexdigest()
+
+
+def _read_index_cache(filepath, search_cols, index_class=BM25, namespace=None):
+    """(rows, BM25) from the on-disk cache, or None if missing, stale or corrupt.
+
+    A changed mtime alone (git checkout, copy) does not invalidate the entry:
+    when the size still matches, the content hash decides, and a match
+    records the new mtime in the entry.
+    """
+    cache_dir = _cache_dir(namespace)
+    if cache_dir is None:
+        return None
+    try:
+        with open(_index_cache_path(cache_dir, filepath, search_cols, index_class), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+        stat = filepath.stat()
+        if (entry["tokenizer"] != index_class.TOKENIZER
+                or entry["index_format"] != INDEX_FORMAT
+                or entry["source"] != str(filepath.resolve())
+                or entry["search_cols"] != list(search_cols)
+                or entry["size"] != stat.st_size):
+            return None
+        if entry["mtime_ns"] != stat.st_mtime_ns:
+            if entry["sha256"] != _file_sha256(filepath):
+                return None
+            # Same content under a new mtime: record it so later loads skip the hash.
+            entry["mtime_ns"] = stat.st_mtime_ns
+            _dump_index_cache(_index_cache_path(cache_dir, filepath, search_cols, index_class), entry)
+        fields = entry["fields"]
+        rows = [dict(zip(fields, values)) for values in entry["rows"]]
+        return rows, index_class.from_state(entry["index"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_index_cache(filepath, search_cols, rows, bm25, namespace=None):
+    """Best-effort atomic write of the index cache; failures are ignored."""
+    cache_dir = _cache_dir(namespace)
+    if cache_dir is None or not rows:
+        return
+    fields = list(rows[0].keys())
+    # Ragged rows (DictReader's None key / None values) don't round-trip.
+    if any(list(row.keys()) != fields or None in row.values() for row in rows):
+        return
+
+    stat = filepath.stat()
+    entry = {
+        "tokenizer": bm25.TOKENIZER,
+        "index_format": INDEX_FORMAT,
+        "source": str(filepath.resolve()),
+        "search_cols": list(search_cols),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": _file_sha256(filepath),
+        "fields": fields,
+        "rows": [[row[col] for col in fields] for row in rows],
+        "index": bm25.to_state(),
+    }
+    _dump_index_cache(_index_cache_path(cache_dir, filepath, search_cols, type(bm25)), entry)
+
+
+def _dump_index_cache(path, entry):
+    """Write entry to path via a temp file and rename; failures are ignored."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _load_index(filepath, search_cols, index_class=BM25, namespace=None):
+    """(rows, fitted index) for file+columns.
+
+    Checks the in-process caches, then the on-disk cache (under
+    _cache_dir(namespace)), and only parses the CSV and fits a new index
+    when both miss.
+    """
+    key = (filepath, tuple(search_cols), index_class.TOKENIZER)
+    mtime = filepath.stat().st_mtime
+    cached = _bm25_cache.get(key)
+    if cached and cached[0] == mtime:
+        return _load_csv(filepath), cached[1]
+
+    stored = _read_index_cache(filepath, search_cols, index_class, namespace)
+    if stored is not None:
+        rows, bm25 = stored
+        rows_cached = _csv_cache.get(filepath)
+        if rows_cached and rows_cached[0] == mtime:
+            rows = rows_cached[1]
+        else:
+            _csv_cache[filepath] = (mtime, rows)
+        _bm25_cache[key] = (mtime, bm25)
+        return rows, bm25
+
+    rows = _load_csv(filepath)
+    bm25 = _get_bm25(filepath, search_cols, rows, index_class)
+    _write_index_cache(filepath, search_cols, rows, bm25, namespace)
+    return rows, bm25
+
+
+# ============ SEARCH FUNCTIONS ============
+def search_csv(filepath, search_cols, output_cols, query, max_results, index_class=BM25,
+               namespace=None, raise_errors=False):
+    """Core search function using BM25. Returns (results, bm25_or_none).
+
+    An unreadable CSV comes back as a single {"_error": ...} row, or is
+    raised when raise_errors is set. namespace selects the on-disk cache
+    directory (see _cache_dir).
+    """
+    if not filepath.exists():
+        return [], None
+
+    try:
+        data, bm25 = _load_index(filepath, search_cols, index_class, namespace)
+    except (csv.Error, OSError, UnicodeDecodeError) as e:
+        if raise_errors:
+            raise
+        return [{"_error": f"Failed to read {filepath.name}: {e}"}], None
+
+    if not data:
+        return [], None
+
+    results = []
+    for idx, _score in bm25.top_k(query, max_results):
+        row = data[idx]
+        results.append({col: row.get(col, "") for col in output_cols if col in row})
+
+    return results, bm25
+
+
+# ============ DOMAIN DETECTION ============
+_END = None  # trie key marking "a keyword ends here" (never a character)
+
+
+class KeywordMatcher:
+    """A detect_domain() keyword table compiled into one character trie.
+
+    scores() finds every keyword present in a text in a single left-to-right
+    pass -- overlapping and nested keywords included ("font", "font pairing",
+    "sans serif font") -- instead of one substring test or regex search per
+    keyword. A keyword counts once per text however often it occurs, and
+    once per listing, exactly like looping over the table.
+
+    whole_words=True requires a word boundary on both sides of a match,
+    with the same semantics as re's \\b (word characters are str.isalnum()
+    or "_"); otherwise any substring matches, like `kw in text`.
+    `weight(kw)` is what a match adds to its domain's score (default 1).
+    """
+
+    def __init__(self, domain_keywords, whole_words=False, weight=None):
+        self.domains = list(domain_keywords)
+        self.whole_words = whole_words
+        self._trie = {}
+        for domain, keywords in domain_keywords.items():
+            for kw in keywords:
+                if not kw:
+                    continue
+                node = self._trie
+                for char in kw:
+                    node = node.setdefault(char, {})
+                node.setdefault(_END, []).append((domain, weight(kw) if weight else 1))
+
+    def scores(self, text):
+        """{domain: score} for text, in table order (zero when no keyword hits)."""
+        scores = dict.fromkeys(self.domains, 0)
+        n = len(text)
+        if self.whole_words:
+            is_word = [False] + [char.isalnum() or char == "_" for char in text] + [False]
+            boundary = [is_word[i] != is_word[i + 1] for i in range(n + 1)]
+        matched = set()
+        for start in range(n):
+            if self.whole_words and not boundary[start]:
+                continue
+            node = self._trie
+            for end in range(start, n):
+                node = node.get(text[end])
+                if node is None:
+                    break
+                hits = node.get(_END)
+                if hits and id(node) not in matched and (not self.whole_words or boundary[end + 1]):
+                    matched.add(id(node))
+                    for domain, points in hits:
+                        scores[domain] += points
+        return scores
+
+    def best(self, text, default):
+        """Highest-scoring domain (ties go to the earlier one), or default
+        when no keyword matches."""
+        scores = self.scores(text.lower())
+        best = max(scores, key=scores.get)
+        return best if scores[best] > 0 else default
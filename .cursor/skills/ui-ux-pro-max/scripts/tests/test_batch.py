@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for search.py --batch (batch.py): results come back one per request,
+in input order, identical to the single-request path.
+
+Stdlib-only (unittest, not pytest) to match test_core.py.
+
+Run with:
+    python -m unittest discover -s scripts/tests -v
+"""
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from batch import run_batch, run_design_system_batch  # noqa: E402
+from core import search, search_stack  # noqa: E402
+from design_system import generate_design_system  # noqa: E402
+
+
+_env_patcher = mock.patch.dict(os.environ)
+_cache_dir = None
+
+
+def setUpModule():
+    """Point the on-disk index cache (here and in any subprocess) at a temp
+    dir, so the tests never touch ~/.cache/ui-ux-pro-max."""
+    global _cache_dir
+    _cache_dir = tempfile.mkdtemp(prefix="ui-ux-pro-max-cache-")
+    _env_patcher.start()
+    os.environ["UI_PRO_MAX_CACHE_DIR"] = _cache_dir
+    os.environ.pop("UI_PRO_MAX_NO_CACHE", None)
+
+
+def tearDownModule():
+    _env_patcher.stop()
+    shutil.rmtree(_cache_dir, ignore_errors=True)
+
+
+LINES = [
+    '{"query": "glassmorphism dark"}\n',
+    '\n',
+    '{"query": "accessibility keyboard", "domain": "ux", "max_results": 1, "id": "a11y"}\n',
+    'not json\n',
+    '{"query": "list performance", "stack": "react-native"}\n',
+    '{"domain": "ux"}\n',
+    '{"query": "dashbord", "domain": "style", "relax": true}\n',
+]
+
+
+def _run(workers):
+    out = io.StringIO()
+    count = run_batch(LINES, out, workers=workers)
+    return count, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+class TestBatch(unittest.TestCase):
+    def test_results_match_single_requests_in_input_order(self):
+        count, results = _run(workers=1)
+        self.assertEqual(count, 6)
+        self.assertEqual(results[0], search("glassmorphism dark"))
+        self.assertEqual(results[1], {"id": "a11y", **search("accessibility keyboard", "ux", 1)})
+        self.assertIn("error", results[2])
+        self.assertEqual(results[3], search_stack("list performance", "react-native"))
+        self.assertIn("missing 'query'", results[4]["error"])
+        self.assertEqual(results[5], search("dashbord", "style", relax=True))
+
+    def test_workers_keep_output_order(self):
+        self.assertEqual(_run(workers=2), _run(workers=1))
+
+
+
+PROJECTS = [
+    '{"id": "ops", "query": "saas analytics dashboard", "project_name": "Ops Console", '
+    '"variance": 8, "density": 9, "pages": ["dashboard", "settings"]}\n',
+    '{"query": "beauty spa wellness service", "project_name": "Serenity Spa", "pages": "booking"}\n',
+    '\n',
+    '{"project_name": "No Query"}\n',
+]
+
+
+class TestDesignSystemBatch(unittest.TestCase):
+    def _run(self, output_dir, workers=1, force=False):
+        out = io.StringIO()
+        summary = run_design_system_batch(PROJECTS, out, workers=workers, output_dir=output_dir, force=force)
+        self.assertEqual(json.loads(out.getvalue()), summary)
+        return summary
+
+    def test_persists_every_project_with_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            summary = self._run(tmp)
+            self.assertEqual((summary["count"], summary["succeeded"], summary["failed"]), (3, 2, 1))
+            ops, spa, missing = summary["projects"]
+            self.assertEqual(ops["id"], "ops")
+            root = Path(tmp) / "design-system"
+            self.assertEqual(ops["created_files"], [str(root / "ops-console" / "MASTER.md"),
+                                                    str(root / "ops-console" / "pages" / "dashboard.md"),
+                                                    str(root / "ops-console" / "pages" / "settings.md")])
+            self.assertEqual(spa["created_files"][1:], [str(root / "serenity-spa" / "pages" / "booking.md")])
+            self.assertIn("total", ops["timings"])
+            self.assertIn("persist", ops["timings"])
+            self.assertIn("missing 'query'", missing["error"])
+
+    def test_matches_single_project_generation(self):
+        with tempfile.TemporaryDirectory() as batch_dir, tempfile.TemporaryDirectory() as single_dir:
+            self._run(batch_dir)
+            generate_design_system("saas analytics dashboard", "Ops Console", persist=True, output_dir=single_dir,
+                                   variance=8, density=9, pages=["dashboard", "settings"])
+            for name in ("MASTER.md", "pages/dashboard.md", "pages/settings.md"):
+                batch_file = Path(batch_dir) / "design-system" / "ops-console" / name
+                single_file = Path(single_dir) / "design-system" / "ops-console" / name
+                self.assertEqual(_without_dates(batch_file), _without_dates(single_file), name)
+
+    def test_existing_projects_are_skipped_unless_forced(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self._run(tmp)
+            self.assertEqual(self._run(tmp)["skipped"], 2)
+            self.assertEqual(self._run(tmp, force=True)["succeeded"], 2)
+
+    def test_workers_keep_project_order(self):
+        with tempfile.TemporaryDirectory() as one, tempfile.TemporaryDirectory() as two:
+            single = [(p.get("query"), p["status"]) for p in self._run(one)["projects"]]
+            pooled = [(p.get("query"), p["status"]) for p in self._run(two, workers=2)["projects"]]
+            self.assertEqual(pooled, single)
+
+    def test_cli_reads_projects_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            projects = Path(tmp) / "projects.jsonl"
+            projects.write_text(PROJECTS[1], encoding="utf-8")
+            result = subprocess.run(
+                [sys.executable, str(SCRIPTS_DIR / "search.py"), "--design-system", "--batch", str(projects),
+                 "--output-dir", tmp],
+                capture_output=True, text=True,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(json.loads(result.stdout)["succeeded"], 1)
+            self.assertTrue((Path(tmp) / "design-system" / "serenity-spa" / "pages" / "booking.md").exists())
+
+
+def _without_dates(path):
+    """File text minus generation-date lines, which differ run to run."""
+    return [line for line in path.read_text(encoding="utf-8").splitlines() if "Generated" not in line]
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
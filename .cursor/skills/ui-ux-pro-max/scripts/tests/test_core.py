@@ -11,17 +11,54 @@ or directly:
     python scripts/tests/test_core.py
 """
 
+import csv
+import importlib.util
+import os
+import re
+import shutil
+import subprocess
 import sys
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 SCRIPTS_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(SCRIPTS_DIR))
 
+import core
+import search_engine
 from core import BM25, detect_domain, search, search_stack, CSV_CONFIG, AVAILABLE_STACKS
+import design_system
 from design_system import generate_design_system, persist_design_system, DesignSystemGenerator
 
+_env_patcher = mock.patch.dict(os.environ)
+_cache_dir = None
+
+
+def setUpModule():
+    """Point the on-disk index cache at a temp dir for the whole module (and
+    the search.py subprocesses it starts), so the tests neither read nor
+    write ~/.cache/ui-ux-pro-max and don't depend on the caller's
+    UI_PRO_MAX_NO_CACHE."""
+    global _cache_dir
+    _cache_dir = tempfile.mkdtemp(prefix="ui-ux-pro-max-cache-")
+    _env_patcher.start()
+    os.environ["UI_PRO_MAX_CACHE_DIR"] = _cache_dir
+    os.environ.pop("UI_PRO_MAX_NO_CACHE", None)
+
+
+def tearDownModule():
+    _env_patcher.stop()
+    shutil.rmtree(_cache_dir, ignore_errors=True)
+
+
+def _subprocess_env():
+    """Environment for search.py subprocesses: the module's cache dir, caching on."""
+    env = dict(os.environ, UI_PRO_MAX_CACHE_DIR=_cache_dir)
+    env.pop("UI_PRO_MAX_NO_CACHE", None)
+    return env
+
 
 class TestTokenizer(unittest.TestCase):
     def test_short_domain_terms_are_kept(self):
@@ -43,6 +80,530 @@ class TestTokenizer(unittest.TestCase):
         self.assertEqual(bm25.tokenize("dark-mode toggle"), bm25.tokenize("dark toggle"))
 
 
+def _legacy_tokenize(text):
+    """The previous tokenizer, verbatim: one str.replace per synonym, then a
+    punctuation re.sub and str.split(). Kept as the golden reference."""
+    text = str(text).lower()
+    for variant, canonical in core._SYNONYMS.items():
+        text = text.replace(variant, canonical)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return [w for w in text.split() if len(w) >= 2 and w not in core._STOPWORDS]
+
+
+class TestTokenizerGolden(unittest.TestCase):
+    """The tokenizer must reproduce the legacy token stream on every
+    shipped CSV, or every cached index and ranking silently changes."""
+
+    def test_token_streams_match_legacy_on_all_data(self):
+        bm25 = BM25()
+        paths = sorted(core.DATA_DIR.glob("*.csv")) + sorted(core.DATA_DIR.glob("stacks/*.csv"))
+        self.assertTrue(paths)
+        for path in paths:
+            with self.subTest(csv=path.name):
+                with open(path, "r", encoding="utf-8") as f:
+                    rows = list(csv.reader(f))
+                for row in rows:
+                    text = " ".join(row)
+                    self.assertEqual(bm25.tokenize(text), _legacy_tokenize(text), text[:80])
+
+    def test_edge_cases_match_legacy(self):
+        bm25 = BM25()
+        for text in ("Colours & colour-blind nav", "UX/UI e-commerce dark-mode", "canvas a11y",
+                     "sign-up/log-in", "tabs\tand\nnewlines\u00a0nbsp", "", None, 42):
+            with self.subTest(text=text):
+                self.assertEqual(bm25.tokenize(text), _legacy_tokenize(text))
+
+
+class TestInvertedIndex(unittest.TestCase):
+    DOCS = [
+        "glassmorphism dark ui with blur",
+        "minimalism clean ui",
+        "brutalism bold asymmetric",
+        "dark dark dark neon",
+        "",
+    ]
+
+    def _full_scan(self, bm25, query):
+        tokens = bm25.tokenize(query)
+        scores = []
+        for idx, doc in enumerate(bm25.corpus):
+            total = 0
+            norm = bm25.k1 * (1 - bm25.b + bm25.b * bm25.doc_lengths[idx] / bm25.avgdl)
+            for token in tokens:
+                if token in bm25.idf:
+                    tf = doc.count(token)
+                    total += bm25.idf[token] * tf * (bm25.k1 + 1) / (tf + norm)
+            scores.append((idx, total))
+        return sorted(scores, key=lambda x: x[1], reverse=True)
+
+    def test_ranking_matches_full_scan(self):
+        bm25 = BM25()
+        bm25.fit(self.DOCS)
+        for query in ("dark ui", "ui ui minimalism", "neon", "nothing here", ""):
+            with self.subTest(query=query):
+                self.assertEqual(bm25.score(query), self._full_scan(bm25, query))
+
+    def test_documents_without_query_terms_score_zero(self):
+        bm25 = BM25()
+        bm25.fit(self.DOCS)
+        scores = dict(bm25.score("brutalism"))
+        self.assertGreater(scores[2], 0)
+        self.assertEqual([i for i, s in scores.items() if s > 0], [2])
+
+    def test_top_k_matches_sorted_prefix_without_zero_scores(self):
+        bm25 = BM25()
+        bm25.fit(self.DOCS)
+        for query in ("dark ui", "ui ui minimalism", "neon", "nothing here"):
+            for k in (1, 2, 3, 10):
+                with self.subTest(query=query, k=k):
+                    expected = [hit for hit in bm25.score(query)[:k] if hit[1] > 0]
+                    self.assertEqual(bm25.top_k(query, k), expected)
+
+    def test_corpus_without_tokens_scores_zero(self):
+        bm25 = BM25()
+        bm25.fit(["", "!!", "a"])
+        self.assertEqual(bm25.score("anything"), [(0, 0), (1, 0), (2, 0)])
+        self.assertEqual(bm25.top_k("anything", 3), [])
+
+    def test_norms_are_precomputed_and_survive_round_trip(self):
+        bm25 = BM25()
+        bm25.fit(self.DOCS)
+        expected = [bm25.k1 * (1 - bm25.b + bm25.b * dl / bm25.avgdl) for dl in bm25.doc_lengths]
+        self.assertEqual(list(bm25._norms), expected)
+        restored = BM25.from_state(bm25.to_state())
+        self.assertEqual(list(restored._norms), expected)
+        self.assertEqual(restored.score("dark ui"), bm25.score("dark ui"))
+
+    def test_top_k_ties_go_to_lower_index(self):
+        bm25 = BM25()
+        bm25.fit(["red card", "blue card", "green card"])
+        self.assertEqual([idx for idx, _ in bm25.top_k("card", 2)], [0, 1])
+
+
+class TestScoringBackends(unittest.TestCase):
+    """The NumPy CSR backend must rank like the pure-Python postings walk."""
+
+    QUERIES = ("geometric sans serif", "noto sans arabic", "roboto", "monospace code code",
+               "handwriting script casual", "zzqqxx", "")
+
+    def setUp(self):
+        core._top_k_cache.clear()
+
+    def _index(self, backend):
+        config = CSV_CONFIG["google-fonts"]
+        rows = core._load_csv(core.DATA_DIR / config["file"])
+        bm25 = BM25()
+        bm25.fit([" ".join(str(row.get(col, "")) for col in config["search_cols"]) for row in rows])
+        with mock.patch.dict(os.environ, {"UI_PRO_MAX_SCORER": backend}):
+            bm25._vectorized()
+        self.assertEqual(bm25.backend, backend)
+        return bm25
+
+    def test_forced_python_backend_never_vectorizes(self):
+        bm25 = self._index("python")
+        bm25.top_k("roboto", 3)
+        self.assertIsNone(bm25._csr)
+
+    def test_unknown_backend_is_rejected(self):
+        with mock.patch.dict(os.environ, {"UI_PRO_MAX_SCORER": "fortran"}):
+            with self.assertRaises(ValueError):
+                core._scoring_backend(10)
+
+    def test_small_indexes_stay_pure_python(self):
+        with mock.patch.dict(os.environ, {"UI_PRO_MAX_SCORER": ""}):
+            self.assertEqual(core._scoring_backend(core.NUMPY_MIN_DOCS - 1), "python")
+
+    @unittest.skipUnless(core._import_numpy(), "NumPy not installed")
+    def test_numpy_scores_match_python_within_tolerance(self):
+        python, vectorized = self._index("python"), self._index("numpy")
+        self.assertIsNotNone(vectorized._csr)
+        for query in self.QUERIES:
+            with self.subTest(query=query):
+                expected = dict(python.score(query))
+                actual = dict(vectorized.score(query))
+                self.assertEqual(actual.keys(), expected.keys())
+                for idx, score in expected.items():
+                    self.assertAlmostEqual(actual[idx], score, places=9)
+
+    @unittest.skipUnless(core._import_numpy(), "NumPy not installed")
+    def test_numpy_top_k_matches_python(self):
+        python, vectorized = self._index("python"), self._index("numpy")
+        for query in self.QUERIES:
+            for k in (1, 3, 10):
+                with self.subTest(query=query, k=k):
+                    expected = python.top_k(query, k)
+                    actual = vectorized.top_k(query, k)
+                    self.assertEqual([idx for idx, _ in actual], [idx for idx, _ in expected])
+                    for (_, a), (_, e) in zip(actual, expected):
+                        self.assertAlmostEqual(a, e, places=9)
+
+
+class TestQueryCaches(unittest.TestCase):
+    def setUp(self):
+        core._query_token_cache.clear()
+        core._top_k_cache.clear()
+
+    def test_repeated_query_is_served_from_cache(self):
+        bm25 = BM25()
+        bm25.fit(TestInvertedIndex.DOCS)
+        first = bm25.top_k("dark ui", 3)
+        with mock.patch.object(bm25, "_accumulate", side_effect=AssertionError("rescored")):
+            self.assertEqual(bm25.top_k("dark ui", 3), first)
+        self.assertEqual(core.cache_stats()["top_k"]["hits"], 1)
+
+    def test_refit_does_not_serve_stale_results(self):
+        bm25 = BM25()
+        bm25.fit(["dark neon", "light pastel"])
+        self.assertEqual([idx for idx, _ in bm25.top_k("pastel", 1)], [1])
+        bm25.fit(["light pastel", "dark neon"])
+        self.assertEqual([idx for idx, _ in bm25.top_k("pastel", 1)], [0])
+
+    def test_callers_cannot_mutate_cached_results(self):
+        bm25 = BM25()
+        bm25.fit(TestInvertedIndex.DOCS)
+        bm25.top_k("dark", 3).clear()
+        self.assertTrue(bm25.top_k("dark", 3))
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = core._LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["size"], 2)
+
+
+class TestIndexCache(unittest.TestCase):
+    COLS = ["Name", "Keywords"]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = Path(tmp.name) / "cache"
+        self.csv_path = Path(tmp.name) / "data.csv"
+        self.csv_path.write_text(
+            "Name,Keywords,Notes\nAurora,gradient glow,a\nBento,grid cards,b\nGlass,blur glow,c\n",
+            encoding="utf-8",
+        )
+        patcher = mock.patch.dict(os.environ, {"UI_PRO_MAX_CACHE_DIR": str(self.cache_dir)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fresh_process_load(self):
+        core._csv_cache.clear()
+        core._bm25_cache.clear()
+        return core._load_index(self.csv_path, self.COLS)
+
+    def test_second_process_loads_from_disk_without_refitting(self):
+        rows, bm25 = self._fresh_process_load()
+        self.assertEqual(len(list(self.cache_dir.glob("*.json"))), 1)
+
+        with mock.patch.object(core.BM25, "fit", side_effect=AssertionError("refit")):
+            cached_rows, cached_bm25 = self._fresh_process_load()
+        self.assertEqual(cached_rows, rows)
+        self.assertEqual(cached_bm25.score("glow grid"), bm25.score("glow grid"))
+        self.assertEqual(cached_bm25.vocabulary(), bm25.vocabulary())
+
+    def test_changed_data_rebuilds_the_cache(self):
+        self._fresh_process_load()
+        self.csv_path.write_text("Name,Keywords,Notes\nNeon,glow night,d\n", encoding="utf-8")
+        rows, bm25 = self._fresh_process_load()
+        self.assertEqual([row["Name"] for row in rows], ["Neon"])
+        self.assertEqual(bm25.N, 1)
+
+    def test_touched_csv_is_hashed_once_then_trusted(self):
+        """A new mtime with unchanged content reuses the entry and records
+        the new mtime, so the next load doesn't hash the CSV again."""
+        rows, _ = self._fresh_process_load()
+        stat = self.csv_path.stat()
+        os.utime(self.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        with mock.patch.object(core.BM25, "fit", side_effect=AssertionError("refit")):
+            self.assertEqual(self._fresh_process_load()[0], rows)
+            with mock.patch.object(search_engine, "_file_sha256", side_effect=AssertionError("rehashed")):
+                self.assertEqual(self._fresh_process_load()[0], rows)
+        self.assertEqual(list(self.cache_dir.glob("*.tmp")), [])
+
+    def test_corrupt_cache_file_is_ignored(self):
+        self._fresh_process_load()
+        for path in self.cache_dir.glob("*.json"):
+            path.write_text("{not json", encoding="utf-8")
+        rows, bm25 = self._fresh_process_load()
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(bm25.N, 3)
+
+    def test_disabled_cache_writes_nothing(self):
+        with mock.patch.dict(os.environ, {"UI_PRO_MAX_NO_CACHE": "1"}):
+            self._fresh_process_load()
+        self.assertFalse(self.cache_dir.exists())
+
+
+class TestSharedEngine(unittest.TestCase):
+    """search_engine.py is shared by every skill; tokenizers must not leak
+    into each other's caches."""
+
+    SKILLS_DIR = SCRIPTS_DIR.parent.parent
+
+    def _load_module(self, relpath):
+        path = self.SKILLS_DIR / relpath
+        spec = importlib.util.spec_from_file_location(f"_skill_{path.parent.name}_{path.stem}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_other_skills_use_the_shared_engine(self):
+        for relpath, query in (("design/scripts/logo/core.py", "modern tech"),
+                               ("design/scripts/cip/core.py", "business card"),
+                               ("design-system/scripts/slide_search_core.py", "investor pitch")):
+            with self.subTest(module=relpath):
+                module = self._load_module(relpath)
+                self.assertIs(module.BM25, search_engine.BM25)
+                self.assertGreater(module.search(query)["count"], 0)
+
+    SKILL_CORES = (("design/scripts/logo/core.py", "modern tech", "design/logo"),
+                   ("design/scripts/cip/core.py", "business card", "design/cip"),
+                   ("design-system/scripts/slide_search_core.py", "investor pitch", "design-system"))
+
+    def test_other_skills_cache_indexes_in_their_own_namespace(self):
+        for relpath, query, namespace in self.SKILL_CORES:
+            with self.subTest(module=relpath), tempfile.TemporaryDirectory() as tmp:
+                module = self._load_module(relpath)
+                self.assertEqual(module.CACHE_NAMESPACE, namespace)
+                search_engine._csv_cache.clear()
+                search_engine._bm25_cache.clear()
+                with mock.patch.dict(os.environ, {"UI_PRO_MAX_CACHE_DIR": tmp}):
+                    module.search(query)
+                self.assertTrue(list((Path(tmp) / namespace).glob("*.json")))
+                self.assertFalse(list(Path(tmp).glob("*.json")))
+
+    def test_other_skills_raise_on_unreadable_csv(self):
+        for relpath, query, _namespace in self.SKILL_CORES:
+            with self.subTest(module=relpath), tempfile.TemporaryDirectory() as tmp:
+                module = self._load_module(relpath)
+                domain = module.detect_domain(query)
+                (Path(tmp) / module.CSV_CONFIG[domain]["file"]).write_bytes(b"Name\n\xff\xfe\n")
+                with mock.patch.object(module, "DATA_DIR", Path(tmp)), self.assertRaises(UnicodeDecodeError):
+                    module.search(query, domain)
+
+    def test_tokenizers_get_separate_indexes_for_the_same_file(self):
+        config = CSV_CONFIG["style"]
+        path = core.DATA_DIR / config["file"]
+        _, ui_index = core._load_index(path, config["search_cols"])
+        _, simple_index = search_engine._load_index(path, config["search_cols"])
+        self.assertIsInstance(ui_index, core.BM25)
+        self.assertNotIsInstance(simple_index, core.BM25)
+        self.assertIn("ui", ui_index.vocabulary())
+        self.assertNotIn("ui", simple_index.vocabulary())
+
+    def test_query_token_cache_is_keyed_by_tokenizer(self):
+        self.assertEqual(core.BM25()._query_tokens("ui kit"), ("ui", "kit"))
+        self.assertEqual(search_engine.BM25()._query_tokens("ui kit"), ("kit",))
+
+    def test_keyword_matcher_prefers_most_hits_then_first_listed(self):
+        matcher = search_engine.KeywordMatcher({"a": ["red", "blue"], "b": ["blue", "green", "red"]})
+        self.assertEqual(matcher.best("Red Green", "z"), "b")
+        self.assertEqual(matcher.best("blue", "z"), "a")
+        self.assertEqual(matcher.best("grey", "z"), "z")
+
+    def test_skill_detect_domain_matches_substring_counting(self):
+        """The compiled matchers score exactly like `sum(kw in query ...)`."""
+        for relpath in ("design/scripts/logo/core.py", "design/scripts/cip/core.py",
+                        "design-system/scripts/slide_search_core.py"):
+            module = self._load_module(relpath)
+            table = module._DOMAIN_KEYWORDS
+            keywords = [kw for kws in table.values() for kw in kws]
+            queries = keywords + [f"{a} {b}" for a, b in zip(keywords, reversed(keywords))] + [
+                "", "x", "Tech-Startup #1 brand", "ALL-HANDS qbr deck", "barcharts pieline"]
+            for query in queries:
+                with self.subTest(module=relpath, query=query):
+                    expected = {d: sum(1 for kw in kws if kw in query.lower()) for d, kws in table.items()}
+                    self.assertEqual(module._DOMAIN_MATCHER.scores(query.lower()), expected)
+
+
+def _reference_domain_scores(query_lower, patterns):
+    """detect_domain()'s previous scoring: one \\b regex search per keyword."""
+    return {domain: sum(weight for pattern, weight in compiled if pattern.search(query_lower))
+            for domain, compiled in patterns.items()}
+
+
+class TestDomainMatcher(unittest.TestCase):
+    """The compiled matcher must reproduce the per-keyword \\b regex scores."""
+
+    def _queries(self):
+        keywords = sorted({kw for kws in core._domain_keywords().values() for kw in kws})
+        # Every keyword alone, plus glued/punctuated variants of a sample
+        # (the reference is slow: one regex search per keyword per query).
+        queries = list(keywords)
+        for i, kw in enumerate(keywords[::10]):
+            other = keywords[(i * 7 + 3) % len(keywords)]
+            queries += [f"{kw} {other}", f"{kw}-{other}", f"{kw}{other}", f"x{kw}", f"{kw}_",
+                        f"({kw}).", f"pre {kw}/{other} post"]
+        queries += ["", "#", "a#b", "c# and f#", "UI/UX e-commerce dark mode", "font pairing for a saas dashboard",
+                    "sans serif font for fintech", "next.js rsc waterfall", "scroll-triggered parallax"]
+        return [q.lower() for q in queries]
+
+    def test_scores_match_per_keyword_regex(self):
+        matcher = core._domain_matcher()
+        patterns = {
+            domain: [(re.compile(r'\b' + re.escape(kw) + r'\b'), max(1, len(kw.split()))) for kw in keywords]
+            for domain, keywords in core._domain_keywords().items()
+        }
+        mismatches = [query for query in self._queries()
+                      if matcher.scores(query) != _reference_domain_scores(query, patterns)]
+        self.assertEqual(mismatches, [])
+
+    def test_matcher_is_rebuilt_with_keyword_table(self):
+        first = core._domain_matcher()
+        self.assertIs(core._domain_matcher(), first)
+        with mock.patch.object(core, "_products_mtime", return_value=-1.0):
+            self.assertIsNot(core._domain_matcher(), first)
+        core._domain_keywords()  # restore the real table for later tests
+
+
+class TestSuggestions(unittest.TestCase):
+    """Zero-hit queries suggest the terms the user most likely meant."""
+
+    def test_misspelled_queries_suggest_intended_term(self):
+        for query, domain, expected in [("dashbord", "style", "dashboard"), ("glasmorphsm", "style", "glassmorphism"),
+                                        ("robotto", "google-fonts", "roboto"), ("montserat", "google-fonts", "montserrat")]:
+            with self.subTest(query=query):
+                result = search(query, domain=domain)
+                self.assertEqual(result["count"], 0)
+                self.assertEqual(result["suggestions"][0], expected)
+
+    def test_ranked_by_distance_then_document_frequency(self):
+        bm25 = search_engine.BM25()
+        bm25.fit(["color", "colon colon", "colon", "colonnade", "colour"])
+        self.assertEqual(bm25.suggest("colox"), ["colon", "color"])
+
+    def test_prefix_completes_truncated_token(self):
+        bm25 = search_engine.BM25()
+        bm25.fit(["minimalism", "minimalist", "maximalism"])
+        self.assertEqual(bm25.suggest("minim"), ["minimalism", "minimalist"])
+
+    def test_unrelated_query_has_no_suggestions(self):
+        self.assertEqual(search("zzqqxx", domain="ux")["suggestions"], [])
+
+    def test_refit_rebuilds_suggestions(self):
+        bm25 = search_engine.BM25()
+        bm25.fit(["dashboard"])
+        self.assertEqual(bm25.suggest("dashbord"), ["dashboard"])
+        bm25.fit(["keyboard"])
+        self.assertEqual(bm25.suggest("dashbord"), [])
+
+    def test_suggestions_are_near_matches(self):
+        _, bm25 = core._load_index(core.DATA_DIR / CSV_CONFIG["google-fonts"]["file"],
+                                   CSV_CONFIG["google-fonts"]["search_cols"])
+        for term in sorted(bm25.doc_freqs)[::50]:
+            typo = term[:-1] + "q"
+            limit = search_engine.SuggestionIndex.max_distance(typo)
+            for suggestion in bm25.suggest(typo, limit=20):
+                self.assertTrue(search_engine._edit_distance(typo, suggestion, limit) <= limit
+                                or suggestion.startswith(typo), (typo, suggestion))
+
+
+class TestRelaxation(unittest.TestCase):
+    def test_off_by_default(self):
+        result = search("dashbord", domain="style")
+        self.assertEqual(result["count"], 0)
+        self.assertNotIn("relaxed", result)
+
+    def test_misspelled_query_uses_suggested_terms(self):
+        result = search("dashbord glasmorphsm", domain="style", relax=True)
+        self.assertGreater(result["count"], 0)
+        self.assertEqual(result["query"], "dashboard glassmorphism")
+        self.assertEqual(result["relaxed"], {"strategy": "suggested_terms", "original_query": "dashbord glasmorphsm",
+                                             "original_domain": "style", "tried": ["suggested_terms"]})
+        self.assertEqual({k: v for k, v in result.items() if k != "relaxed"},
+                         search("dashboard glassmorphism", domain="style"))
+
+    def test_query_is_normalized_once(self):
+        """Suggestions are looked up for tokenize() output as-is; running the
+        synonym folding over it again could rewrite an already-folded term."""
+        config = CSV_CONFIG["style"]
+        _, bm25 = core._load_index(core.DATA_DIR / config["file"], config["search_cols"])
+        with mock.patch.object(core.BM25, "tokenize", autospec=True, side_effect=core.BM25.tokenize) as tokenize:
+            self.assertEqual(core._relaxed_query(bm25, "dashbord glasmorphsm"), "dashboard glassmorphism")
+        self.assertEqual(tokenize.call_count, 1)
+
+    def test_unrecoverable_query_reports_attempts(self):
+        result = search("zzqqxx", domain="ux", relax=True)
+        self.assertEqual(result["count"], 0)
+        self.assertEqual(result["relaxed"], {"strategy": None, "tried": []})
+
+    def test_auto_detected_query_is_rerouted_when_its_domain_has_no_close_terms(self):
+        self.assertEqual(search("robotto", domain="style", relax=True)["relaxed"], {"strategy": None, "tried": []})
+        result = search("robotto", relax=True)
+        self.assertGreater(result["count"], 0)
+        self.assertEqual((result["domain"], result["query"]), ("typography", "roboto"))
+        self.assertEqual(result["relaxed"], {"strategy": "redetected_domain", "original_query": "robotto",
+                                             "original_domain": "style", "tried": ["redetected_domain"]})
+
+    def test_stack_search_relaxes_spelling(self):
+        result = search_stack("performanse", "react-native", relax=True)
+        self.assertGreater(result["count"], 0)
+        self.assertEqual(result["relaxed"]["strategy"], "suggested_terms")
+        self.assertEqual(result["relaxed"]["original_domain"], "react-native")
+
+
+class TestFederatedSearch(unittest.TestCase):
+    QUERY = "dark mode glassmorphism dashboard"
+
+    def test_scores_are_normalized_and_ranked(self):
+        result = core.search_all_domains(self.QUERY, k=8)
+        scores = [row["score"] for row in result["results"]]
+        self.assertEqual(result["count"], 8)
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(0 < score < 1 for score in scores))
+        self.assertGreater(len({row["domain"] for row in result["results"]}), 1)
+
+    def test_hits_never_exceed_score_ceiling(self):
+        for domain, config in CSV_CONFIG.items():
+            with self.subTest(domain=domain):
+                _, bm25 = core._load_index(core.DATA_DIR / config["file"], config["search_cols"])
+                for query in ["dark mode glassmorphism dashboard", "sans serif", "scroll stagger reveal"]:
+                    ceiling = bm25.score_ceiling(query)
+                    for _, score in bm25.top_k(query, 5):
+                        self.assertLessEqual(score, ceiling)
+
+    def test_ceiling_ignores_terms_the_index_lacks(self):
+        config = CSV_CONFIG["google-fonts"]
+        _, bm25 = core._load_index(core.DATA_DIR / config["file"], config["search_cols"])
+        self.assertEqual(bm25.score_ceiling("serif font zzqqxx"), bm25.score_ceiling("serif font"))
+        self.assertEqual(bm25.score_ceiling("zzqqxx"), 0)
+
+    def test_ambiguous_queries_keep_their_detected_domain_rows(self):
+        """A big CSV lacking one query word used to lose to a small CSV that
+        merely mentioned it ("blog" pulled products over fonts)."""
+        for query, detected, runner_up in (("serif font for blog", "google-fonts", "product"),
+                                           ("sans serif font dashboard", "google-fonts", "product"),
+                                           ("saas landing page hero", "product", "landing"),
+                                           ("hero section landing page", "landing", "product")):
+            with self.subTest(query=query):
+                self.assertEqual(detect_domain(query, return_scores=True), (detected, runner_up))
+                result = search(query)
+                self.assertEqual(result["results"][0]["domain"], detected)
+        self.assertEqual({row["domain"] for row in search("serif font for blog")["results"]}, {"google-fonts"})
+        self.assertIn("landing", {row["domain"] for row in search("saas landing page hero")["results"]})
+
+    def test_single_domain_matches_plain_search(self):
+        merged = core.search_all_domains(self.QUERY, k=3, domains=["style"])
+        rows = [{k: v for k, v in row.items() if k not in ("domain", "score")} for row in merged["results"]]
+        self.assertEqual(rows, search(self.QUERY, domain="style", max_results=3)["results"])
+
+    def test_ambiguous_auto_detection_merges_both_domains(self):
+        query = "rgb hex token tailwind"
+        self.assertEqual(detect_domain(query, return_scores=True), ("color", "style"))
+        result = search(query)
+        self.assertEqual(result["federated"], ["color", "style"])
+        self.assertEqual(result["file"], CSV_CONFIG["color"]["file"])
+        self.assertEqual(set(result["files"]), {CSV_CONFIG[row["domain"]]["file"] for row in result["results"]})
+        self.assertEqual(result["results"], core.search_all_domains(query, domains=["color", "style"])["results"])
+        self.assertNotIn("federated", search(query, domain="color"))
+
+
 class TestSearchDomains(unittest.TestCase):
     """Known query -> expected top-domain sanity checks (not exact-row pinning,
     since data can grow; these assert the engine still finds *something*
@@ -110,6 +671,37 @@ class TestPersistence(unittest.TestCase):
             result3 = generate_design_system("ecommerce luxury", "Test Project", persist=True, output_dir=tmp, force=True)
             self.assertEqual(result3["persistence"]["status"], "success")
 
+    def test_force_rewrites_only_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = generate_design_system("saas dashboard", "Churn Project", persist=True, output_dir=tmp,
+                                           pages=["dashboard", "settings"])["persistence"]
+            self.assertEqual(set(first["files"].values()), {"written"})
+            master = Path(first["master_file"])
+            dashboard = master.parent / "pages" / "dashboard.md"
+            mtimes = {path: Path(path).stat().st_mtime_ns for path in first["files"]}
+
+            # Same design system, new page: only the new page is written.
+            second = generate_design_system("saas dashboard", "Churn Project", persist=True, output_dir=tmp,
+                                            force=True, pages=["dashboard", "settings", "billing"])["persistence"]
+            self.assertEqual(second["status"], "success")
+            billing = str(master.parent / "pages" / "billing.md")
+            self.assertEqual(second["created_files"], [billing])
+            self.assertEqual(second["files"], {**{path: "unchanged" for path in mtimes}, billing: "written"})
+            self.assertEqual({path: Path(path).stat().st_mtime_ns for path in mtimes}, mtimes)
+
+            # A different design system rewrites MASTER.md and the page files.
+            before = master.read_text(encoding="utf-8")
+            third = generate_design_system("ecommerce luxury", "Churn Project", persist=True, output_dir=tmp,
+                                           force=True, page="dashboard")["persistence"]
+            self.assertEqual(third["files"], {str(master): "written", str(dashboard): "written"})
+            self.assertNotEqual(master.read_text(encoding="utf-8"), before)
+
+            # Without force, nothing is written and every path is reported skipped.
+            fourth = generate_design_system("saas dashboard", "Churn Project", persist=True, output_dir=tmp,
+                                            page="dashboard")["persistence"]
+            self.assertEqual(fourth["files"], {str(master): "skipped", str(dashboard): "skipped"})
+            self.assertEqual(sorted(p.name for p in master.parent.rglob("*.tmp")), [])
+
     def test_persist_writes_only_under_output_dir(self):
         with tempfile.TemporaryDirectory() as tmp:
             generate_design_system("saas dashboard", "Scoped Project", persist=True, output_dir=tmp)
@@ -117,7 +709,97 @@ class TestPersistence(unittest.TestCase):
             self.assertTrue(expected.exists())
 
 
+PAGES = ["dashboard", "checkout", "settings", "user_profile", "login", "pricing", "blog", "404", "zzqx", "home"]
+
+
+class TestBulkPageOverrides(unittest.TestCase):
+    def test_batched_lookups_match_search(self):
+        for page_query in (None, "saas analytics", "zzqx"):
+            contexts = [design_system._page_context(page, page_query) for page in PAGES]
+            lookups = design_system._page_lookups(contexts)
+            for context in contexts:
+                expected = {
+                    domain: search(context, domain, cfg["max_results"])["results"]
+                    for domain, cfg in design_system.PAGE_SEARCH_CONFIG.items()
+                }
+                self.assertEqual(lookups[context], expected, context)
+
+    def test_bulk_render_matches_single_page_render(self):
+        ds = generate_design_system("saas dashboard", "Bulk")["design_system"]
+        bulk = design_system.format_page_overrides_md(ds, PAGES, "saas dashboard")
+        self.assertEqual(list(bulk), PAGES)
+        for page in PAGES:
+            single = design_system.format_page_override_md(ds, page, "saas dashboard")
+            self.assertEqual(_without_timestamp(bulk[page]), _without_timestamp(single), page)
+
+    def test_each_index_is_loaded_once_for_all_pages(self):
+        with mock.patch.object(design_system, "_load_index", wraps=design_system._load_index) as load_index, \
+                tempfile.TemporaryDirectory() as tmp:
+            result = generate_design_system("saas dashboard", "Many Pages", persist=True, output_dir=tmp,
+                                            pages=[f"page-{i}" for i in range(30)])
+        self.assertEqual(len(result["persistence"]["created_files"]), 31)
+        self.assertEqual(load_index.call_count, len(design_system.PAGE_SEARCH_CONFIG))
+
+    def test_cli_pages_and_pages_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pages_file = Path(tmp) / "pages.txt"
+            pages_file.write_text("settings\n\n# later\nbilling  # account area\n", encoding="utf-8")
+            result = subprocess.run(
+                [sys.executable, str(SCRIPTS_DIR / "search.py"), "saas dashboard", "--design-system", "--persist",
+                 "-p", "CLI Pages", "--output-dir", tmp, "--page", "home", "--pages", "dashboard, checkout,",
+                 "--pages-file", str(pages_file), "--no-daemon"],
+                capture_output=True, text=True, env=_subprocess_env(),
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            pages_dir = Path(tmp) / "design-system" / "cli-pages" / "pages"
+            self.assertEqual(sorted(p.name for p in pages_dir.iterdir()),
+                             ["billing.md", "checkout.md", "dashboard.md", "home.md", "settings.md"])
+
+
+def _without_timestamp(text):
+    return re.sub(r"\*\*Generated:\*\* .*", "", text)
+
+
+def _reference_reasoning_rule(rows, category):
+    """The three linear scans the compiled reasoning table replaced."""
+    category_lower = category.lower()
+    for rule in rows:
+        if rule.get("UI_Category", "").lower() == category_lower:
+            return rule
+    for rule in rows:
+        ui_cat = rule.get("UI_Category", "").lower()
+        if ui_cat in category_lower or category_lower in ui_cat:
+            return rule
+    for rule in rows:
+        keywords = rule.get("UI_Category", "").lower().replace("/", " ").replace("-", " ").split()
+        if any(kw in category_lower for kw in keywords):
+            return rule
+    return {}
+
+
 class TestReasoningMatch(unittest.TestCase):
+    def test_compiled_table_matches_linear_scans(self):
+        gen = DesignSystemGenerator()
+        rows = gen.reasoning_data
+        categories = {row.get("Product Type", "") for row in core._load_csv(core.DATA_DIR / CSV_CONFIG["product"]["file"])}
+        for rule in rows:
+            category = rule["UI_Category"]
+            categories |= {category, category.upper(), category[:4], category[2:9], category[-5:],
+                           category.split()[0], f"{category} extra", f"pre {category}"}
+        categories |= {"", "x", "Totally Unknown Category XYZ", "ai saas", "luxury e-commerce"}
+        mismatches = [c for c in sorted(categories) if gen._find_reasoning_rule(c) != _reference_reasoning_rule(rows, c)]
+        self.assertEqual(mismatches, [])
+
+    def test_generators_share_one_compiled_table(self):
+        self.assertIs(DesignSystemGenerator()._reasoning, DesignSystemGenerator()._reasoning)
+
+    def test_decision_rules_are_private_copies(self):
+        gen = DesignSystemGenerator()
+        rules = gen._apply_reasoning("SaaS (General)", {})["decision_rules"]
+        self.assertTrue(rules)
+        rules.clear()
+        self.assertTrue(gen._apply_reasoning("SaaS (General)", {})["decision_rules"])
+
     def test_known_category_matches_exactly(self):
         gen = DesignSystemGenerator()
         rule = gen._find_reasoning_rule("SaaS (General)")
@@ -130,5 +812,30 @@ class TestReasoningMatch(unittest.TestCase):
         self.assertIsInstance(rule, dict)
 
 
+class TestGeneratorPhases(unittest.TestCase):
+    def test_each_domain_is_searched_once(self):
+        import design_system
+        calls = []
+        with mock.patch.object(design_system, "search", side_effect=lambda q, d, n: calls.append(d) or search(q, d, n)):
+            DesignSystemGenerator().generate("saas dashboard", motion=5)
+        self.assertEqual(sorted(calls), sorted(list(design_system.SEARCH_CONFIG) + ["gsap"]))
+
+    def test_timings_reported_outside_design_system(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = generate_design_system("saas dashboard", motion=5, persist=True, output_dir=tmp)
+        self.assertEqual(list(result["timings"]), ["product", "reasoning", "domains", "select", "motion",
+                                                   "persist", "format", "total"])
+        self.assertTrue(all(ms >= 0 for ms in result["timings"].values()))
+        self.assertNotIn("timings", result["design_system"])
+
+    def test_cold_and_warm_runs_agree(self):
+        search_engine._bm25_cache.clear()
+        search_engine._csv_cache.clear()
+        cold = generate_design_system("fintech crypto dark", variance=8, motion=9)
+        warm = generate_design_system("fintech crypto dark", variance=8, motion=9)
+        self.assertEqual(cold["design_system"], warm["design_system"])
+        self.assertEqual(cold["text"], warm["text"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the search daemon (daemon.py): a running daemon must return
+exactly what the in-process path returns, the client must fall back
+cleanly when no daemon is listening, and must not fall back (re-running the
+request) once the daemon has it.
+
+Stdlib-only (unittest, not pytest) to match test_core.py.
+
+Run with:
+    python -m unittest discover -s scripts/tests -v
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import daemon  # noqa: E402
+
+
+_env_patcher = mock.patch.dict(os.environ)
+_cache_dir = None
+
+
+def setUpModule():
+    """Point the on-disk index cache (here and in any subprocess) at a temp
+    dir, so the tests never touch ~/.cache/ui-ux-pro-max."""
+    global _cache_dir
+    _cache_dir = tempfile.mkdtemp(prefix="ui-ux-pro-max-cache-")
+    _env_patcher.start()
+    os.environ["UI_PRO_MAX_CACHE_DIR"] = _cache_dir
+    os.environ.pop("UI_PRO_MAX_NO_CACHE", None)
+
+
+def tearDownModule():
+    _env_patcher.stop()
+    shutil.rmtree(_cache_dir, ignore_errors=True)
+
+
+@unittest.skipUnless(daemon.daemon_supported(), "needs AF_UNIX sockets")
+class TestDaemonRoundTrip(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.socket_path = Path(cls._tmp.name) / "search.sock"
+        cls.server = daemon.SearchServer(cls.socket_path)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls._tmp.cleanup()
+
+    def _assert_same_as_in_process(self, payload):
+        remote = daemon.request(payload, self.socket_path)
+        self.assertIsNotNone(remote, "daemon did not answer")
+        self.assertEqual(remote, daemon.handle_request(payload))
+
+    def test_domain_search_matches_in_process(self):
+        self._assert_same_as_in_process({"op": "search", "query": "glassmorphism dark", "domain": None, "max_results": 3})
+
+    def test_stack_search_matches_in_process(self):
+        self._assert_same_as_in_process({"op": "stack", "query": "list performance", "stack": "react-native", "max_results": 2})
+
+    def test_zero_hit_search_matches_in_process(self):
+        self._assert_same_as_in_process({"op": "search", "query": "zzqqxx", "domain": "ux", "max_results": 3})
+
+    def test_design_system_matches_in_process(self):
+        payload = {"op": "design_system", "query": "saas dashboard", "project_name": "Daemon", "output_format": "markdown"}
+        remote = daemon.request(payload, self.socket_path)
+        local = daemon.handle_request(payload)
+        self.assertEqual(remote["design_system"], local["design_system"])
+        self.assertEqual(remote["text"], local["text"])
+
+    def test_persistence_resolves_relative_paths_against_client_cwd(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            previous = os.getcwd()
+            os.chdir(tmp)
+            try:
+                result = daemon.request({
+                    "op": "design_system", "query": "saas", "project_name": "Rel",
+                    "persist": True, "output_dir": "out",
+                }, self.socket_path)
+            finally:
+                os.chdir(previous)
+            self.assertEqual(result["persistence"]["status"], "success")
+            self.assertTrue((Path(tmp) / "out" / "design-system" / "rel" / "MASTER.md").exists())
+
+    def test_daemon_errors_are_reported_not_retried(self):
+        result = daemon.request({"op": "no-such-op"}, self.socket_path)
+        self.assertEqual(result, {"error": "Search daemon: ValueError: Unknown op: 'no-such-op'"})
+
+
+class TestClientFallback(unittest.TestCase):
+    def test_missing_socket_returns_none(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(daemon.request({"op": "ping"}, Path(tmp) / "absent.sock"))
+
+    @unittest.skipUnless(daemon.daemon_supported(), "needs AF_UNIX sockets")
+    def test_stale_socket_file_returns_none(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            socket_path = Path(tmp) / "stale.sock"
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.bind(str(socket_path))  # bound but never listening
+            self.assertIsNone(daemon.request({"op": "ping"}, socket_path))
+
+    @unittest.skipUnless(daemon.daemon_supported(), "needs AF_UNIX sockets")
+    def test_timeout_after_sending_is_an_error_not_a_fallback(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            socket_path = Path(tmp) / "slow.sock"
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+                server.bind(str(socket_path))
+                server.listen(1)  # accepts the connection, never answers
+                result = daemon.request({"op": "ping"}, socket_path, timeout=0.2)
+        self.assertEqual(result, {"error": f"Search daemon at {socket_path} did not answer within 0.2s"})
+
+
+
+class TestClientStartup(unittest.TestCase):
+    def _imported_modules(self, *args):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", str(SCRIPTS_DIR / "search.py"), *args, "--no-daemon"],
+            capture_output=True, text=True, check=True,
+        )
+        return {line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines()
+                if line.startswith("import time:")}
+
+    def test_domain_search_skips_design_system_and_server(self):
+        modules = self._imported_modules("blue", "-d", "color")
+        self.assertNotIn("design_system", modules)
+        self.assertNotIn("socketserver", modules)
+
+    def test_design_system_mode_imports_design_system(self):
+        self.assertIn("design_system", self._imported_modules("saas dashboard", "--design-system"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
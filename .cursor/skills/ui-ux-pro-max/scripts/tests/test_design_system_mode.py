@@ -16,16 +16,24 @@ or directly:
     python scripts/tests/test_design_system_mode.py
 """
 
+import os
+import shutil
 import sys
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 SCRIPTS_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(SCRIPTS_DIR))
 
+from core import search  # noqa: E402
 from design_system import (  # noqa: E402
+    _contrast_ratio,
     _filter_anti_patterns_for_mode,
+    _palette_info,
     _palette_is_dark,
+    _palette_table,
     _query_wants_dark,
     _relative_luminance,
     _resolve_color_mode,
@@ -34,6 +42,26 @@ from design_system import (  # noqa: E402
     DesignSystemGenerator,
 )  # noqa: I001 - private helpers first, public class last
 
+
+_env_patcher = mock.patch.dict(os.environ)
+_cache_dir = None
+
+
+def setUpModule():
+    """Point the on-disk index cache (here and in any subprocess) at a temp
+    dir, so the tests never touch ~/.cache/ui-ux-pro-max."""
+    global _cache_dir
+    _cache_dir = tempfile.mkdtemp(prefix="ui-ux-pro-max-cache-")
+    _env_patcher.start()
+    os.environ["UI_PRO_MAX_CACHE_DIR"] = _cache_dir
+    os.environ.pop("UI_PRO_MAX_NO_CACHE", None)
+
+
+def tearDownModule():
+    _env_patcher.stop()
+    shutil.rmtree(_cache_dir, ignore_errors=True)
+
+
 LIGHT_PALETTE = {"Product Type": "SaaS", "Background": "#F8FAFC", "Foreground": "#020617"}
 DARK_PALETTE = {"Product Type": "Fintech/Crypto", "Background": "#0F172A", "Foreground": "#F8FAFC"}
 
@@ -107,6 +135,66 @@ class TestPaletteSelection(unittest.TestCase):
         self.assertEqual(_select_palette_for_mode([], "dark"), {})
 
 
+class TestPaletteContrast(unittest.TestCase):
+    LOW_CONTRAST = {"Background": "#FFFFFF", "Foreground": "#94A3B8",
+                    "Primary": "#2563EB", "On Primary": "#FFFFFF"}
+    HIGH_CONTRAST = {"Background": "#FFFFFF", "Foreground": "#020617",
+                     "Primary": "#1E3A8A", "On Primary": "#FFFFFF"}
+
+    def test_contrast_ratio(self):
+        self.assertAlmostEqual(_contrast_ratio("#000000", "#FFFFFF"), 21.0, places=6)
+        self.assertAlmostEqual(_contrast_ratio("#FFFFFF", "#000000"), 21.0, places=6)
+        self.assertAlmostEqual(_contrast_ratio("#2563EB", "#2563EB"), 1.0, places=6)
+        self.assertIsNone(_contrast_ratio("#FFFFFF", "nope"))
+
+    def test_palette_info_for_ad_hoc_dicts(self):
+        info = _palette_info(DARK_PALETTE)
+        self.assertTrue(info["dark"])
+        self.assertEqual(info["rgb"]["Background"], (0x0F, 0x17, 0x2A))
+        self.assertEqual(set(info["contrast"]), {"foreground"})  # no Primary / On Primary
+        self.assertEqual(_palette_info({})["contrast"], {})
+
+    def test_min_contrast_skips_palettes_below_it(self):
+        chosen = _select_palette_for_mode([self.LOW_CONTRAST, self.HIGH_CONTRAST], "light", 4.5)
+        self.assertIs(chosen, self.HIGH_CONTRAST)
+        self.assertEqual(_select_palette_for_mode([self.LOW_CONTRAST], "light", 4.5), {})
+        self.assertIs(_select_palette_for_mode([self.LOW_CONTRAST], "light"), self.LOW_CONTRAST)
+
+    def test_table_classifies_every_shipped_palette(self):
+        table = _palette_table()
+        self.assertGreater(len(table.rows), 100)
+        self.assertEqual(sorted(table.by_mode["dark"] + table.by_mode["light"]), list(range(len(table.rows))))
+        for row, info in zip(table.rows, table.info):
+            self.assertIs(_palette_info(row), info)
+            self.assertEqual(info["dark"], _palette_is_dark(row))
+
+    def test_generate_widens_the_color_search_to_meet_min_contrast(self):
+        query = "healthcare clinic booking app"
+        default = DesignSystemGenerator().generate(query)["colors"]
+        strict = DesignSystemGenerator().generate(query, min_contrast=7)["colors"]
+        self.assertNotIn("contrast", default)
+        self.assertLess(_contrast_ratio(default["on_primary"], default["primary"]), 7)
+        self.assertGreaterEqual(min(strict["contrast"].values()), 7)
+
+    def test_widened_search_covers_palettes_with_no_query_overlap(self):
+        query = "qzxv"
+        self.assertEqual(search(query, "color", 1000)["results"], [])
+        palette, note = DesignSystemGenerator()._widen_palette_search(query, [], "light", 7)
+        self.assertEqual(note, "")
+        self.assertIn(palette, _palette_table().rows)
+        self.assertGreaterEqual(_palette_info(palette)["min_contrast"], 7)
+
+    def test_table_first_fit_uses_the_mode_index(self):
+        table = _palette_table()
+        self.assertIs(table.first_fit("dark"), table.rows[table.by_mode["dark"][0]])
+        self.assertIs(table.first_fit("light"), table.rows[0])
+        self.assertEqual(table.first_fit("light", 22), {})
+
+    def test_generate_notes_an_unreachable_min_contrast(self):
+        colors = DesignSystemGenerator().generate("kids education game", min_contrast=21)["colors"]
+        self.assertIn("No palette reaches 21:1 text contrast", colors["notes"])
+
+
 class TestAntiPatternGating(unittest.TestCase):
     def test_dark_clause_dropped_others_kept(self):
         result = _filter_anti_patterns_for_mode(
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Golden-file tests for design_system.py's output formatters: the ascii box
+(with and without truecolor swatches), the markdown summary, MASTER.md and
+page override files must stay byte-identical to tests/golden/.
+
+The inputs are frozen design system dicts (tests/golden/design_systems.json,
+page lookups included), so changes to the CSV data don't move the goldens.
+After an intended output change, regenerate them with:
+    python scripts/tests/test_render.py --update
+"""
+
+import io
+import json
+import os
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import design_system  # noqa: E402
+
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+FIXTURES = json.loads((GOLDEN_DIR / "design_systems.json").read_text(encoding="utf-8"))
+TIMESTAMP = datetime(2026, 1, 1, 9, 30, 0)
+
+
+def _render_fixture(fixture):
+    """{golden file name: rendered text} for one fixture."""
+    ds = fixture["design_system"]
+    frozen = mock.Mock(wraps=datetime)
+    frozen.now.return_value = TIMESTAMP
+    rendered = {}
+    with mock.patch.object(design_system, "datetime", frozen):
+        with mock.patch.dict(os.environ, {"COLORTERM": ""}):
+            rendered["box.txt"] = design_system.format_ascii_box(ds)
+        with mock.patch.dict(os.environ, {"COLORTERM": "truecolor"}):
+            rendered["box-truecolor.txt"] = design_system.format_ascii_box(ds)
+        rendered["design-system.md"] = design_system.format_markdown(ds)
+        rendered["MASTER.md"] = design_system.format_master_md(ds)
+        for page, lookups in fixture["pages"].items():
+            rendered[f"pages/{page}.md"] = design_system.format_page_override_md(
+                ds, page, fixture["page_query"], lookups)
+    return rendered
+
+
+def _write_goldens():
+    for name, fixture in FIXTURES.items():
+        for filename, text in _render_fixture(fixture).items():
+            path = GOLDEN_DIR / name / filename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(text.encode("utf-8"))
+
+
+class TestGoldenOutput(unittest.TestCase):
+    def test_formatters_match_goldens(self):
+        for name, fixture in FIXTURES.items():
+            for filename, text in _render_fixture(fixture).items():
+                with self.subTest(fixture=name, file=filename):
+                    golden = (GOLDEN_DIR / name / filename).read_bytes()
+                    self.assertEqual(text.encode("utf-8"), golden)
+
+    def test_streamed_output_matches_returned_text(self):
+        fixture = FIXTURES["ops-console"]
+        ds = fixture["design_system"]
+        page, lookups = next(iter(fixture["pages"].items()))
+        renders = [
+            lambda out=None: design_system.format_ascii_box(ds, out=out),
+            lambda out=None: design_system.format_markdown(ds, out=out),
+            lambda out=None: design_system.format_master_md(ds, out=out),
+            lambda out=None: design_system.format_page_override_md(ds, page, fixture["page_query"], lookups, out=out),
+        ]
+        frozen = mock.Mock(wraps=datetime)
+        frozen.now.return_value = TIMESTAMP
+        with mock.patch.object(design_system, "datetime", frozen):
+            for render in renders:
+                out = io.StringIO()
+                self.assertIsNone(render(out))
+                self.assertEqual(out.getvalue(), render())
+
+
+class TestTemplate(unittest.TestCase):
+    def test_fields_and_escaped_braces(self):
+        template = design_system._Template(".btn {{\n  color: {primary};\n  border: {primary}20;\n}}\n")
+        chunks = []
+        template.render(chunks.append, {"primary": "#2563EB"})
+        self.assertEqual(chunks, [".btn {\n  color: #2563EB;\n  border: #2563EB20;\n}\n"])
+
+    def test_static_skeleton_is_one_literal(self):
+        template = design_system._Template("## Heading\n\n{{literal}}\n")
+        chunks = []
+        template.render(chunks.append)
+        self.assertEqual(chunks, ["## Heading\n\n{literal}\n"])
+
+
+if __name__ == "__main__":
+    if "--update" in sys.argv:
+        _write_goldens()
+        print(f"Rewrote goldens under {GOLDEN_DIR}")
+    else:
+        unittest.main()